@@ -4,10 +4,11 @@ import json
 from pathlib import Path
 from typing import Any
 
-from harness.types import SupervisorRun
+from harness.gate_history import append_history
+from harness.types import FAILED_STATUSES, SupervisorRun
 
 
-def _safe_id(value: str) -> str:
+def safe_id(value: str) -> str:
     return "".join(ch if ch.isalnum() or ch in {"-", "_", "."} else "-" for ch in value)
 
 
@@ -15,12 +16,13 @@ def write_task_artifacts(artifacts_dir: str | Path, run: SupervisorRun) -> dict[
     base = Path(artifacts_dir) / run.run_id
     base.mkdir(parents=True, exist_ok=True)
 
-    task_key = _safe_id(run.task_id)
+    task_key = safe_id(run.task_id)
     json_path = base / f"{task_key}.json"
     md_path = base / f"{task_key}.md"
 
     json_path.write_text(json.dumps(run.to_dict(), indent=2), encoding="utf-8")
     md_path.write_text(_render_task_markdown(run), encoding="utf-8")
+    append_history(artifacts_dir, run)
 
     return {
         "json": str(json_path),
@@ -54,17 +56,33 @@ def _render_task_markdown(run: SupervisorRun) -> str:
         f"- **Profiles:** {', '.join(run.profiles_resolved)}",
         f"- **Tags:** {', '.join(run.tags) if run.tags else '(none)'}",
         f"- **Failed Gates:** {', '.join(run.failed_gates) if run.failed_gates else '(none)'}",
+        f"- **Cache Hits:** {sum(1 for result in run.gate_results if result.source == 'cache')}",
         "",
         "## Gate Results",
         "",
-        "| Gate | Attempt | Status | Duration (ms) | Return Code |",
-        "|---|---:|---|---:|---:|",
+        "| Gate | Attempt | Status | Duration (ms) | Return Code | Source "
+        "| CPU user/sys (s) | Max RSS (MB) | Block I/O in/out | Ctx Switches vol/invol |",
+        "|---|---:|---|---:|---:|---|---:|---:|---:|---:|",
     ]
     for result in run.gate_results:
         lines.append(
-            f"| `{result.gate_id}` | {result.attempt} | {result.status} | {result.duration_ms} | {result.return_code} |"
+            f"| `{result.gate_id}` | {result.attempt} | {result.status} | {result.duration_ms} | "
+            f"{result.return_code} | {result.source} | {_render_resources(result.resources)} |"
         )
 
+    reports = [result for result in run.gate_results if result.report_ref]
+    if reports:
+        lines.extend(["", "## Gate Reports", ""])
+        lines.extend([f"- `{result.gate_id}` (attempt {result.attempt}): {result.report_ref}" for result in reports])
+
+    tested = [result for result in run.gate_results if result.test_counts]
+    if tested:
+        lines.extend(["", "## Test Outcomes", ""])
+        for result in tested:
+            counts = ", ".join(f"{count} {outcome}" for outcome, count in sorted(result.test_counts.items()))
+            lines.append(f"- `{result.gate_id}` (attempt {result.attempt}): {counts}")
+            lines.extend([f"  - failed: `{test_id}`" for test_id in result.failed_tests])
+
     if run.warnings:
         lines.extend(["", "## Warnings", ""])
         lines.extend([f"- {warning}" for warning in run.warnings])
@@ -84,7 +102,7 @@ def _render_task_markdown(run: SupervisorRun) -> str:
     attempts = sorted({result.attempt for result in run.gate_results})
     for attempt in attempts:
         per_attempt = [result for result in run.gate_results if result.attempt == attempt]
-        failed = [result.gate_id for result in per_attempt if result.status == "failed"]
+        failed = [result.gate_id for result in per_attempt if result.status in FAILED_STATUSES]
         lines.append(
             f"- Attempt {attempt}: {'failed gates ' + ', '.join(failed) if failed else 'all gates passed'}"
         )
@@ -92,6 +110,19 @@ def _render_task_markdown(run: SupervisorRun) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _render_resources(resources: dict[str, float]) -> str:
+    if not resources:
+        return " | ".join(["-"] * 4)
+    return " | ".join(
+        [
+            f"{resources['user_cpu_s']:.2f} / {resources['system_cpu_s']:.2f}",
+            f"{resources['max_rss_kb'] / 1024:.1f}",
+            f"{resources['block_input_ops']} / {resources['block_output_ops']}",
+            f"{resources['voluntary_ctx_switches']} / {resources['involuntary_ctx_switches']}",
+        ]
+    )
+
+
 def _render_summary_markdown(summary: dict[str, Any]) -> str:
     lines = [
         "# Supervisor Run Summary",
@@ -101,14 +132,37 @@ def _render_summary_markdown(summary: dict[str, Any]) -> str:
         f"- **Total Tasks:** {summary['total_tasks']}",
         f"- **Passed:** {summary['passed_tasks']}",
         f"- **Escalated:** {summary['escalated_tasks']}",
+        f"- **Cancelled:** {summary.get('cancelled_tasks', 0)}",
         f"- **Blocking Failures:** {summary['blocking_failures']}",
         f"- **Advisory Failures:** {summary['advisory_failures']}",
-        "",
-        "## Task Outcomes",
-        "",
-        "| Task | Status | Profiles | Failed Gates |",
-        "|---|---|---|---|",
     ]
+    shard = summary.get("shard")
+    if shard:
+        lines.append(
+            f"- **Shard:** {shard['index']}/{shard['count']} ({shard['strategy']}, "
+            f"{summary['total_tasks']} of {len(shard['of_tasks'])} tasks)"
+        )
+    if summary.get("shards"):
+        lines.append(f"- **Merged Shards:** {', '.join(_render_shard(shard) for shard in summary['shards'])}")
+    executions = summary.get("gate_executions")
+    if executions:
+        lines.append(
+            f"- **Gate Executions:** {executions['executed']} run, {executions['shared']} shared, "
+            f"{executions.get('cache', 0)} from cache, {executions.get('skipped', 0)} skipped as unaffected"
+        )
+    if "gate_ms" in summary:
+        lines.append(
+            f"- **Execution Time (ms):** {summary['gate_ms']} in gates, {summary.get('setup_ms', 0)} in setup"
+        )
+    lines.extend(
+        [
+            "",
+            "## Task Outcomes",
+            "",
+            "| Task | Status | Profiles | Failed Gates |",
+            "|---|---|---|---|",
+        ]
+    )
 
     for task in summary["tasks"]:
         lines.append(
@@ -117,4 +171,30 @@ def _render_summary_markdown(summary: dict[str, Any]) -> str:
             f"{', '.join(task['failed_gates']) if task['failed_gates'] else '(none)'} |"
         )
 
+    if summary.get("setup"):
+        lines.extend(
+            [
+                "",
+                "## Setup Phases",
+                "",
+                "| Setup | Status | Source | Duration (ms) | Key | Log |",
+                "|---|---|---|---:|---|---|",
+            ]
+        )
+        for phase in summary["setup"]:
+            lines.append(
+                f"| `{phase['setup_id']}` | {phase['status']} | {phase['source']} | {phase['duration_ms']} | "
+                f"`{phase['key']}` | {phase['log_ref'] or '-'} |"
+            )
+
+    if summary.get("merge_problems"):
+        lines.extend(["", "## Merge Problems", ""])
+        lines.extend([f"- {problem}" for problem in summary["merge_problems"]])
+
     return "\n".join(lines) + "\n"
+
+
+def _render_shard(shard: dict[str, Any]) -> str:
+    if shard["index"] is None:
+        return f"unsharded run ({shard['total_tasks']} tasks)"
+    return f"{shard['index']}/{shard['count']} ({shard['total_tasks']} tasks)"
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import os
+import signal
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable
+
+from harness.cancellation import CancelToken
+from harness.gate_runner import (
+    DEFAULT_LOG_TAIL_BYTES,
+    gate_env,
+    gate_report_path,
+    gate_timeout,
+    kill_grace,
+    kill_process_group,
+    open_gate_logs,
+    output_excerpt,
+    report_ref,
+    rusage_to_dict,
+    timed_out_stderr,
+)
+from harness.progress import ProgressEmitter
+from harness.test_report import with_test_outcomes
+from harness.types import GateResult
+
+
+READ_CHUNK_BYTES = 64 * 1024
+CANCEL_POLL_SECONDS = 0.02
+
+
+class _TailBuffer:
+    """Keeps the last ``limit`` bytes written to it and a running total."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.total = 0
+        self._data = bytearray()
+
+    def write(self, chunk: bytes) -> None:
+        self.total += len(chunk)
+        self._data += chunk
+        if len(self._data) > self.limit:
+            del self._data[: len(self._data) - self.limit]
+
+    def excerpt(self, log_path: str) -> str:
+        return output_excerpt(bytes(self._data), self.total, log_path)
+
+
+async def _pump(
+    reader: asyncio.StreamReader,
+    log: BinaryIO,
+    tail: _TailBuffer,
+    emit_line: Callable[[str], None] | None,
+) -> None:
+    pending = b""
+    while True:
+        chunk = await reader.read(READ_CHUNK_BYTES)
+        if not chunk:
+            break
+        log.write(chunk)
+        tail.write(chunk)
+        if emit_line is None:
+            continue
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            emit_line(line.decode("utf-8", errors="replace"))
+        if len(pending) > READ_CHUNK_BYTES:
+            emit_line(pending.decode("utf-8", errors="replace"))
+            pending = b""
+    if emit_line is not None and pending:
+        emit_line(pending.decode("utf-8", errors="replace"))
+
+
+async def _open_reader(loop: asyncio.AbstractEventLoop, pipe: BinaryIO) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader(loop=loop)
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader, loop=loop), pipe)
+    return reader
+
+
+async def _reap(proc: subprocess.Popen) -> dict[str, float]:
+    """Reap ``proc`` with ``wait4``, like the subprocess engine, so its resource usage is recorded."""
+    delay = 0.001
+    while True:
+        pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+        if pid:
+            proc.returncode = os.waitstatus_to_exitcode(status)
+            return rusage_to_dict(usage)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, CANCEL_POLL_SECONDS)
+
+
+async def _cancelled(cancel: CancelToken) -> None:
+    while not cancel.is_cancelled():
+        await asyncio.sleep(CANCEL_POLL_SECONDS)
+
+
+async def run_gate_async(
+    gate_id: str,
+    gate_cfg: dict[str, Any],
+    attempt: int,
+    log_dir: str | Path | None = None,
+    progress: ProgressEmitter | None = None,
+    cancel: CancelToken | None = None,
+) -> GateResult:
+    """Coroutine counterpart of ``gate_runner.run_gate``.
+
+    Both pipes are read incrementally on the event loop into the log files and
+    a bounded tail buffer; each output line is reported as a ``gate-output``
+    progress event.
+    """
+    cmd = gate_cfg["command"]
+    if cancel is not None and cancel.is_cancelled():
+        return GateResult.not_run(gate_id, "cancelled", attempt, "Not run: cancelled", command=cmd)
+    timeout = gate_timeout(gate_cfg)
+    tail_bytes = int(gate_cfg.get("log_tail_bytes", DEFAULT_LOG_TAIL_BYTES))
+    (stdout_log, stdout_ref), (stderr_log, stderr_ref) = open_gate_logs(gate_id, gate_cfg, attempt, log_dir)
+    report_path = gate_report_path(gate_id, gate_cfg, attempt, log_dir)
+    stdout_tail = _TailBuffer(tail_bytes)
+    stderr_tail = _TailBuffer(tail_bytes)
+
+    def _emitter(stream: str) -> Callable[[str], None] | None:
+        if progress is None:
+            return None
+        return lambda line: progress.output(gate_id, attempt, stream, line)
+
+    if progress:
+        progress.emit("gate-started", gate_id=gate_id, attempt=attempt, command=cmd)
+    with stdout_log, stderr_log:
+        start = time.monotonic()
+        proc = subprocess.Popen(
+            ["/bin/sh", "-c", cmd],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=gate_cfg.get("cwd") or None,
+            env=gate_env(gate_cfg, report_path),
+            start_new_session=True,
+        )
+        loop = asyncio.get_running_loop()
+        stdout = await _open_reader(loop, proc.stdout)
+        stderr = await _open_reader(loop, proc.stderr)
+        finished = asyncio.gather(
+            _pump(stdout, stdout_log, stdout_tail, _emitter("stdout")),
+            _pump(stderr, stderr_log, stderr_tail, _emitter("stderr")),
+            _reap(proc),
+        )
+        watchers = {finished}
+        if cancel is not None:
+            watchers.add(asyncio.ensure_future(_cancelled(cancel)))
+        done, pending = await asyncio.wait(watchers, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending - {finished}:
+            task.cancel()
+        ended = "exited" if finished in done else "cancelled" if done else "timed-out"
+        if ended == "timed-out":
+            # SIGTERM first; whatever still holds the pipes after the grace period is killed.
+            with contextlib.suppress(ProcessLookupError, PermissionError):
+                os.killpg(proc.pid, signal.SIGTERM)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(finished), kill_grace(gate_cfg))
+        if ended != "exited":
+            # The loop only reports exit once the pipes close, so take down
+            # any grandchildren still holding them as well.
+            kill_process_group(proc.pid)
+            with contextlib.suppress(Exception):
+                await finished
+        duration_ms = int((time.monotonic() - start) * 1000)
+
+    _, _, resources = finished.result()
+    return_code = proc.returncode if proc.returncode is not None else -1
+    if ended == "exited":
+        status = "passed" if return_code == 0 else "failed"
+    else:
+        status = ended
+    stderr = stderr_tail.excerpt(stderr_ref)
+    if status == "timed-out":
+        stderr = timed_out_stderr(stderr, timeout)
+    if progress:
+        progress.emit(
+            "gate-finished",
+            gate_id=gate_id,
+            attempt=attempt,
+            status=status,
+            return_code=return_code,
+            duration_ms=duration_ms,
+        )
+    result = GateResult(
+        gate_id=gate_id,
+        status=status,
+        attempt=attempt,
+        duration_ms=duration_ms,
+        command=cmd,
+        stdout=stdout_tail.excerpt(stdout_ref),
+        stderr=stderr,
+        return_code=return_code,
+        log_ref=stdout_ref,
+        stderr_ref=stderr_ref,
+        report_ref=report_ref(report_path),
+        resources=resources,
+    )
+    return with_test_outcomes(result, gate_cfg)
+
+
+class AsyncGateEngine:
+    """Runs gates on one background event loop; ``run`` is a blocking ``GateRunFn``."""
+
+    def __init__(self, progress: ProgressEmitter | None = None) -> None:
+        self.progress = progress
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="gate-engine", daemon=True)
+        self._thread.start()
+
+    def run(
+        self,
+        gate_id: str,
+        gate_cfg: dict[str, Any],
+        attempt: int,
+        log_dir: str | Path | None = None,
+        cancel: CancelToken | None = None,
+    ) -> GateResult:
+        coro = run_gate_async(gate_id, gate_cfg, attempt, log_dir=log_dir, progress=self.progress, cancel=cancel)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self) -> AsyncGateEngine:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
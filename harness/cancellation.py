@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import threading
+
+
+class CancelToken:
+    """Thread-safe cancellation flag, optionally chained to a parent token.
+
+    A child token reports cancelled when it or any ancestor is cancelled, so a
+    run-wide token can stop every task while a task token stops only its gates.
+    """
+
+    def __init__(self, parent: CancelToken | None = None) -> None:
+        self._event = threading.Event()
+        self._parent = parent
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    def is_cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        return self._parent is not None and self._parent.is_cancelled()
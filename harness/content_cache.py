@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+
+class ContentCache:
+    """Per-file results keyed by content id (git blob id or sha256), in one JSON file.
+
+    ``digest`` identifies the rule set that produced the results; a file written
+    under a different digest is ignored. Only entries used by the latest run are
+    written back, so the file tracks the current tree instead of growing.
+    """
+
+    def __init__(self, path: str | Path, digest: str, read: bool = True) -> None:
+        self.path = Path(path)
+        self.digest = digest
+        self._entries: dict[str, Any] = {}
+        self._used: dict[str, Any] = {}
+        if read:
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("digest") == digest:
+                    self._entries = data["entries"]
+            except (OSError, ValueError, KeyError):
+                pass
+
+    def get(self, content_id: str) -> Any | None:
+        value = self._entries.get(content_id)
+        if value is not None:
+            self._used[content_id] = value
+        return value
+
+    def put(self, content_id: str, value: Any) -> None:
+        self._used[content_id] = value
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"digest": self.digest, "entries": self._used}), encoding="utf-8")
+        os.replace(tmp, self.path)
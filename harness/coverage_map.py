@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, Iterable, TypeVar
+
+MAP_VERSION = 1
+DEFAULT_MAP_PATH = Path(".supervisor-artifacts") / "cache" / "test-coverage.json"
+
+_active: CoverageRecorder | None = None
+_UNTRACED: set[Any] = set()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def untraced(func: F) -> F:
+    """Keep ``func``'s own frames out of the coverage (test-runner bookkeeping called during a test)."""
+    _UNTRACED.add(func.__code__)
+    return func
+
+
+@untraced
+def _audit(event: str, args: tuple[Any, ...]) -> None:
+    recorder = _active
+    if recorder is not None and event == "open" and isinstance(args[0], (str, bytes)):
+        recorder.touch(os.fsdecode(args[0]))
+
+
+class CoverageRecorder:
+    """Records which repo files each test executes code from or opens.
+
+    Only ``call`` events are traced (no line events) and a frame is attributed
+    to its module's ``__file__``, so code generated at import time (dataclass
+    methods, for one) counts against the module that defined it. Files opened
+    by the test (fixtures, policy JSON) are picked up through an audit hook.
+    Work done outside a test, such as ``setUpClass``, is attributed to every
+    test of the class that follows it. Code run in subprocesses is not seen.
+    """
+
+    _audit_installed = False
+
+    def __init__(self, root: str | Path = ".") -> None:
+        self.root = Path(root).resolve()
+        self.coverage: dict[str, set[str]] = {}
+        self._current: set[str] = set()
+        self._class_files: dict[str, set[str]] = {}
+        self._test_class = ""
+        self._relative: dict[str, str | None] = {}
+
+    @untraced
+    def touch(self, filename: str) -> None:
+        self._current.add(filename)
+
+    def _trace(self, frame: Any, event: str, arg: Any) -> None:
+        if event == "call" and frame.f_code not in _UNTRACED:
+            filename = frame.f_globals.get("__file__")
+            if filename:
+                self._current.add(filename)
+        return None
+
+    def start(self) -> None:
+        global _active
+        if not CoverageRecorder._audit_installed:
+            sys.addaudithook(_audit)  # audit hooks cannot be removed; _active gates it
+            CoverageRecorder._audit_installed = True
+        _active = self
+        sys.settrace(self._trace)
+        threading.settrace(self._trace)
+
+    def stop(self) -> None:
+        global _active
+        sys.settrace(None)
+        threading.settrace(None)  # type: ignore[arg-type]
+        _active = None
+
+    @untraced
+    def begin(self, test_id: str, test_class: str) -> None:
+        if test_class != self._test_class:
+            self._class_files[test_class] = self._current
+            self._test_class = test_class
+        else:
+            self._class_files.setdefault(test_class, set()).update(self._current)
+        self._current = set()
+
+    @untraced
+    def end(self, test_id: str) -> None:
+        files = self._current | self._class_files.get(self._test_class, set())
+        self.coverage.setdefault(test_id, set()).update(self._resolve(files))
+        self._current = set()
+
+    @untraced
+    def _resolve(self, filenames: Iterable[str]) -> set[str]:
+        paths = set()
+        for filename in filenames:
+            if filename not in self._relative:
+                try:
+                    relative = Path(filename).resolve().relative_to(self.root).as_posix()
+                except (OSError, ValueError):
+                    relative = None
+                self._relative[filename] = relative
+            if self._relative[filename]:
+                paths.add(self._relative[filename])
+        return paths
+
+
+class CoverageMap:
+    """Per-test map of covered files and their content ids when the test was recorded."""
+
+    def __init__(self, tests: dict[str, dict[str, str]] | None = None, loaded: bool = False) -> None:
+        self.tests = tests or {}
+        self.loaded = loaded
+
+    @staticmethod
+    def _interpreter() -> str:
+        return f"{sys.version_info[0]}.{sys.version_info[1]}"
+
+    @classmethod
+    def load(cls, path: str | Path) -> CoverageMap:
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            if data.get("version") != MAP_VERSION or data.get("python") != cls._interpreter():
+                return cls()
+            return cls(data["tests"], loaded=True)
+        except (OSError, ValueError, KeyError, TypeError):
+            return cls()
+
+    def save(self, path: str | Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {"version": MAP_VERSION, "python": self._interpreter(), "tests": self.tests}
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, sort_keys=True, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+
+    def update(
+        self,
+        coverage: dict[str, Iterable[str]],
+        content_ids: dict[str, str],
+        keep: Iterable[str] | None = None,
+    ) -> None:
+        """Replace the entries of the tests in ``coverage``; with ``keep``, drop tests not in it."""
+        for test_id, paths in coverage.items():
+            self.tests[test_id] = {path: content_ids[path] for path in sorted(paths) if path in content_ids}
+        if keep is not None:
+            keep = set(keep)
+            self.tests = {test_id: entry for test_id, entry in self.tests.items() if test_id in keep}
+
+    def select(
+        self, test_ids: list[str], content_ids: dict[str, str], changed: set[str] | None = None
+    ) -> tuple[list[str], str]:
+        """Tests to run and why.
+
+        A test runs when it has no entry, when a file it covered no longer has
+        the recorded content (its entry is out of date), or when a file it
+        covered is in ``changed``. Without a usable map every test runs.
+        """
+        if not self.loaded:
+            return list(test_ids), "no coverage map (or it was recorded by another version); running all tests"
+
+        selected = []
+        for test_id in test_ids:
+            entry = self.tests.get(test_id)
+            if (
+                entry is None
+                or any(content_ids.get(path) != content_id for path, content_id in entry.items())
+                or (changed and not changed.isdisjoint(entry))
+            ):
+                selected.append(test_id)
+        return selected, f"selected {len(selected)} of {len(test_ids)} tests from the coverage map"
@@ -0,0 +1,492 @@
+from __future__ import annotations
+
+import contextlib
+import itertools
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator
+
+from harness.cancellation import CancelToken
+from harness.gate_runner import run_gate
+from harness.progress import ProgressEmitter
+from harness.python_pool import DEFAULT_PRELOAD, DEFAULT_RECYCLE_AFTER, PythonGatePool
+from harness.python_pool import RUNNER as PYTHON_POOL_RUNNER
+from harness.types import GateResult
+
+
+DEFAULT_HEARTBEAT_SECONDS = 2.0
+DEFAULT_HEARTBEAT_TIMEOUT = 15.0
+MAX_WORKER_LOSSES = 3  # a gate whose workers keep disappearing fails instead of being requeued forever
+POLL_SECONDS = 0.05
+
+
+def parse_address(address: str) -> tuple[socket.AddressFamily, Any]:
+    """``unix:/path`` (or any path containing ``/``) is a Unix socket; ``host:port`` is TCP."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[len("unix:") :]
+    if "/" in address:
+        return socket.AF_UNIX, address
+    host, sep, port = address.rpartition(":")
+    if not sep or not port.isdigit():
+        raise ValueError(f"expected unix:/path or host:port, got: {address}")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class _Channel:
+    """Newline-delimited JSON over a stream socket; ``send`` may be called from any thread."""
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self._reader = sock.makefile("rb")
+        self._lock = threading.Lock()
+
+    def send(self, message: dict[str, Any]) -> bool:
+        # Policy objects are read-only mappings; ``default=dict`` serialises them as plain objects.
+        data = json.dumps(message, separators=(",", ":"), default=dict).encode("utf-8") + b"\n"
+        try:
+            with self._lock:
+                self.sock.sendall(data)
+        except OSError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        try:
+            for line in self._reader:
+                if line.strip():
+                    yield json.loads(line)
+        except (OSError, ValueError):
+            return  # a reset or garbled stream ends the conversation like EOF does
+
+    def shutdown(self) -> None:
+        """Unblock the reading thread, which then sees end of stream."""
+        with contextlib.suppress(OSError):
+            self.sock.shutdown(socket.SHUT_RDWR)
+
+    def close(self) -> None:
+        self.shutdown()
+        self._reader.close()
+        self.sock.close()
+
+
+# --- coordinator (runs in the supervisor) ---------------------------------------------------
+
+
+@dataclass(eq=False)
+class _Worker:
+    name: str
+    channel: _Channel
+    slots: int
+    pulls: int = 0  # jobs asked for and not yet handed out
+    jobs: dict[str, _Job] = field(default_factory=dict)
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+@dataclass(eq=False)
+class _Job:
+    job_id: str
+    gate_id: str
+    gate_cfg: dict[str, Any]
+    attempt: int
+    future: Future[GateResult] = field(default_factory=Future)
+    worker: _Worker | None = None
+    losses: int = 0
+    cancelled: bool = False
+
+
+class GateCoordinator:
+    """Hands gate executions to remote workers that pull them over a socket.
+
+    ``run`` is a ``GateRunFn`` that blocks until a worker reports the result.
+    Workers take a job whenever a slot is free; one that misses heartbeats for
+    ``heartbeat_timeout`` seconds is dropped and its jobs are queued again.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        run_id: str,
+        python_pool: dict[str, Any] | None = None,
+        heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS,
+        heartbeat_timeout: float = DEFAULT_HEARTBEAT_TIMEOUT,
+        progress: ProgressEmitter | None = None,
+    ) -> None:
+        self.run_id = run_id
+        self.python_pool = dict(python_pool or {})
+        self.heartbeat_seconds = heartbeat_seconds
+        self.heartbeat_timeout = heartbeat_timeout
+        self.progress = progress
+        self._lock = threading.Lock()
+        self._queue: deque[_Job] = deque()
+        self._workers: list[_Worker] = []
+        self._ids = itertools.count(1)
+        self._closed = threading.Event()
+
+        family, addr = parse_address(address)
+        self._unix_path = addr if family == socket.AF_UNIX else None
+        if self._unix_path:
+            with contextlib.suppress(FileNotFoundError):
+                if stat.S_ISSOCK(os.stat(self._unix_path).st_mode):
+                    os.unlink(self._unix_path)  # left behind by a coordinator that was killed
+        self._listener = socket.socket(family, socket.SOCK_STREAM)
+        if family == socket.AF_INET:
+            self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(addr)
+        self._listener.listen()
+        self._listener.settimeout(0.2)
+        if self._unix_path:
+            self.address = f"unix:{self._unix_path}"
+        else:
+            host, port = self._listener.getsockname()[:2]
+            self.address = f"{host}:{port}"
+
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="coordinator-accept", daemon=True),
+            threading.Thread(target=self._monitor_loop, name="coordinator-monitor", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _emit(self, event: str, **fields: Any) -> None:
+        if self.progress:
+            self.progress.emit(event, **fields)
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            conn.settimeout(None)
+            threading.Thread(target=self._serve, args=(conn,), name="coordinator-worker", daemon=True).start()
+
+    def _monitor_loop(self) -> None:
+        while not self._closed.wait(min(1.0, self.heartbeat_timeout / 4)):
+            now = time.monotonic()
+            with self._lock:
+                silent = [w for w in self._workers if now - w.last_seen > self.heartbeat_timeout]
+            for worker in silent:
+                worker.channel.shutdown()  # its reader thread then requeues the jobs
+
+    def _serve(self, conn: socket.socket) -> None:
+        channel = _Channel(conn)
+        messages = iter(channel)
+        hello = next(messages, None)
+        if not hello or hello.get("op") != "hello" or self._closed.is_set():
+            channel.close()
+            return
+        worker = _Worker(str(hello.get("worker") or "worker"), channel, max(1, int(hello.get("slots", 1))))
+        channel.send(
+            {
+                "op": "welcome",
+                "run_id": self.run_id,
+                "heartbeat_seconds": self.heartbeat_seconds,
+                "python_pool": self.python_pool,
+            }
+        )
+        with self._lock:
+            self._workers.append(worker)
+        self._emit("worker-joined", worker=worker.name, slots=worker.slots)
+
+        for message in messages:
+            op = message.get("op")
+            assigned: list[tuple[_Worker, _Job]] = []
+            job = None
+            with self._lock:
+                worker.last_seen = time.monotonic()
+                if op == "pull":
+                    worker.pulls += 1
+                    assigned = self._assign()
+                elif op == "result":
+                    job = worker.jobs.pop(str(message.get("job_id")), None)
+            self._send(assigned)
+            if job is not None:
+                self._finish(job, worker, message)
+        self._lose(worker)
+        channel.close()
+
+    def _assign(self) -> list[tuple[_Worker, _Job]]:
+        """Match queued jobs to pulls, the worker with the most free slots first. Call with the lock held."""
+        assigned = []
+        while self._queue:
+            idle = [worker for worker in self._workers if worker.pulls > 0]
+            if not idle:
+                break
+            worker = max(idle, key=lambda w: w.pulls)
+            job = self._queue.popleft()
+            worker.pulls -= 1
+            worker.jobs[job.job_id] = job
+            job.worker = worker
+            assigned.append((worker, job))
+        return assigned
+
+    def _send(self, assigned: list[tuple[_Worker, _Job]]) -> None:
+        for worker, job in assigned:
+            message = {
+                "op": "job",
+                "job_id": job.job_id,
+                "gate_id": job.gate_id,
+                "gate_cfg": job.gate_cfg,
+                "attempt": job.attempt,
+            }
+            if not worker.channel.send(message):
+                worker.channel.shutdown()
+                continue
+            self._emit(
+                "gate-started",
+                gate_id=job.gate_id,
+                attempt=job.attempt,
+                command=job.gate_cfg["command"],
+                worker=worker.name,
+            )
+
+    def _finish(self, job: _Job, worker: _Worker, message: dict[str, Any]) -> None:
+        if "error" in message:
+            self._fail(job, f"Not run: worker {worker.name} could not run the gate: {message['error']}")
+        else:
+            result = GateResult.from_dict(message["result"])
+            self._emit(
+                "gate-finished",
+                gate_id=job.gate_id,
+                attempt=job.attempt,
+                status=result.status,
+                return_code=result.return_code,
+                duration_ms=result.duration_ms,
+                worker=worker.name,
+            )
+            job.future.set_result(result)
+
+    def _lose(self, worker: _Worker) -> None:
+        with self._lock:
+            if worker not in self._workers:
+                return
+            self._workers.remove(worker)
+            jobs = list(worker.jobs.values())
+            worker.jobs.clear()
+            requeued = []
+            for job in reversed(jobs):
+                job.worker = None
+                job.losses += 1
+                if job.cancelled or job.losses >= MAX_WORKER_LOSSES:
+                    continue
+                self._queue.appendleft(job)
+                requeued.append(job)
+            assigned = self._assign()
+        for job in jobs:
+            if job.cancelled:
+                job.future.set_result(self._not_run(job, "Not run: cancelled"))
+            elif job not in requeued:
+                self._fail(job, f"Not run: lost {job.losses} workers in a row while running the gate; giving up")
+        if not self._closed.is_set():
+            self._emit("worker-lost", worker=worker.name, requeued=[job.gate_id for job in reversed(requeued)])
+        self._send(assigned)
+
+    @staticmethod
+    def _not_run(job: _Job, reason: str, status: str = "cancelled") -> GateResult:
+        return GateResult.not_run(job.gate_id, status, job.attempt, reason, command=job.gate_cfg["command"])
+
+    def _fail(self, job: _Job, reason: str) -> None:
+        """Finish ``job`` as failed, so retries, fail-fast and the artifacts treat it like any failing gate."""
+        result = self._not_run(job, reason, status="failed")
+        self._emit("gate-finished", gate_id=job.gate_id, attempt=job.attempt, status=result.status, return_code=-1)
+        job.future.set_result(result)
+
+    def _cancel(self, job: _Job) -> None:
+        with self._lock:
+            job.cancelled = True
+            worker = job.worker
+            queued = job in self._queue
+            if queued:
+                self._queue.remove(job)
+        if queued:
+            job.future.set_result(self._not_run(job, "Not run: cancelled"))
+        elif worker is not None:
+            worker.channel.send({"op": "cancel", "job_id": job.job_id})
+
+    def run(
+        self,
+        gate_id: str,
+        gate_cfg: dict[str, Any],
+        attempt: int,
+        log_dir: str | Path | None = None,
+        cancel: CancelToken | None = None,
+    ) -> GateResult:
+        """Queue the gate for a worker and wait for its result.
+
+        ``log_dir`` is ignored: workers write logs under their own artifacts
+        directory, so ``log_ref`` paths refer to the worker's filesystem.
+        """
+        if cancel is not None and cancel.is_cancelled():
+            cmd = gate_cfg["command"]
+            return GateResult.not_run(gate_id, "cancelled", attempt, "Not run: cancelled", command=cmd)
+        job = _Job(str(next(self._ids)), gate_id, gate_cfg, attempt)
+        with self._lock:
+            if self._closed.is_set():
+                raise RuntimeError("coordinator is closed")
+            self._queue.append(job)
+            assigned = self._assign()
+        self._send(assigned)
+        while True:
+            try:
+                return job.future.result(timeout=POLL_SECONDS)
+            except FutureTimeout:
+                pass
+            if cancel is not None and cancel.is_cancelled() and not job.cancelled:
+                self._cancel(job)
+
+    @property
+    def workers(self) -> list[str]:
+        with self._lock:
+            return [worker.name for worker in self._workers]
+
+    def close(self) -> None:
+        """Tell connected workers to exit and stop listening."""
+        self._closed.set()
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.channel.send({"op": "shutdown"})
+        for thread in self._threads:
+            thread.join()
+        self._listener.close()
+        if self._unix_path:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._unix_path)
+
+    def __enter__(self) -> GateCoordinator:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+# --- worker -----------------------------------------------------------------------------------
+
+
+class GateWorker:
+    """Pulls gate jobs from a coordinator and runs up to ``slots`` of them at a time.
+
+    Gates run from the worker's current directory, which must be a checkout
+    of the same tree as the coordinator's. Logs go under
+    ``<artifacts_dir>/<run_id>/logs`` on the worker.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        slots: int = 1,
+        name: str | None = None,
+        artifacts_dir: str | Path = ".supervisor-artifacts",
+        connect_timeout: float = 30.0,
+    ) -> None:
+        self.address = address
+        self.slots = max(1, slots)
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.artifacts_dir = Path(artifacts_dir)
+        self.connect_timeout = connect_timeout
+
+    def _connect(self) -> socket.socket:
+        family, addr = parse_address(self.address)
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            try:
+                sock.connect(addr)
+                return sock
+            except (ConnectionRefusedError, FileNotFoundError):
+                sock.close()
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def run(self) -> int:
+        """Serve one coordinator run. 0 once told to shut down, 1 if the connection was lost."""
+        channel = _Channel(self._connect())
+        messages = iter(channel)
+        channel.send({"op": "hello", "worker": self.name, "slots": self.slots})
+        welcome = next(messages, None)
+        if not welcome or welcome.get("op") != "welcome":
+            channel.close()
+            return 1
+
+        log_dir = self.artifacts_dir / welcome["run_id"] / "logs"
+        pool_cfg = welcome.get("python_pool") or {}
+        pool = PythonGatePool(
+            preload=pool_cfg.get("preload", DEFAULT_PRELOAD),
+            recycle_after=int(pool_cfg.get("recycle_after", DEFAULT_RECYCLE_AFTER)),
+        )
+        stop = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat,
+            args=(channel, float(welcome.get("heartbeat_seconds", DEFAULT_HEARTBEAT_SECONDS)), stop),
+            name="worker-heartbeat",
+            daemon=True,
+        )
+        heartbeat.start()
+        running: dict[str, CancelToken] = {}
+        shutdown = False
+        try:
+            with ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="worker-gate") as executor:
+                for _ in range(self.slots):
+                    channel.send({"op": "pull"})
+                for message in messages:
+                    op = message.get("op")
+                    if op == "job":
+                        cancel = running[message["job_id"]] = CancelToken()
+                        executor.submit(self._execute, channel, pool, log_dir, message, cancel, running)
+                    elif op == "cancel" and message.get("job_id") in running:
+                        running[message["job_id"]].cancel()
+                    elif op == "shutdown":
+                        shutdown = True
+                        break
+                # Without a coordinator nobody wants the results (its jobs are requeued elsewhere).
+                if not shutdown:
+                    for cancel in list(running.values()):
+                        cancel.cancel()
+        finally:
+            stop.set()
+            heartbeat.join()
+            pool.close()
+            channel.close()
+        return 0 if shutdown else 1
+
+    @staticmethod
+    def _heartbeat(channel: _Channel, interval: float, stop: threading.Event) -> None:
+        while not stop.wait(interval):
+            if not channel.send({"op": "heartbeat"}):
+                return
+
+    @staticmethod
+    def _execute(
+        channel: _Channel,
+        pool: PythonGatePool,
+        log_dir: Path,
+        job: dict[str, Any],
+        cancel: CancelToken,
+        running: dict[str, CancelToken],
+    ) -> None:
+        gate_id, gate_cfg, attempt = job["gate_id"], job["gate_cfg"], job["attempt"]
+        reply: dict[str, Any] = {"op": "result", "job_id": job["job_id"]}
+        try:
+            if gate_cfg.get("runner") == PYTHON_POOL_RUNNER:
+                result = pool.run(gate_id, gate_cfg, attempt, log_dir=log_dir, cancel=cancel)
+            else:
+                result = run_gate(gate_id, gate_cfg, attempt, log_dir=log_dir, cancel=cancel)
+            reply["result"] = result.to_dict()
+        except Exception as exc:
+            reply["error"] = f"{type(exc).__name__}: {exc}"
+        finally:
+            running.pop(job["job_id"], None)
+        channel.send(reply)
+        channel.send({"op": "pull"})
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import stat
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from harness.path_globs import matches_any
+
+
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path(".supervisor-artifacts") / "cache" / "file-inventory.json"
+SKIP_DIRS = {".git", "node_modules", ".venv", "__pycache__", ".next", ".next-e2e", ".supervisor-artifacts"}
+# Files modified this close to the previous index write may have changed again
+# without their size/mtime moving, so their stored hash is not trusted.
+RACY_WINDOW_NS = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class FileEntry:
+    path: str
+    size: int
+    mtime_ns: int
+    content_id: str  # git blob id of the working-tree content
+
+
+def blob_id(path: str | Path) -> str:
+    """The id ``git hash-object`` would give the file's current content."""
+    path = Path(path)
+    digest = hashlib.sha1(b"blob %d\0" % path.stat().st_size)
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _git_lines(root: Path, *args: str) -> list[str]:
+    proc = subprocess.run(["git", *args], cwd=root, check=True, capture_output=True)
+    return [entry for entry in proc.stdout.decode("utf-8", "surrogateescape").split("\0") if entry]
+
+
+def _skipped(path: str, exclude: tuple[str, ...]) -> bool:
+    parts = path.split("/")
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return True
+    return any(path == prefix or path.startswith(prefix + "/") for prefix in exclude)
+
+
+def _list_tree(root: Path) -> tuple[list[str], dict[str, str]]:
+    """Paths to inventory, plus index blob ids for tracked files git reports as clean.
+
+    Uses git (tracked plus untracked-but-not-ignored files) and falls back to a
+    walk that prunes ``SKIP_DIRS`` outside a checkout.
+    """
+    try:
+        staged = {}
+        for entry in _git_lines(root, "ls-files", "-s", "-z"):
+            meta, path = entry.split("\t", 1)
+            staged[path] = meta.split()[1]
+        dirty = set(_git_lines(root, "ls-files", "-z", "-m"))
+        untracked = _git_lines(root, "ls-files", "-z", "-o", "--exclude-standard")
+    except (OSError, subprocess.CalledProcessError):
+        paths = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(name for name in dirnames if name not in SKIP_DIRS)
+            rel_dir = Path(dirpath).relative_to(root)
+            paths.extend((rel_dir / name).as_posix() for name in sorted(filenames))
+        return paths, {}
+    clean = {path: blob for path, blob in staged.items() if path not in dirty}
+    return sorted(set(staged) | set(untracked)), clean
+
+
+class FileInventory:
+    """Snapshot of the repo's files with size, mtime and content id."""
+
+    def __init__(self, root: str | Path, entries: dict[str, FileEntry]) -> None:
+        self.root = Path(root)
+        self.entries = entries
+
+    def paths(self) -> list[str]:
+        return sorted(self.entries)
+
+    def select(self, patterns: list[str] | tuple[str, ...]) -> list[str]:
+        return [path for path in self.paths() if matches_any(path, patterns)]
+
+    def content_ids(self) -> dict[str, str]:
+        return {path: entry.content_id for path, entry in self.entries.items()}
+
+
+def _read_index(index_path: Path | None, root: Path) -> tuple[dict[str, FileEntry], int]:
+    if index_path is None:
+        return {}, 0
+    try:
+        data = json.loads(index_path.read_text(encoding="utf-8"))
+        if data.get("version") != INDEX_VERSION or data.get("root") != str(root.resolve()):
+            return {}, 0
+        entries = {path: FileEntry(path, *values) for path, values in data["entries"].items()}
+        return entries, int(data["written_ns"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return {}, 0
+
+
+def _write_index(index_path: Path, root: Path, entries: dict[str, FileEntry], written_ns: int) -> None:
+    payload = {
+        "version": INDEX_VERSION,
+        "root": str(root.resolve()),
+        "written_ns": written_ns,
+        "entries": {path: [e.size, e.mtime_ns, e.content_id] for path, e in sorted(entries.items())},
+    }
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(payload, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, index_path)
+
+
+def build_inventory(
+    root: str | Path = ".",
+    index_path: str | Path | None = None,
+    exclude: tuple[str, ...] = (),
+) -> FileInventory:
+    """Enumerate the tree once and id every file's content.
+
+    With ``index_path``, the previous inventory is loaded and a file whose size
+    and mtime are unchanged keeps its stored id, so only new or modified files
+    are read; the updated index is written back. Clean tracked files take their
+    id from the git index without being read at all.
+    """
+    root = Path(root)
+    index_path = Path(index_path) if index_path is not None else None
+    previous, previous_written_ns = _read_index(index_path, root)
+    started_ns = time.time_ns()
+    paths, clean = _list_tree(root)
+
+    entries: dict[str, FileEntry] = {}
+    for path in paths:
+        if _skipped(path, exclude):
+            continue
+        full = root / path
+        try:
+            st = full.stat()
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            known = previous.get(path)
+            if path in clean:
+                content_id = clean[path]
+            elif (
+                known is not None
+                and (known.size, known.mtime_ns) == (st.st_size, st.st_mtime_ns)
+                and st.st_mtime_ns < previous_written_ns - RACY_WINDOW_NS
+            ):
+                content_id = known.content_id
+            else:
+                content_id = blob_id(full)
+        except OSError:
+            continue  # deleted or unreadable since listing
+        entries[path] = FileEntry(path, st.st_size, st.st_mtime_ns, content_id)
+
+    if index_path is not None:
+        _write_index(index_path, root, entries, started_ns)
+    return FileInventory(root, entries)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from harness.file_inventory import build_inventory
+from harness.gate_runner import command_identity
+from harness.path_globs import matches_any
+from harness.test_report import is_narrowed
+from harness.types import GateResult
+
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def input_digest(gate_cfg: dict[str, Any], fingerprints: dict[str, str]) -> str:
+    """Hash of the files a gate declares in ``inputs`` (the whole tree when absent)."""
+    patterns = gate_cfg.get("inputs")
+    digest = hashlib.sha256()
+    for path in sorted(fingerprints):
+        if patterns and not matches_any(path, patterns):
+            continue
+        digest.update(f"{path}\0{fingerprints[path]}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+class GateCache:
+    """On-disk cache of passed gate results, keyed by command and input content.
+
+    Entries are JSON files under ``cache_dir``; a hit refreshes the entry's
+    mtime and the least recently used entries are evicted once the directory
+    exceeds ``max_bytes``. With ``read=False`` lookups always miss but results
+    are still stored (``--refresh-cache``). Input content ids come from one
+    file inventory per cache instance (persisted at ``index_path`` if given).
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        root: str | Path = ".",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        read: bool = True,
+        exclude: tuple[str, ...] = (),
+        index_path: str | Path | None = None,
+    ) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.read = read
+        self.exclude = exclude
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._fingerprints: dict[str, str] | None = None
+        self._digests: dict[tuple[str, ...], str] = {}
+
+    def fingerprints(self) -> dict[str, str]:
+        """Path -> content id for the tree, taken from the inventory once per cache instance."""
+        with self._lock:
+            if self._fingerprints is None:
+                inventory = build_inventory(self.root, self.index_path, self.exclude)
+                self._fingerprints = inventory.content_ids()
+            return self._fingerprints
+
+    def _digest(self, gate_cfg: dict[str, Any]) -> str:
+        inputs = tuple(gate_cfg.get("inputs") or ())
+        fingerprints = self.fingerprints()
+        with self._lock:
+            if inputs not in self._digests:
+                self._digests[inputs] = input_digest(gate_cfg, fingerprints)
+            return self._digests[inputs]
+
+    def key(self, gate_cfg: dict[str, Any]) -> str:
+        material = {
+            **command_identity(gate_cfg),
+            "inputs": self._digest(gate_cfg),
+            "version": CACHE_VERSION,
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def lookup(self, gate_id: str, gate_cfg: dict[str, Any], attempt: int) -> GateResult | None:
+        if not self.read or is_narrowed(gate_cfg):
+            return None
+        key = self.key(gate_cfg)
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        result = GateResult.from_dict(entry["result"])
+        result.gate_id = gate_id
+        result.attempt = attempt
+        result.duration_ms = 0
+        result.log_ref = ""
+        result.report_ref = ""
+        result.source = "cache"
+        result.execution_key = key[:16]
+        return result
+
+    def store(self, gate_cfg: dict[str, Any], result: GateResult) -> None:
+        # A retry narrowed to the failed tests only vouches for part of the gate.
+        if result.status != "passed" or result.source != "executed" or is_narrowed(gate_cfg):
+            return
+        key = self.key(gate_cfg)
+        path = self._entry_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({"key": key, "result": result.to_dict()}), encoding="utf-8")
+        os.replace(tmp, path)
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+from typing import Any, Callable, Iterable
+
+from harness.types import FAILED_STATUSES, GateResult, SupervisorRun
+
+
+HISTORY_FILE = Path("history") / "gate-history.ndjson"
+MAX_HISTORY_BYTES = 4 * 1024 * 1024
+SAMPLES_PER_KEY = 50
+ORDERS = ("policy", "longest-first", "fail-first")
+
+_append_lock = threading.Lock()
+
+
+def history_path(artifacts_dir: str | Path) -> Path:
+    return Path(artifacts_dir) / HISTORY_FILE
+
+
+def _executed(result: GateResult) -> bool:
+    """Whether ``result`` measured a process of its own that ran to an outcome."""
+    # Shared and cached results repeat another execution's numbers; blocked,
+    # skipped and cancelled gates never ran (or were cut short).
+    return result.source == "executed" and (result.status == "passed" or result.status in FAILED_STATUSES)
+
+
+def _records_for_run(run: SupervisorRun) -> list[dict[str, Any]]:
+    recorded_at = datetime.now(timezone.utc).isoformat()
+    executed = [result for result in run.gate_results if _executed(result)]
+    records: list[dict[str, Any]] = []
+    # Only a task whose every gate ran measures what the task costs; cached,
+    # shared, resumed or skipped gates would make it look cheaper. Other tasks
+    # are estimated from their gates' history instead.
+    if run.status != "cancelled" and executed and len(executed) == len(run.gate_results):
+        records.append(
+            {
+                "kind": "task",
+                "run_id": run.run_id,
+                "task_id": run.task_id,
+                "status": run.status,
+                "duration_ms": run.duration_ms,
+                "recorded_at": recorded_at,
+            }
+        )
+    for result in executed:
+        records.append(
+            {
+                "kind": "gate",
+                "run_id": run.run_id,
+                "task_id": run.task_id,
+                "gate_id": result.gate_id,
+                "attempt": result.attempt,
+                "status": result.status,
+                "duration_ms": result.duration_ms,
+                "recorded_at": recorded_at,
+            }
+        )
+    return records
+
+
+def _record_key(record: dict[str, Any]) -> tuple[str, str, str]:
+    return (record.get("kind", ""), record.get("task_id", ""), record.get("gate_id", ""))
+
+
+def _read_records(path: Path) -> list[dict[str, Any]]:
+    records = []
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            for line in handle:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn write from an interrupted run
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _compact(path: Path) -> None:
+    kept: dict[tuple[str, str, str], deque[dict[str, Any]]] = defaultdict(
+        lambda: deque(maxlen=SAMPLES_PER_KEY)
+    )
+    for record in _read_records(path):
+        kept[_record_key(record)].append(record)
+    survivors = sorted((r for q in kept.values() for r in q), key=lambda r: r.get("recorded_at", ""))
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in survivors), encoding="utf-8")
+    tmp.replace(path)
+
+
+def append_history(artifacts_dir: str | Path, run: SupervisorRun) -> None:
+    """Append one task run's gate durations/outcomes to the history log.
+
+    The log is append-only NDJSON; once it grows past ``MAX_HISTORY_BYTES`` it
+    is compacted to the newest ``SAMPLES_PER_KEY`` records per task/gate.
+    """
+    path = history_path(artifacts_dir)
+    payload = "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in _records_for_run(run))
+    with _append_lock:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as handle:
+            handle.write(payload)
+        if path.stat().st_size > MAX_HISTORY_BYTES:
+            _compact(path)
+
+
+class GateHistory:
+    """Aggregated view of the history log used to order gates and tasks."""
+
+    def __init__(self, records: Iterable[dict[str, Any]] = ()) -> None:
+        self._gate_durations: dict[str, deque[int]] = defaultdict(lambda: deque(maxlen=SAMPLES_PER_KEY))
+        self._gate_outcomes: dict[str, list[int]] = defaultdict(lambda: [0, 0])  # [runs, failures]
+        self._task_durations: dict[str, deque[int]] = defaultdict(lambda: deque(maxlen=SAMPLES_PER_KEY))
+        self._passed_durations: dict[str, deque[int]] = defaultdict(lambda: deque(maxlen=SAMPLES_PER_KEY))
+        for record in records:
+            if record.get("kind") == "gate":
+                gate_id = record["gate_id"]
+                self._gate_durations[gate_id].append(int(record["duration_ms"]))
+                if record.get("status") == "passed":
+                    self._passed_durations[gate_id].append(int(record["duration_ms"]))
+                outcome = self._gate_outcomes[gate_id]
+                outcome[0] += 1
+                outcome[1] += record.get("status") != "passed"
+            elif record.get("kind") == "task":
+                self._task_durations[record["task_id"]].append(int(record["duration_ms"]))
+
+    @classmethod
+    def load(cls, artifacts_dir: str | Path) -> GateHistory:
+        return cls(_read_records(history_path(artifacts_dir)))
+
+    def _default_duration_ms(self) -> float:
+        medians = [median(samples) for samples in self._gate_durations.values() if samples]
+        return median(medians) if medians else 0.0
+
+    def expected_duration_ms(self, gate_id: str) -> float:
+        samples = self._gate_durations.get(gate_id)
+        return float(median(samples)) if samples else self._default_duration_ms()
+
+    def passed_duration_quantile_ms(self, gate_id: str, quantile: float, min_samples: int = 1) -> float | None:
+        """Nearest-rank ``quantile`` of the gate's recent passing durations; None below ``min_samples``."""
+        samples = sorted(self._passed_durations.get(gate_id, ()))
+        if not samples or len(samples) < min_samples:
+            return None
+        return float(samples[max(0, math.ceil(quantile * len(samples)) - 1)])
+
+    def failure_probability(self, gate_id: str) -> float:
+        runs, failures = self._gate_outcomes.get(gate_id, (0, 0))
+        return (failures + 1) / (runs + 2)  # Laplace prior: unknown gates sit at 0.5
+
+    def expected_task_duration_ms(self, task_id: str, gate_ids: list[str]) -> float | None:
+        samples = self._task_durations.get(task_id)
+        if samples:
+            return float(median(samples))
+        if not self._gate_durations:
+            return None
+        return sum(self.expected_duration_ms(gate_id) for gate_id in gate_ids)
+
+    def task_failure_probability(self, gate_ids: list[str]) -> float:
+        survive = 1.0
+        for gate_id in gate_ids:
+            survive *= 1 - self.failure_probability(gate_id)
+        return 1 - survive
+
+    def gate_sort_key(self, order: str) -> Callable[[str], tuple[float, float]] | None:
+        """Sort key for ready gates: ``longest-first`` or ``fail-first``."""
+        if order == "longest-first":
+            return lambda gate_id: (-self.expected_duration_ms(gate_id), -self.failure_probability(gate_id))
+        if order == "fail-first":
+            return lambda gate_id: (-self.failure_probability(gate_id), -self.expected_duration_ms(gate_id))
+        return None
+
+    def task_sort_key(self, order: str) -> Callable[[str, list[str]], tuple[float, float]] | None:
+        if order == "longest-first":
+            return lambda task_id, gate_ids: (
+                -(self.expected_task_duration_ms(task_id, gate_ids) or 0.0),
+                -self.task_failure_probability(gate_ids),
+            )
+        if order == "fail-first":
+            return lambda task_id, gate_ids: (
+                -self.task_failure_probability(gate_ids),
+                -(self.expected_task_duration_ms(task_id, gate_ids) or 0.0),
+            )
+        return None
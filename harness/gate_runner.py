@@ -1,34 +1,348 @@
 from __future__ import annotations
 
+import contextlib
+import hashlib
+import json
+import os
+import signal
 import subprocess
+import tempfile
+import threading
 import time
-from typing import Any
+from concurrent.futures import Future
+from dataclasses import replace
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Protocol
 
+from harness.artifact_writer import safe_id
+from harness.cancellation import CancelToken
+from harness.progress import ProgressEmitter
+from harness.test_report import with_test_outcomes
 from harness.types import GateResult
 
 
-def run_gate(gate_id: str, gate_cfg: dict[str, Any], attempt: int) -> GateResult:
+class GateRunFn(Protocol):
+    """Runs one gate to a result: ``run_gate`` and each engine's ``run``."""
+
+    def __call__(
+        self, gate_id: str, gate_cfg: dict[str, Any], attempt: int, *, cancel: CancelToken | None = None
+    ) -> GateResult: ...
+
+
+DEFAULT_LOG_TAIL_BYTES = 16 * 1024
+
+
+REPORT_PATH_ENV = "SUPERVISOR_REPORT_PATH"
+DEFAULT_TIMEOUT_SECONDS = 900
+DEFAULT_KILL_GRACE_SECONDS = 10.0
+# Set by the supervisor from duration history; not part of the command identity.
+ADAPTIVE_TIMEOUT_KEY = "adaptive_timeout_seconds"
+
+
+def gate_env(gate_cfg: dict[str, Any], report_path: Path | None = None) -> dict[str, str] | None:
+    extra = {key: str(value) for key, value in gate_cfg.get("env", {}).items()}
+    if report_path is not None:
+        extra[REPORT_PATH_ENV] = str(report_path)
+    if not extra:
+        return None
+    return {**os.environ, **extra}
+
+
+def command_identity(gate_cfg: dict[str, Any]) -> dict[str, Any]:
+    return {
+        "command": gate_cfg["command"],
+        "cwd": gate_cfg.get("cwd", ""),
+        "env": {key: str(value) for key, value in sorted(gate_cfg.get("env", {}).items())},
+        "timeout_seconds": int(gate_cfg.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS)),
+    }
+
+
+def execution_key(gate_cfg: dict[str, Any], attempt: int) -> str:
+    """Identity of a gate execution: two gates with equal keys run the same process."""
+    material = {**command_identity(gate_cfg), "attempt": attempt}
+    digest = hashlib.sha256(json.dumps(material, sort_keys=True).encode("utf-8")).hexdigest()
+    return digest[:16]
+
+
+def output_excerpt(tail: bytes, total_bytes: int, log_path: str) -> str:
+    excerpt = tail.decode("utf-8", errors="replace")
+    if total_bytes <= len(tail):
+        return excerpt
+    where = f"; full log: {log_path}" if log_path else ""
+    return f"[... {total_bytes - len(tail)} earlier bytes truncated{where}]\n{excerpt}"
+
+
+def log_tail(handle: BinaryIO, limit: int, log_path: str) -> str:
+    size = handle.seek(0, os.SEEK_END)
+    handle.seek(max(0, size - limit))
+    return output_excerpt(handle.read(), size, log_path)
+
+
+def _open_log(log_dir: Path | None, stem: str, stream: str) -> tuple[BinaryIO, str]:
+    if log_dir is None:
+        return tempfile.TemporaryFile(), ""
+    path = log_dir / f"{stem}.{stream}.log"
+    return path.open("w+b"), str(path)
+
+
+def rusage_to_dict(usage: Any) -> dict[str, float]:
+    """Flatten a ``resource.struct_rusage`` for the gate's process tree."""
+    return {
+        "user_cpu_s": round(usage.ru_utime, 3),
+        "system_cpu_s": round(usage.ru_stime, 3),
+        "max_rss_kb": usage.ru_maxrss,
+        "block_input_ops": usage.ru_inblock,
+        "block_output_ops": usage.ru_oublock,
+        "voluntary_ctx_switches": usage.ru_nvcsw,
+        "involuntary_ctx_switches": usage.ru_nivcsw,
+    }
+
+
+def kill_process_group(pid: int) -> None:
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pid, signal.SIGKILL)
+
+
+def gate_timeout(gate_cfg: dict[str, Any]) -> float:
+    """Seconds the gate may run: its adaptive limit when one was set, else ``timeout_seconds``."""
+    adaptive = gate_cfg.get(ADAPTIVE_TIMEOUT_KEY)
+    return float(adaptive or gate_cfg.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS))
+
+
+def kill_grace(gate_cfg: dict[str, Any]) -> float:
+    return float(gate_cfg.get("kill_grace_seconds", DEFAULT_KILL_GRACE_SECONDS))
+
+
+def _group_alive(pid: int) -> bool:
+    try:
+        os.killpg(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def terminate_process_group(pid: int, grace: float, exited: Callable[[], bool]) -> None:
+    """SIGTERM the gate's process group, then SIGKILL whatever is left after ``grace`` seconds.
+
+    ``exited`` reports (and may reap) the group leader; the group counts as
+    gone once the leader has exited and no other member is left.
+    """
+    with contextlib.suppress(ProcessLookupError, PermissionError):
+        os.killpg(pid, signal.SIGTERM)
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline:
+        if exited() and not _group_alive(pid):
+            return
+        time.sleep(0.02)
+    kill_process_group(pid)
+
+
+def timed_out_stderr(stderr: str, timeout: float) -> str:
+    """The stderr excerpt of a timed-out gate, with a closing line saying so."""
+    if stderr and not stderr.endswith("\n"):
+        stderr += "\n"
+    return f"{stderr}[supervisor] timed out after {timeout:g}s; the process group was terminated\n"
+
+
+def _reap(proc: subprocess.Popen, flags: int) -> dict[str, float] | None:
+    pid, status, usage = os.wait4(proc.pid, flags)
+    if not pid:
+        return None
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    return rusage_to_dict(usage)
+
+
+def _wait_with_rusage(
+    proc: subprocess.Popen, timeout: float, cancel: CancelToken | None = None, grace: float = 0.0
+) -> tuple[dict[str, float], str]:
+    """Reap ``proc`` with ``wait4`` so its own resource usage can be recorded.
+
+    ``getrusage(RUSAGE_CHILDREN)`` would mix in every other gate running
+    concurrently; ``wait4`` reports just this child and its reaped descendants.
+    Returns the usage and how the process ended: ``exited``, ``cancelled``
+    (``cancel`` fired and the process group was killed) or ``timed-out`` (the
+    group was sent SIGTERM, then SIGKILL after ``grace`` seconds).
+    """
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while True:
+        resources = _reap(proc, os.WNOHANG)
+        if resources is not None:
+            return resources, "exited"
+        if cancel is not None and cancel.is_cancelled():
+            kill_process_group(proc.pid)
+            return _reap(proc, 0) or {}, "cancelled"
+        if time.monotonic() >= deadline:
+            reaped: list[dict[str, float]] = []
+
+            def _exited() -> bool:
+                if not reaped:
+                    usage = _reap(proc, os.WNOHANG)
+                    if usage is not None:
+                        reaped.append(usage)
+                return bool(reaped)
+
+            terminate_process_group(proc.pid, grace, _exited)
+            return (reaped[0] if reaped else _reap(proc, 0) or {}), "timed-out"
+        time.sleep(delay)
+        delay = min(delay * 2, 0.02)
+
+
+def _log_stem(gate_id: str, gate_cfg: dict[str, Any], attempt: int) -> str:
+    return f"{safe_id(gate_id)}-{execution_key(gate_cfg, attempt)[:8]}.a{attempt}"
+
+
+def open_gate_logs(
+    gate_id: str, gate_cfg: dict[str, Any], attempt: int, log_dir: str | Path | None
+) -> tuple[tuple[BinaryIO, str], tuple[BinaryIO, str]]:
+    """Open (handle, path) pairs for a gate execution's stdout and stderr logs."""
+    if log_dir is not None:
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+    stem = _log_stem(gate_id, gate_cfg, attempt)
+    return _open_log(log_dir, stem, "stdout"), _open_log(log_dir, stem, "stderr")
+
+
+def gate_report_path(
+    gate_id: str, gate_cfg: dict[str, Any], attempt: int, log_dir: str | Path | None
+) -> Path | None:
+    """Where a gate may write a machine-readable report (passed as ``SUPERVISOR_REPORT_PATH``)."""
+    if log_dir is None:
+        return None
+    return Path(log_dir) / f"{_log_stem(gate_id, gate_cfg, attempt)}.report.json"
+
+
+def report_ref(report_path: Path | None) -> str:
+    return str(report_path) if report_path is not None and report_path.is_file() else ""
+
+
+def run_gate(
+    gate_id: str,
+    gate_cfg: dict[str, Any],
+    attempt: int,
+    log_dir: str | Path | None = None,
+    progress: ProgressEmitter | None = None,
+    cancel: CancelToken | None = None,
+) -> GateResult:
+    """Run a gate command, streaming its output to per-gate log files.
+
+    Only the last ``log_tail_bytes`` of each stream are kept on the result;
+    ``log_ref``/``stderr_ref`` point at the complete logs under ``log_dir``.
+    Without ``log_dir`` the output goes to anonymous temporary files. A report
+    the command writes to ``$SUPERVISOR_REPORT_PATH`` is linked as ``report_ref``. The
+    command runs in its own process group, which is killed if ``cancel``
+    fires; the result is then ``cancelled`` with the output produced so far.
+    Past its timeout the group gets SIGTERM, then SIGKILL after
+    ``kill_grace_seconds``, and the result is ``timed-out``.
+    """
     cmd = gate_cfg["command"]
-    timeout = int(gate_cfg.get("timeout_seconds", 900))
-
-    start = time.monotonic()
-    proc = subprocess.run(
-        cmd,
-        shell=True,
-        capture_output=True,
-        text=True,
-        timeout=timeout,
-    )
-    duration_ms = int((time.monotonic() - start) * 1000)
+    if cancel is not None and cancel.is_cancelled():
+        return GateResult.not_run(gate_id, "cancelled", attempt, "Not run: cancelled", command=cmd)
+    timeout = gate_timeout(gate_cfg)
+    tail_bytes = int(gate_cfg.get("log_tail_bytes", DEFAULT_LOG_TAIL_BYTES))
+
+    (stdout_log, stdout_ref), (stderr_log, stderr_ref) = open_gate_logs(gate_id, gate_cfg, attempt, log_dir)
+    report_path = gate_report_path(gate_id, gate_cfg, attempt, log_dir)
+
+    if progress:
+        progress.emit("gate-started", gate_id=gate_id, attempt=attempt, command=cmd)
+    with stdout_log, stderr_log:
+        start = time.monotonic()
+        proc = subprocess.Popen(
+            cmd,
+            shell=True,
+            stdout=stdout_log,
+            stderr=stderr_log,
+            cwd=gate_cfg.get("cwd") or None,
+            env=gate_env(gate_cfg, report_path),
+            start_new_session=True,
+        )
+        resources, ended = _wait_with_rusage(proc, timeout, cancel, kill_grace(gate_cfg))
+        duration_ms = int((time.monotonic() - start) * 1000)
+
+        stdout = log_tail(stdout_log, tail_bytes, stdout_ref)
+        stderr = log_tail(stderr_log, tail_bytes, stderr_ref)
 
-    status = "passed" if proc.returncode == 0 else "failed"
-    return GateResult(
+    if ended == "exited":
+        status = "passed" if proc.returncode == 0 else "failed"
+    else:
+        status = ended
+    if status == "timed-out":
+        stderr = timed_out_stderr(stderr, timeout)
+    if progress:
+        progress.emit(
+            "gate-finished",
+            gate_id=gate_id,
+            attempt=attempt,
+            status=status,
+            return_code=proc.returncode,
+            duration_ms=duration_ms,
+        )
+    result = GateResult(
         gate_id=gate_id,
         status=status,
         attempt=attempt,
         duration_ms=duration_ms,
         command=cmd,
-        stdout=proc.stdout,
-        stderr=proc.stderr,
+        stdout=stdout,
+        stderr=stderr,
         return_code=proc.returncode,
+        log_ref=stdout_ref,
+        stderr_ref=stderr_ref,
+        report_ref=report_ref(report_path),
+        resources=resources,
     )
+    return with_test_outcomes(result, gate_cfg)
+
+
+class SingleFlightGateRunner:
+    """Runs each distinct gate execution once per supervisor run.
+
+    Calls are keyed by ``execution_key``; the first caller runs the gate and
+    every concurrent or later caller with the same key receives a copy of its
+    result marked ``source="shared"``. Cancelled executions are not shared
+    with callers that are still live.
+    """
+
+    def __init__(self, run_fn: GateRunFn = run_gate) -> None:
+        self._run_fn = run_fn
+        self._lock = threading.Lock()
+        self._flights: dict[str, Future[GateResult]] = {}
+
+    def run(
+        self,
+        gate_id: str,
+        gate_cfg: dict[str, Any],
+        attempt: int,
+        cancel: CancelToken | None = None,
+    ) -> GateResult:
+        key = execution_key(gate_cfg, attempt)
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                owner = flight is None
+                if flight is None:
+                    flight = Future()
+                    self._flights[key] = flight
+
+            if owner:
+                break
+            shared = flight.result()
+            # A cancelled owner says nothing about this caller's gate; run it again
+            # unless this caller has been cancelled too.
+            if shared.status != "cancelled" or (cancel is not None and cancel.is_cancelled()):
+                return replace(shared, gate_id=gate_id, source="shared")
+
+        try:
+            result = self._run_fn(gate_id, gate_cfg, attempt, cancel=cancel)
+        except BaseException as exc:
+            flight.set_exception(exc)
+            raise
+        result.execution_key = key
+        if result.status == "cancelled":
+            with self._lock:
+                self._flights.pop(key, None)
+        flight.set_result(replace(result))
+        return result
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from harness.cancellation import CancelToken
+from harness.types import GateResult
+
+
+GateFn = Callable[[str], GateResult]
+
+
+@dataclass(frozen=True)
+class GateEdges:
+    needs: tuple[str, ...] = ()  # must have passed before the gate may run
+    after: tuple[str, ...] = ()  # ordering only; outcome is ignored
+
+
+def gate_edges(gate_ids: list[str], gates_cfg: dict[str, Any]) -> dict[str, GateEdges]:
+    wanted = set(gate_ids)
+    edges: dict[str, GateEdges] = {}
+    for gate_id in gate_ids:
+        cfg = gates_cfg.get(gate_id, {})
+        edges[gate_id] = GateEdges(
+            needs=tuple(dep for dep in cfg.get("needs", []) if dep in wanted),
+            after=tuple(dep for dep in cfg.get("after", []) if dep in wanted),
+        )
+    return edges
+
+
+def find_dependency_cycle(graph: dict[str, list[str]]) -> list[str] | None:
+    visiting: list[str] = []
+    state: dict[str, int] = {}  # 1 = on stack, 2 = done
+
+    def visit(node: str) -> list[str] | None:
+        state[node] = 1
+        visiting.append(node)
+        for dep in graph.get(node, []):
+            if state.get(dep) == 1:
+                return visiting[visiting.index(dep):] + [dep]
+            if dep not in state:
+                cycle = visit(dep)
+                if cycle:
+                    return cycle
+        visiting.pop()
+        state[node] = 2
+        return None
+
+    for node in graph:
+        if node not in state:
+            cycle = visit(node)
+            if cycle:
+                return cycle
+    return None
+
+
+def run_gate_graph(
+    gate_ids: list[str],
+    attempt: int,
+    run_gate_fn: GateFn,
+    edges: dict[str, GateEdges] | None = None,
+    max_workers: int = 1,
+    sort_key: Callable[[str], Any] | None = None,
+    cancel: CancelToken | None = None,
+    on_result: Callable[[GateResult], None] | None = None,
+) -> list[GateResult]:
+    """Run one attempt's gates, starting each as soon as its dependencies finish.
+
+    Independent gates share a pool of ``max_workers`` threads. A gate whose
+    ``needs`` did not pass is recorded as ``blocked`` instead of being run.
+    When several gates are ready, ``sort_key`` picks which start first.
+    Once ``cancel`` fires, gates that have not started are recorded as
+    ``cancelled``; ``on_result`` sees each executed result as it lands.
+    Results are returned in ``gate_ids`` order regardless of completion order.
+    """
+    edges = edges or {}
+    batch = set(gate_ids)
+    deps: dict[str, set[str]] = {}
+    for gate_id in gate_ids:
+        entry = edges.get(gate_id, GateEdges())
+        deps[gate_id] = {dep for dep in (*entry.needs, *entry.after) if dep in batch}
+    results: dict[str, GateResult] = {}
+    waiting = list(gate_ids)
+    running: dict[Future[GateResult], str] = {}
+    workers = max(1, max_workers)
+
+    def _ready() -> list[str]:
+        ready = [gate_id for gate_id in waiting if deps[gate_id].issubset(results)]
+        return sorted(ready, key=sort_key) if sort_key else ready
+
+    pool = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while waiting or running:
+            for gate_id in _ready():
+                if len(running) >= workers:
+                    break
+                waiting.remove(gate_id)
+                needs = [dep for dep in edges.get(gate_id, GateEdges()).needs if dep in results]
+                missing = [dep for dep in needs if not results[dep].passed]
+                if missing and not any(results[dep].status == "cancelled" for dep in missing):
+                    reason = f"Not run: required gate(s) did not pass: {', '.join(missing)}"
+                    results[gate_id] = GateResult.not_run(gate_id, "blocked", attempt, reason)
+                    continue
+                if missing or (cancel and cancel.is_cancelled()):
+                    results[gate_id] = GateResult.not_run(gate_id, "cancelled", attempt, "Not run: cancelled")
+                    continue
+                if pool is None:
+                    results[gate_id] = run_gate_fn(gate_id)
+                    if on_result:
+                        on_result(results[gate_id])
+                    continue
+                running[pool.submit(run_gate_fn, gate_id)] = gate_id
+
+            if running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    results[running.pop(future)] = result
+                    if on_result:
+                        on_result(result)
+            elif waiting and not _ready():
+                raise RuntimeError(f"Gate dependency cycle among: {', '.join(waiting)}")
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    return [results[gate_id] for gate_id in gate_ids]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+from typing import Any
+
+from harness.path_globs import matches_any
+
+
+def _git_paths(root: Path, *args: str) -> list[str]:
+    proc = subprocess.run(["git", *args], cwd=root, check=False, capture_output=True)
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"git {' '.join(args)} failed: {stderr}")
+    return [entry for entry in proc.stdout.decode("utf-8", "surrogateescape").split("\0") if entry]
+
+
+def changed_files_since(base_sha: str, root: str | Path = ".") -> set[str]:
+    """Repo-relative paths that differ between ``base_sha`` and the working tree.
+
+    Covers committed, staged and unstaged changes (both sides of a rename) plus
+    untracked files that are not ignored.
+    """
+    root = Path(root)
+    verify = subprocess.run(
+        ["git", "rev-parse", "--verify", f"{base_sha}^{{commit}}"],
+        cwd=root,
+        check=False,
+        capture_output=True,
+        text=True,
+    )
+    if verify.returncode != 0:
+        raise RuntimeError(f"Invalid git commit for --since: {base_sha}: {verify.stderr.strip()}")
+
+    changed = set(_git_paths(root, "diff", "--name-only", "--no-renames", "-z", base_sha, "--"))
+    changed.update(_git_paths(root, "ls-files", "-z", "-o", "--exclude-standard"))
+    return changed
+
+
+def gate_affected(gate_cfg: dict[str, Any], changed: set[str]) -> bool:
+    """Whether any changed file matches the gate's ``inputs``; gates without inputs always run."""
+    patterns = gate_cfg.get("inputs")
+    if not patterns:
+        return True
+    return any(matches_any(path, patterns) for path in changed)
+
+
+def unaffected_gates(gates_cfg: dict[str, dict[str, Any]], changed: set[str]) -> set[str]:
+    return {gate_id for gate_id, cfg in gates_cfg.items() if not gate_affected(cfg, changed)}
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import io
+import json
+import os
+import tokenize
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from harness.content_cache import ContentCache
+
+
+ENGINE_VERSION = 1
+PARALLEL_MIN_FILES = 200
+
+# A visitor yields (line, column, message) for each problem it sees.
+LineVisitor = Callable[[int, str], Iterable[tuple[int, int, str]]]
+TokenVisitor = Callable[[tokenize.TokenInfo], Iterable[tuple[int, int, str]]]
+
+
+@dataclass(frozen=True)
+class LintRule:
+    code: str
+    description: str
+    line_visitor: LineVisitor | None = None
+    token_visitor: TokenVisitor | None = None
+
+
+@dataclass(frozen=True, order=True)
+class LintIssue:
+    path: str
+    line: int
+    column: int
+    rule: str
+    message: str
+
+
+RULES: dict[str, LintRule] = {}
+
+
+def register(rule: LintRule) -> LintRule:
+    if rule.code in RULES:
+        raise ValueError(f"Duplicate lint rule: {rule.code}")
+    RULES[rule.code] = rule
+    return rule
+
+
+def line_rule(code: str, description: str) -> Callable[[LineVisitor], LineVisitor]:
+    def decorator(visitor: LineVisitor) -> LineVisitor:
+        register(LintRule(code, description, line_visitor=visitor))
+        return visitor
+
+    return decorator
+
+
+def token_rule(code: str, description: str) -> Callable[[TokenVisitor], TokenVisitor]:
+    def decorator(visitor: TokenVisitor) -> TokenVisitor:
+        register(LintRule(code, description, token_visitor=visitor))
+        return visitor
+
+    return decorator
+
+
+@line_rule("trailing-whitespace", "Lines must not end in whitespace")
+def _trailing_whitespace(lineno: int, line: str) -> Iterable[tuple[int, int, str]]:
+    stripped = line.rstrip()
+    if stripped != line:
+        yield lineno, len(stripped) + 1, "trailing whitespace"
+
+
+@line_rule("no-tabs", "Tab characters are not allowed")
+def _tabs(lineno: int, line: str) -> Iterable[tuple[int, int, str]]:
+    column = line.find("\t")
+    if column != -1:
+        yield lineno, column + 1, "tab character not allowed"
+
+
+def _visitor_source(visitor: Callable[..., Any]) -> str:
+    try:
+        return inspect.getsource(visitor)
+    except (OSError, TypeError):
+        return visitor.__code__.co_code.hex()  # defined somewhere without readable source
+
+
+def rules_digest(codes: Iterable[str]) -> str:
+    """Cache key for a rule selection; changes with the engine or any selected rule's code."""
+    digest = hashlib.sha256(json.dumps({"version": ENGINE_VERSION}).encode("utf-8"))
+    digest.update(Path(__file__).read_bytes())
+    for code in sorted(codes):
+        rule = RULES[code]
+        visitor = rule.line_visitor or rule.token_visitor
+        digest.update(f"\0{code}\0{rule.description}\0{_visitor_source(visitor)}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def lint_source(path: str, text: str, codes: Iterable[str]) -> list[LintIssue]:
+    """Apply every selected rule in one pass over the lines (and, if needed, one over the tokens)."""
+    rules = [RULES[code] for code in codes]
+    line_rules = [rule for rule in rules if rule.line_visitor]
+    token_rules = [rule for rule in rules if rule.token_visitor]
+    issues: list[LintIssue] = []
+
+    for lineno, line in enumerate(text.splitlines(), start=1):
+        for rule in line_rules:
+            for line_no, column, message in rule.line_visitor(lineno, line):
+                issues.append(LintIssue(path, line_no, column, rule.code, message))
+
+    if token_rules:
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(text).readline):
+                for rule in token_rules:
+                    for line_no, column, message in rule.token_visitor(token):
+                        issues.append(LintIssue(path, line_no, column, rule.code, message))
+        except (tokenize.TokenError, SyntaxError) as exc:
+            issues.append(LintIssue(path, 1, 0, "tokenize", f"could not tokenize: {exc}"))
+    return issues
+
+
+def lint_file(root: str | Path, path: str, codes: tuple[str, ...]) -> list[LintIssue]:
+    try:
+        text = (Path(root) / path).read_bytes().decode("utf-8")
+    except UnicodeDecodeError as exc:
+        return [LintIssue(path, 1, 0, "encoding", f"not valid UTF-8: {exc.reason}")]
+    except OSError:
+        return []  # deleted since listing
+    return lint_source(path, text, codes)
+
+
+def _lint_batch(root: str, paths: list[str], codes: tuple[str, ...]) -> list[LintIssue]:
+    return [issue for path in paths for issue in lint_file(root, path, codes)]
+
+
+def lint_paths(
+    root: str | Path,
+    paths: list[str],
+    codes: Iterable[str] | None = None,
+    workers: int | None = None,
+    fingerprints: dict[str, str] | None = None,
+    cache: ContentCache | None = None,
+) -> list[LintIssue]:
+    """Lint ``paths`` under ``root`` with the selected rules (default: all registered).
+
+    Files fan out over a process pool once there are enough of them; with
+    ``cache`` and the tree's ``fingerprints``, files whose content was linted
+    before under the same rule set are not read again.
+    """
+    codes = tuple(sorted(codes if codes is not None else RULES))
+    issues: list[LintIssue] = []
+    pending = paths
+    if cache is not None and fingerprints is not None:
+        pending = []
+        for path in paths:
+            cached = cache.get(fingerprints[path]) if path in fingerprints else None
+            if cached is None:
+                pending.append(path)
+            else:
+                issues.extend(LintIssue(path, *entry) for entry in cached)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(pending) >= PARALLEL_MIN_FILES:
+        batches = [pending[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(_lint_batch, [str(root)] * workers, batches, [codes] * workers)
+            linted = [issue for batch in results for issue in batch]
+    else:
+        linted = _lint_batch(str(root), pending, codes)
+    issues.extend(linted)
+
+    if cache is not None and fingerprints is not None:
+        by_path: dict[str, list[list[Any]]] = {path: [] for path in pending}
+        for issue in linted:
+            by_path[issue.path].append([issue.line, issue.column, issue.rule, issue.message])
+        for path, entries in by_path.items():
+            if path in fingerprints:
+                cache.put(fingerprints[path], entries)
+    return sorted(issues)
+
+
+def to_json(issues: list[LintIssue], codes: Iterable[str]) -> dict[str, Any]:
+    return {
+        "tool": "harness-lint",
+        "rules": sorted(codes),
+        "issue_count": len(issues),
+        "issues": [asdict(issue) for issue in issues],
+    }
+
+
+def to_sarif(issues: list[LintIssue], codes: Iterable[str]) -> dict[str, Any]:
+    known = {code: RULES[code].description for code in codes if code in RULES}
+    known.update({"encoding": "File must be valid UTF-8", "tokenize": "File must tokenize as Python"})
+    return {
+        "$schema": "https://json.schemastore.org/sarif-2.1.0.json",
+        "version": "2.1.0",
+        "runs": [
+            {
+                "tool": {
+                    "driver": {
+                        "name": "harness-lint",
+                        "rules": [
+                            {"id": code, "shortDescription": {"text": description}}
+                            for code, description in sorted(known.items())
+                        ],
+                    }
+                },
+                "results": [
+                    {
+                        "ruleId": issue.rule,
+                        "level": "error",
+                        "message": {"text": issue.message},
+                        "locations": [
+                            {
+                                "physicalLocation": {
+                                    "artifactLocation": {"uri": issue.path},
+                                    "region": {"startLine": issue.line, "startColumn": max(issue.column, 1)},
+                                }
+                            }
+                        ],
+                    }
+                    for issue in issues
+                ],
+            }
+        ],
+    }
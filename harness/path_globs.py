@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def glob_to_regex(pattern: str) -> re.Pattern[str]:
+    """Translate a repo-relative glob (``*``, ``?``, ``**``) into a regex.
+
+    ``*`` and ``?`` never cross ``/``; ``**/`` matches zero or more directories.
+    """
+    out: list[str] = []
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        elif pattern[i] == "*":
+            out.append("[^/]*")
+            i += 1
+        elif pattern[i] == "?":
+            out.append("[^/]")
+            i += 1
+        else:
+            out.append(re.escape(pattern[i]))
+            i += 1
+    return re.compile("".join(out) + r"\Z")
+
+
+def matches_any(path: str, patterns: list[str] | tuple[str, ...]) -> bool:
+    return any(glob_to_regex(pattern).match(path) for pattern in patterns)
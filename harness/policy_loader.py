@@ -2,14 +2,97 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
+
+from harness.gate_scheduler import find_dependency_cycle
+from harness.profile_resolver import profile_closure, resolve_gates, resolve_profiles
+from harness.python_pool import RUNNER as PYTHON_POOL_RUNNER
+from harness.python_pool import RUNNERS, parse_python_command
+from harness.test_report import REPORT_FORMATS
+from harness.types import ProfileResolution
 
 
 class PolicyError(ValueError):
     pass
 
 
-def load_policy(policy_file: str | Path) -> dict[str, Any]:
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _is_number(value: Any, minimum: float, strict: bool = False, integer: bool = False) -> bool:
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        return False
+    return value > minimum if strict else value >= minimum
+
+
+class CompiledPolicy(Mapping[str, Any]):
+    """A validated, read-only policy with memoised profile and gate resolution.
+
+    Reads like the policy JSON (nested objects are read-only mappings, lists are
+    tuples). Profile ``extends`` closures are computed once up front; each
+    distinct tag set and profile list is resolved once and then served from a
+    dictionary.
+    """
+
+    def __init__(self, policy: dict[str, Any]) -> None:
+        validate_policy(policy)
+        self._data = _freeze(policy)
+        self.closures = MappingProxyType(
+            {name: tuple(profile_closure(name, self._data["profiles"])) for name in self._data["profiles"]}
+        )
+        self._resolutions: dict[tuple[str, ...], ProfileResolution] = {}
+        self._gates: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def to_dict(self) -> dict[str, Any]:
+        """A mutable deep copy of the policy JSON."""
+        return _thaw(self._data)
+
+    def resolve(self, task_tags: list[str]) -> ProfileResolution:
+        key = tuple(task_tags)
+        resolution = self._resolutions.get(key)
+        if resolution is None:
+            resolution = self._resolutions[key] = resolve_profiles(list(key), self, self.closures)
+        # Fresh lists so callers cannot alter the memoised resolution.
+        return ProfileResolution(
+            profiles=list(resolution.profiles),
+            blocking_profiles=list(resolution.blocking_profiles),
+            advisory_profiles=list(resolution.advisory_profiles),
+            unknown_tags=list(resolution.unknown_tags),
+            warnings=list(resolution.warnings),
+        )
+
+    def gates_for(self, profiles: list[str]) -> list[str]:
+        key = tuple(profiles)
+        gates = self._gates.get(key)
+        if gates is None:
+            gates = self._gates[key] = tuple(resolve_gates(list(key), self))
+        return list(gates)
+
+
+def load_policy(policy_file: str | Path) -> CompiledPolicy:
     path = Path(policy_file)
     if not path.exists():
         raise FileNotFoundError(f"Policy file not found: {path}")
@@ -17,8 +100,7 @@ def load_policy(policy_file: str | Path) -> dict[str, Any]:
     with path.open("r", encoding="utf-8") as handle:
         policy = json.load(handle)
 
-    validate_policy(policy)
-    return policy
+    return CompiledPolicy(policy)
 
 
 def validate_policy(policy: dict[str, Any]) -> None:
@@ -62,10 +144,114 @@ def validate_policy(policy: dict[str, Any]) -> None:
                     f"profiles.{profile_name}.extends references unknown profile: {parent}"
                 )
 
+    extends_cycle = find_dependency_cycle(
+        {name: list(cfg.get("extends", [])) for name, cfg in policy["profiles"].items()}
+    )
+    if extends_cycle:
+        raise PolicyError(f"Profile extends cycle: {' -> '.join(extends_cycle)}")
+
     include_ids = policy["pilot"].get("include_task_ids", [])
     if not isinstance(include_ids, list):
         raise PolicyError("pilot.include_task_ids must be a list")
 
+    pool_cfg = policy.get("python_pool", {})
+    if not isinstance(pool_cfg.get("preload", []), list):
+        raise PolicyError("python_pool.preload must be a list of module names")
+    recycle_after = pool_cfg.get("recycle_after", 1)
+    if not isinstance(recycle_after, int) or recycle_after < 1:
+        raise PolicyError("python_pool.recycle_after must be an integer >= 1")
+
+    for setup_id, setup_cfg in policy.get("setup", {}).items():
+        if not setup_cfg.get("command"):
+            raise PolicyError(f"setup.{setup_id}.command is required")
+        key_inputs = setup_cfg.get("key_inputs", [])
+        if not isinstance(key_inputs, list) or not all(isinstance(item, str) and item for item in key_inputs):
+            raise PolicyError(f"setup.{setup_id}.key_inputs must be a list of path globs")
+        outputs = setup_cfg.get("outputs", [])
+        if not isinstance(outputs, list) or not all(
+            isinstance(item, str) and item and not Path(item).is_absolute() and ".." not in Path(item).parts
+            for item in outputs
+        ):
+            raise PolicyError(f"setup.{setup_id}.outputs must be a list of paths inside the repository")
+
+    gate_graph: dict[str, list[str]] = {}
     for gate_id, gate_cfg in policy["gates"].items():
         if not gate_cfg.get("command"):
             raise PolicyError(f"gates.{gate_id}.command is required")
+        for key in ("needs", "after"):
+            deps = gate_cfg.get(key, [])
+            if not isinstance(deps, list):
+                raise PolicyError(f"gates.{gate_id}.{key} must be a list")
+            for dep in deps:
+                if dep not in policy["gates"]:
+                    raise PolicyError(f"gates.{gate_id}.{key} references missing gate: {dep}")
+            gate_graph.setdefault(gate_id, []).extend(deps)
+        runner = gate_cfg.get("runner", "subprocess")
+        if runner not in RUNNERS:
+            raise PolicyError(f"gates.{gate_id}.runner must be one of: {', '.join(RUNNERS)}")
+        if runner == PYTHON_POOL_RUNNER and parse_python_command(gate_cfg["command"]) is None:
+            raise PolicyError(
+                f"gates.{gate_id}.command must be a plain 'python3 -m module' or 'python3 script.py' "
+                f"command to use the {PYTHON_POOL_RUNNER} runner"
+            )
+        test_report = gate_cfg.get("test_report")
+        if test_report is not None and test_report not in REPORT_FORMATS:
+            raise PolicyError(f"gates.{gate_id}.test_report must be one of: {', '.join(REPORT_FORMATS)}")
+        inputs = gate_cfg.get("inputs", [])
+        if not isinstance(inputs, list) or not all(isinstance(item, str) for item in inputs):
+            raise PolicyError(f"gates.{gate_id}.inputs must be a list of path globs")
+        resources = gate_cfg.get("resources", {})
+        if not isinstance(resources, dict) or set(resources) - {"cpu", "memory_mb"}:
+            raise PolicyError(f"gates.{gate_id}.resources may only set cpu and memory_mb")
+        if not _is_number(resources.get("cpu", 1), minimum=0, strict=True):
+            raise PolicyError(f"gates.{gate_id}.resources.cpu must be a number > 0")
+        if not _is_number(resources.get("memory_mb", 0), minimum=0, integer=True):
+            raise PolicyError(f"gates.{gate_id}.resources.memory_mb must be an integer >= 0")
+        if not _is_number(gate_cfg.get("kill_grace_seconds", 0), minimum=0):
+            raise PolicyError(f"gates.{gate_id}.kill_grace_seconds must be a number >= 0")
+        if not isinstance(gate_cfg.get("adaptive_timeout", True), bool):
+            raise PolicyError(f"gates.{gate_id}.adaptive_timeout must be true or false")
+        locks = gate_cfg.get("locks", [])
+        if not isinstance(locks, list) or not all(isinstance(item, str) and item for item in locks):
+            raise PolicyError(f"gates.{gate_id}.locks must be a list of lock names")
+        setup_ids = gate_cfg.get("setup", [])
+        if not isinstance(setup_ids, list):
+            raise PolicyError(f"gates.{gate_id}.setup must be a list")
+        for setup_id in setup_ids:
+            if setup_id not in policy.get("setup", {}):
+                raise PolicyError(f"gates.{gate_id}.setup references missing setup phase: {setup_id}")
+
+    cycle = find_dependency_cycle(gate_graph)
+    if cycle:
+        raise PolicyError(f"Gate dependency cycle: {' -> '.join(cycle)}")
+
+    max_parallel = policy.get("scheduler", {}).get("max_parallel_gates", 1)
+    if not isinstance(max_parallel, int) or max_parallel < 1:
+        raise PolicyError("scheduler.max_parallel_gates must be an integer >= 1")
+    max_processes = policy.get("scheduler", {}).get("max_gate_processes")
+    if max_processes is not None and (not isinstance(max_processes, int) or max_processes < 1):
+        raise PolicyError("scheduler.max_gate_processes must be an integer >= 1")
+
+    capacity = policy.get("scheduler", {}).get("capacity", {})
+    if not _is_number(capacity.get("cpu", 1), minimum=0, strict=True):
+        raise PolicyError("scheduler.capacity.cpu must be a number > 0")
+    if not _is_number(capacity.get("memory_mb", 1), minimum=1, integer=True):
+        raise PolicyError("scheduler.capacity.memory_mb must be an integer >= 1")
+
+    timeouts = policy.get("timeouts", {})
+    if not isinstance(timeouts.get("adaptive", False), bool):
+        raise PolicyError("timeouts.adaptive must be true or false")
+    quantile = timeouts.get("quantile", 0.99)
+    if not _is_number(quantile, minimum=0, strict=True) or quantile > 1:
+        raise PolicyError("timeouts.quantile must be a number in (0, 1]")
+    for key in ("factor", "min_seconds"):
+        if not _is_number(timeouts.get(key, 1), minimum=0, strict=True):
+            raise PolicyError(f"timeouts.{key} must be a number > 0")
+    if not _is_number(timeouts.get("min_samples", 1), minimum=1, integer=True):
+        raise PolicyError("timeouts.min_samples must be an integer >= 1")
+
+    max_bytes = policy.get("cache", {}).get("max_bytes")
+    if max_bytes is not None and (not isinstance(max_bytes, int) or max_bytes < 1):
+        raise PolicyError("cache.max_bytes must be an integer >= 1")
+    if not _is_number(policy.get("cache", {}).get("setup_keep", 1), minimum=1, integer=True):
+        raise PolicyError("cache.setup_keep must be an integer >= 1")
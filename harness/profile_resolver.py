@@ -1,21 +1,38 @@
 from __future__ import annotations
 
 from collections import OrderedDict
-from typing import Any
+from typing import Any, Mapping
 
 from harness.types import ProfileResolution
 
 
-def _expand_profile(profile: str, profiles_cfg: dict[str, Any], ordered: OrderedDict[str, None]) -> None:
+def _expand_profile(
+    profile: str,
+    profiles_cfg: Mapping[str, Any],
+    ordered: OrderedDict[str, None],
+    visiting: frozenset[str] = frozenset(),
+) -> None:
     cfg = profiles_cfg.get(profile)
-    if not cfg:
-        return
+    if not cfg or profile in visiting:
+        return  # unknown, or an extends cycle (rejected by policy validation)
     for parent in cfg.get("extends", []):
-        _expand_profile(parent, profiles_cfg, ordered)
+        _expand_profile(parent, profiles_cfg, ordered, visiting | {profile})
     ordered.setdefault(profile, None)
 
 
-def resolve_profiles(task_tags: list[str], policy: dict[str, Any]) -> ProfileResolution:
+def profile_closure(profile: str, profiles_cfg: Mapping[str, Any]) -> list[str]:
+    """``profile`` and everything it extends, parents first."""
+    ordered: OrderedDict[str, None] = OrderedDict()
+    _expand_profile(profile, profiles_cfg, ordered)
+    return list(ordered)
+
+
+def resolve_profiles(
+    task_tags: list[str],
+    policy: Mapping[str, Any],
+    closures: Mapping[str, tuple[str, ...]] | None = None,
+) -> ProfileResolution:
+    """Profiles selected by ``task_tags``; ``closures`` maps each profile to its precomputed expansion."""
     profiles_cfg = policy["profiles"]
     tags_map = policy["tags_to_profiles"]
     default_profile = policy["defaults"]["default_profile"]
@@ -24,6 +41,13 @@ def resolve_profiles(task_tags: list[str], policy: dict[str, Any]) -> ProfileRes
     warnings: list[str] = []
     selected: OrderedDict[str, None] = OrderedDict()
 
+    def expand(profile: str) -> None:
+        if closures is None:
+            _expand_profile(profile, profiles_cfg, selected)
+        else:
+            for name in closures.get(profile, ()):
+                selected.setdefault(name, None)
+
     for tag in task_tags:
         mapped = tags_map.get(tag)
         if not mapped:
@@ -31,10 +55,10 @@ def resolve_profiles(task_tags: list[str], policy: dict[str, Any]) -> ProfileRes
             warnings.append(f"Unknown task tag: {tag}")
             continue
         for profile in mapped:
-            _expand_profile(profile, profiles_cfg, selected)
+            expand(profile)
 
     if not selected:
-        _expand_profile(default_profile, profiles_cfg, selected)
+        expand(default_profile)
 
     profiles = list(selected.keys())
     blocking_profiles = [p for p in profiles if profiles_cfg[p]["blocking"]]
@@ -49,7 +73,7 @@ def resolve_profiles(task_tags: list[str], policy: dict[str, Any]) -> ProfileRes
     )
 
 
-def resolve_gates(profiles: list[str], policy: dict[str, Any]) -> list[str]:
+def resolve_gates(profiles: list[str], policy: Mapping[str, Any]) -> list[str]:
     seen: OrderedDict[str, None] = OrderedDict()
     for profile in profiles:
         for gate in policy["profiles"][profile]["gates"]:
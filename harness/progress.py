@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, TextIO
+
+
+MAX_OUTPUT_LINE_CHARS = 1000
+
+
+class ProgressEmitter:
+    """Writes structured progress events as NDJSON, one flushed line per event.
+
+    ``target`` is a file path, or ``-`` for stderr (stdout carries the summary).
+    Safe to call from scheduler threads and the async engine's loop thread.
+    """
+
+    def __init__(self, target: str | Path) -> None:
+        self._lock = threading.Lock()
+        self._owns_handle = str(target) != "-"
+        if self._owns_handle:
+            Path(target).parent.mkdir(parents=True, exist_ok=True)
+            self._handle: TextIO = open(target, "a", encoding="utf-8")
+        else:
+            self._handle = sys.stderr
+
+    def emit(self, event: str, **fields: Any) -> None:
+        record = {"event": event, "ts": round(time.time(), 3), **fields}
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def output(self, gate_id: str, attempt: int, stream: str, line: str) -> None:
+        if len(line) > MAX_OUTPUT_LINE_CHARS:
+            line = line[:MAX_OUTPUT_LINE_CHARS] + "..."
+        self.emit("gate-output", gate_id=gate_id, attempt=attempt, stream=stream, line=line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._owns_handle:
+                self._handle.close()
@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import importlib
+import itertools
+import json
+import os
+import re
+import runpy
+import selectors
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Any
+
+from harness.cancellation import CancelToken
+from harness.gate_runner import (
+    DEFAULT_LOG_TAIL_BYTES,
+    REPORT_PATH_ENV,
+    gate_report_path,
+    gate_timeout,
+    kill_grace,
+    kill_process_group,
+    log_tail,
+    open_gate_logs,
+    report_ref,
+    rusage_to_dict,
+    terminate_process_group,
+    timed_out_stderr,
+)
+from harness.progress import ProgressEmitter
+from harness.test_report import with_test_outcomes
+from harness.types import GateResult
+
+
+RUNNER = "python-pool"
+RUNNERS = ("subprocess", RUNNER)
+DEFAULT_PRELOAD = ("unittest", "harness.policy_loader", "harness.unittest_runner", "harness.lint_engine")
+DEFAULT_RECYCLE_AFTER = 200
+MAX_MESSAGE_BYTES = 1024 * 1024
+POLL_SECONDS = 0.02
+
+_HARNESS_ROOT = Path(__file__).resolve().parents[1]
+_PYTHON = re.compile(r"^python(\d+(\.\d+)?)?$")
+_SHELL_SYNTAX = re.compile(r"[;&|<>`$(){}*?~]")
+
+
+def parse_python_command(command: str) -> dict[str, Any] | None:
+    """``{"module"|"path": ..., "args": [...]}`` for a plain ``python3 -m mod ...`` or
+    ``python3 script.py ...`` command; None for anything that needs a shell.
+    """
+    if _SHELL_SYNTAX.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if len(argv) < 2 or not _PYTHON.match(os.path.basename(argv[0])):
+        return None
+    if argv[1] == "-m":
+        return {"module": argv[2], "args": argv[3:]} if len(argv) > 2 else None
+    if argv[1].startswith("-"):
+        return None
+    return {"path": argv[1], "args": argv[2:]}
+
+
+# --- zygote (runs in the pool process) -------------------------------------------------------
+
+
+def _run_child(request: dict[str, Any], stdout_fd: int, stderr_fd: int) -> int:
+    os.setsid()
+    os.dup2(stdout_fd, 1)
+    os.dup2(stderr_fd, 2)
+    os.close(stdout_fd)
+    os.close(stderr_fd)
+    null = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(null, 0)
+    os.close(null)
+    os.environ.update(request.get("env", {}))
+    if request.get("cwd"):
+        os.chdir(request["cwd"])
+
+    try:
+        if "module" in request:
+            sys.argv = [request["module"], *request["args"]]
+            sys.path[0] = os.getcwd()
+            sys.modules.pop(request["module"], None)
+            runpy.run_module(request["module"], run_name="__main__", alter_sys=True)
+        else:
+            sys.argv = [request["path"], *request["args"]]
+            sys.path[0] = os.path.dirname(os.path.abspath(request["path"]))
+            runpy.run_path(request["path"], run_name="__main__")
+        code = 0
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            code = exc.code or 0
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    with contextlib.suppress(Exception):
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return code
+
+
+def serve(sock: socket.socket, preload: list[str]) -> None:
+    """Zygote loop: fork a pre-imported child per request and report its exit.
+
+    Each request carries the gate's stdout/stderr log descriptors; the child
+    starts its own session (so the supervisor can kill its process group),
+    runs the module or script as ``__main__`` and exits with its status.
+    """
+    for module in preload:
+        try:
+            importlib.import_module(module)
+        except Exception as exc:  # a broken preload only costs the warm start
+            print(f"python-pool: could not preload {module}: {exc}", file=sys.stderr)
+
+    wake_read, wake_write = os.pipe()
+    os.set_blocking(wake_write, False)
+    signal.set_wakeup_fd(wake_write)
+    signal.signal(signal.SIGCHLD, lambda *_: None)
+    parent = os.getppid()
+
+    selector = selectors.DefaultSelector()
+    selector.register(sock, selectors.EVENT_READ)
+    selector.register(wake_read, selectors.EVENT_READ)
+    children: dict[int, str] = {}
+    accepting = True
+
+    while accepting or children:
+        for key, _ in selector.select(timeout=1.0):
+            if key.fileobj is wake_read:
+                os.read(wake_read, 4096)
+                continue
+            data, fds, _, _ = socket.recv_fds(sock, MAX_MESSAGE_BYTES, 2)
+            request = json.loads(data)
+            if request.get("op") == "shutdown":
+                accepting = False
+                continue
+            pid = os.fork()
+            if pid == 0:
+                signal.set_wakeup_fd(-1)
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                selector.close()
+                sock.close()
+                os.close(wake_read)
+                os.close(wake_write)
+                os._exit(_run_child(request, *fds))
+            for fd in fds:
+                os.close(fd)
+            children[pid] = request["id"]
+            sock.send(json.dumps({"id": request["id"], "pid": pid}).encode("utf-8"))
+
+        while children:
+            pid, status, usage = os.wait4(-1, os.WNOHANG)
+            if not pid:
+                break
+            message = {
+                "id": children.pop(pid),
+                "return_code": os.waitstatus_to_exitcode(status),
+                "resources": rusage_to_dict(usage),
+            }
+            sock.send(json.dumps(message).encode("utf-8"))
+        if os.getppid() != parent:
+            accepting = False  # the supervisor is gone
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pre-imported Python gate zygote (started by the supervisor)")
+    parser.add_argument("--fd", type=int, required=True)
+    parser.add_argument("--preload", nargs="*", default=list(DEFAULT_PRELOAD))
+    args = parser.parse_args()
+    with socket.socket(fileno=args.fd) as sock:
+        serve(sock, args.preload)
+    return 0
+
+
+# --- client (runs in the supervisor) ---------------------------------------------------------
+
+
+class _Zygote:
+    def __init__(self, preload: list[str]) -> None:
+        self.sock, child_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        pythonpath = os.pathsep.join(filter(None, [str(_HARNESS_ROOT), os.environ.get("PYTHONPATH")]))
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "harness.python_pool", "--fd", str(child_sock.fileno()), "--preload", *preload],
+            pass_fds=(child_sock.fileno(),),
+            stdin=subprocess.DEVNULL,
+            env={**os.environ, "PYTHONPATH": pythonpath},
+        )
+        child_sock.close()
+        self.forks = 0
+        self._lock = threading.Lock()
+        self._pids: dict[str, Future[int]] = {}
+        self._exits: dict[str, Future[dict[str, Any]]] = {}
+        self._reader = threading.Thread(target=self._read, name="python-pool-reader", daemon=True)
+        self._reader.start()
+
+    def submit(self, request_id: str, request: dict[str, Any], fds: list[int]) -> tuple[Future, Future]:
+        with self._lock:
+            self.forks += 1
+            started: Future[int] = Future()
+            finished: Future[dict[str, Any]] = Future()
+            self._pids[request_id] = started
+            self._exits[request_id] = finished
+        socket.send_fds(self.sock, [json.dumps({**request, "id": request_id}).encode("utf-8")], fds)
+        return started, finished
+
+    def _fail_all(self, exc: Exception) -> None:
+        with self._lock:
+            for future in [*self._pids.values(), *self._exits.values()]:
+                if not future.done():
+                    future.set_exception(exc)
+            self._pids.clear()
+            self._exits.clear()
+
+    def _read(self) -> None:
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            while True:
+                if not selector.select(timeout=0.2):
+                    if self.proc.poll() is not None:
+                        break
+                    continue
+                message = json.loads(self.sock.recv(MAX_MESSAGE_BYTES))
+                with self._lock:
+                    if "pid" in message:
+                        future = self._pids.pop(message["id"], None)
+                        if future is not None:
+                            future.set_result(message["pid"])
+                    else:
+                        future = self._exits.pop(message["id"], None)
+                        if future is not None:
+                            future.set_result(message)
+        self._fail_all(RuntimeError(f"python-pool worker exited with code {self.proc.returncode}"))
+        self.sock.close()
+
+    def retire(self) -> None:
+        """Stop forking; the zygote exits once its running gates finish."""
+        with contextlib.suppress(OSError):
+            self.sock.send(b'{"op": "shutdown"}')
+
+    def wait(self) -> None:
+        self.proc.wait()
+        self._reader.join()
+
+
+class PythonGatePool:
+    """Runs ``"runner": "python-pool"`` gates by forking a warm, pre-imported zygote.
+
+    ``run`` is a ``GateRunFn``; the zygote is replaced after ``recycle_after`` forks.
+    """
+
+    def __init__(
+        self,
+        preload: list[str] | tuple[str, ...] = DEFAULT_PRELOAD,
+        recycle_after: int = DEFAULT_RECYCLE_AFTER,
+        progress: ProgressEmitter | None = None,
+    ) -> None:
+        self.preload = list(preload)
+        self.recycle_after = max(1, recycle_after)
+        self.progress = progress
+        self._lock = threading.Lock()
+        self._zygote: _Zygote | None = None
+        self._retired: list[_Zygote] = []
+        self._ids = itertools.count(1)
+
+    def _submit(self, request: dict[str, Any], fds: list[int]) -> tuple[_Zygote, Future, Future]:
+        # Submitting under the lock keeps every request ahead of its zygote's shutdown message.
+        with self._lock:
+            zygote = self._zygote
+            if zygote is None or zygote.forks >= self.recycle_after or zygote.proc.poll() is not None:
+                if zygote is not None:
+                    zygote.retire()
+                    self._retired.append(zygote)
+                zygote = self._zygote = _Zygote(self.preload)
+            return (zygote, *zygote.submit(str(next(self._ids)), request, fds))
+
+    def _discard(self, zygote: _Zygote) -> None:
+        """Kill a zygote that died or stopped answering; the next gate starts a fresh one."""
+        with self._lock:
+            if self._zygote is zygote:
+                self._zygote = None
+                self._retired.append(zygote)
+        with contextlib.suppress(ProcessLookupError):
+            zygote.proc.kill()
+
+    def run(
+        self,
+        gate_id: str,
+        gate_cfg: dict[str, Any],
+        attempt: int,
+        log_dir: str | Path | None = None,
+        cancel: CancelToken | None = None,
+    ) -> GateResult:
+        cmd = gate_cfg["command"]
+        if cancel is not None and cancel.is_cancelled():
+            return GateResult.not_run(gate_id, "cancelled", attempt, "Not run: cancelled", command=cmd)
+        target = parse_python_command(cmd)
+        if target is None:
+            raise ValueError(f"gates.{gate_id}: not a plain python command for {RUNNER}: {cmd}")
+        timeout = gate_timeout(gate_cfg)
+        tail_bytes = int(gate_cfg.get("log_tail_bytes", DEFAULT_LOG_TAIL_BYTES))
+        (stdout_log, stdout_ref), (stderr_log, stderr_ref) = open_gate_logs(gate_id, gate_cfg, attempt, log_dir)
+        report_path = gate_report_path(gate_id, gate_cfg, attempt, log_dir)
+        env = {key: str(value) for key, value in gate_cfg.get("env", {}).items()}
+        if report_path is not None:
+            env[REPORT_PATH_ENV] = str(report_path)
+        request = {**target, "cwd": gate_cfg.get("cwd") or "", "env": env}
+
+        if self.progress:
+            self.progress.emit("gate-started", gate_id=gate_id, attempt=attempt, command=cmd)
+        with stdout_log, stderr_log:
+            start = time.monotonic()
+            deadline = start + timeout
+            zygote = None
+            pid = None
+            ended = "exited"
+            outcome: dict[str, Any] = {"return_code": -1, "resources": {}}
+            failure = ""
+            try:
+                zygote, started, finished = self._submit(request, [stdout_log.fileno(), stderr_log.fileno()])
+                pid = started.result(timeout=max(0.0, deadline - time.monotonic()))
+                while True:
+                    try:
+                        outcome = finished.result(timeout=POLL_SECONDS)
+                        break
+                    except FutureTimeout:
+                        pass
+                    if ended != "exited":
+                        continue
+                    if cancel is not None and cancel.is_cancelled():
+                        kill_process_group(pid)
+                        ended = "cancelled"
+                    elif time.monotonic() >= deadline:
+                        terminate_process_group(pid, kill_grace(gate_cfg), finished.done)
+                        ended = "timed-out"
+            except FutureTimeout:
+                ended = "timed-out"
+                failure = f"[{RUNNER}] the worker did not start the gate within its timeout; restarting it"
+            except (RuntimeError, OSError) as exc:
+                failure = f"[{RUNNER}] {exc}; restarting it"
+            if failure:
+                if pid is not None:
+                    kill_process_group(pid)
+                if zygote is not None:
+                    self._discard(zygote)
+            duration_ms = int((time.monotonic() - start) * 1000)
+            stdout = log_tail(stdout_log, tail_bytes, stdout_ref)
+            stderr = log_tail(stderr_log, tail_bytes, stderr_ref)
+
+        return_code = outcome["return_code"]
+        if ended == "exited":
+            status = "passed" if return_code == 0 and not failure else "failed"
+        else:
+            status = ended
+        if failure:
+            stderr = f"{stderr.rstrip()}\n{failure}".lstrip()
+        elif status == "timed-out":
+            stderr = timed_out_stderr(stderr, timeout)
+        if self.progress:
+            self.progress.emit(
+                "gate-finished",
+                gate_id=gate_id,
+                attempt=attempt,
+                status=status,
+                return_code=return_code,
+                duration_ms=duration_ms,
+            )
+        result = GateResult(
+            gate_id=gate_id,
+            status=status,
+            attempt=attempt,
+            duration_ms=duration_ms,
+            command=cmd,
+            stdout=stdout,
+            stderr=stderr,
+            return_code=return_code,
+            log_ref=stdout_ref,
+            stderr_ref=stderr_ref,
+            report_ref=report_ref(report_path),
+            resources=outcome["resources"],
+        )
+        return with_test_outcomes(result, gate_cfg)
+
+    def close(self) -> None:
+        with self._lock:
+            zygotes = [*self._retired, *([self._zygote] if self._zygote else [])]
+            self._zygote = None
+            self._retired = []
+        for zygote in zygotes:
+            zygote.retire()
+        for zygote in zygotes:
+            zygote.wait()
+
+    def __enter__(self) -> PythonGatePool:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from harness.cancellation import CancelToken
+
+
+MAX_BYPASS = 4
+POLL_SECONDS = 0.05
+GATE_CPUS_ENV = "SUPERVISOR_GATE_CPUS"  # the whole CPUs reserved for the gate, for its own worker count
+
+
+@dataclass(frozen=True)
+class GateDemand:
+    """What a gate occupies while it runs: CPU and memory weights plus exclusive locks."""
+
+    cpu: float = 1.0
+    memory_mb: int = 0
+    locks: tuple[str, ...] = ()
+
+    @classmethod
+    def from_gate(cls, gate_cfg: dict[str, Any]) -> GateDemand:
+        resources = gate_cfg.get("resources", {})
+        return cls(
+            cpu=float(resources.get("cpu", 1)),
+            memory_mb=int(resources.get("memory_mb", 0)),
+            locks=tuple(sorted(set(gate_cfg.get("locks", ())))),
+        )
+
+
+class ResourcePool:
+    """Admits gates while their weights fit the capacity and none of their locks is held.
+
+    ``None`` leaves a dimension unlimited; ``processes`` counts gates. A gate
+    heavier than the capacity is clamped to it, so it runs alone instead of
+    never. Waiting gates are admitted oldest first, but a later gate that fits
+    may start ahead of the oldest waiter, at most ``MAX_BYPASS`` times in a
+    row, so light gates fill the gaps without starving a heavy one.
+    """
+
+    def __init__(self, cpu: float | None = None, memory_mb: int | None = None, processes: int | None = None) -> None:
+        self.cpu = cpu
+        self.memory_mb = memory_mb
+        self.processes = processes
+        self._cond = threading.Condition()
+        self._cpu_used = 0.0
+        self._memory_used = 0
+        self._running = 0
+        self._locks: set[str] = set()
+        self._waiters: deque[object] = deque()
+        self._bypassed = 0
+
+    def _weights(self, demand: GateDemand) -> tuple[float, int]:
+        cpu = demand.cpu if self.cpu is None else min(demand.cpu, self.cpu)
+        memory = demand.memory_mb if self.memory_mb is None else min(demand.memory_mb, self.memory_mb)
+        return cpu, memory
+
+    def _fits(self, demand: GateDemand) -> bool:
+        cpu, memory = self._weights(demand)
+        return (
+            (self.cpu is None or self._cpu_used + cpu <= self.cpu)
+            and (self.memory_mb is None or self._memory_used + memory <= self.memory_mb)
+            and (self.processes is None or self._running < self.processes)
+            and self._locks.isdisjoint(demand.locks)
+        )
+
+    def reserved_cpus(self, demand: GateDemand) -> int:
+        """Whole CPUs ``demand`` holds once admitted (at least 1)."""
+        return max(1, int(self._weights(demand)[0]))
+
+    def acquire(self, demand: GateDemand, cancel: CancelToken | None = None) -> bool:
+        """Block until ``demand`` is admitted; False if ``cancel`` fires first."""
+        ticket = object()
+        with self._cond:
+            self._waiters.append(ticket)
+            try:
+                while True:
+                    head = self._waiters[0] is ticket
+                    if self._fits(demand) and (head or self._bypassed < MAX_BYPASS):
+                        if not head:
+                            self._bypassed += 1
+                        cpu, memory = self._weights(demand)
+                        self._cpu_used += cpu
+                        self._memory_used += memory
+                        self._running += 1
+                        self._locks.update(demand.locks)
+                        return True
+                    if cancel is not None and cancel.is_cancelled():
+                        return False
+                    self._cond.wait(timeout=POLL_SECONDS if cancel is not None else None)
+            finally:
+                if self._waiters[0] is ticket:
+                    self._bypassed = 0
+                self._waiters.remove(ticket)
+                self._cond.notify_all()
+
+    def release(self, demand: GateDemand) -> None:
+        cpu, memory = self._weights(demand)
+        with self._cond:
+            self._cpu_used -= cpu
+            self._memory_used -= memory
+            self._running -= 1
+            self._locks.difference_update(demand.locks)
+            self._cond.notify_all()
+
+    @contextmanager
+    def hold(self, demand: GateDemand, cancel: CancelToken | None = None) -> Iterator[bool]:
+        """``with pool.hold(demand, cancel) as admitted:``; nothing is held when ``admitted`` is False."""
+        admitted = self.acquire(demand, cancel)
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.release(demand)
@@ -1,32 +1,71 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Any, Callable
 
-from harness.types import GateResult
+from harness.cancellation import CancelToken
+from harness.gate_scheduler import GateEdges, run_gate_graph
+from harness.types import FAILED_STATUSES, GateResult
 
 
 RunGateFn = Callable[[str, int], GateResult]
 
 
 def run_with_retries(
-    gate_ids: list[str], max_retries: int, run_gate_fn: RunGateFn
+    gate_ids: list[str],
+    max_retries: int,
+    run_gate_fn: RunGateFn,
+    edges: dict[str, GateEdges] | None = None,
+    max_workers: int = 1,
+    sort_key: Callable[[str], Any] | None = None,
+    cancel: CancelToken | None = None,
+    fail_fast: CancelToken | None = None,
 ) -> tuple[str, int, list[str], list[GateResult], list[str]]:
+    """Run gates until they all pass or ``max_retries`` attempts are used.
+
+    ``fail_fast`` is cancelled as soon as a gate fails on the final attempt,
+    i.e. once escalation is certain. If ``cancel`` fires, the run stops after
+    the current attempt with status ``cancelled`` (or ``escalated`` when the
+    final attempt already had real failures).
+    """
     all_results: list[GateResult] = []
     pending = list(gate_ids)
     transitions = ["implementing", "validating"]
 
     for attempt in range(1, max_retries + 1):
-        attempt_results: list[GateResult] = []
-        for gate_id in pending:
-            result = run_gate_fn(gate_id, attempt)
-            attempt_results.append(result)
-            all_results.append(result)
+        on_result = None
+        if fail_fast is not None and attempt == max_retries:
+
+            def on_result(result: GateResult) -> None:
+                if result.status in FAILED_STATUSES:
+                    fail_fast.cancel()
 
-        failed = [result.gate_id for result in attempt_results if result.status == "failed"]
+        attempt_results = run_gate_graph(
+            pending,
+            attempt,
+            lambda gate_id, attempt=attempt: run_gate_fn(gate_id, attempt),
+            edges=edges,
+            max_workers=max_workers,
+            sort_key=sort_key,
+            cancel=cancel,
+            on_result=on_result,
+        )
+        all_results.extend(attempt_results)
+
+        failed = [result.gate_id for result in attempt_results if not result.passed]
         if not failed:
             transitions.append("passed")
             return ("passed", attempt, [], all_results, transitions)
 
+        if cancel is not None and cancel.is_cancelled():
+            real_failures = [
+                result.gate_id for result in attempt_results if not result.passed and result.status != "cancelled"
+            ]
+            if attempt == max_retries and real_failures:
+                transitions.extend(["failed", "escalated"])
+                return ("escalated", attempt, real_failures, all_results, transitions)
+            transitions.append("cancelled")
+            return ("cancelled", attempt, real_failures, all_results, transitions)
+
         if attempt == max_retries:
             transitions.extend(["failed", "escalated"])
             return ("escalated", attempt, failed, all_results, transitions)
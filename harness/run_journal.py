@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from harness.types import GateResult, SupervisorRun
+
+
+JOURNAL_FILE = "journal.ndjson"
+
+
+def journal_path(artifacts_dir: str | Path, run_id: str) -> Path:
+    return Path(artifacts_dir) / run_id / JOURNAL_FILE
+
+
+class RunJournal:
+    """Append-only NDJSON record of a run, written as each gate and task completes.
+
+    Every record is flushed as soon as it is written so an interrupted run
+    leaves a usable journal for ``--resume``.
+    """
+
+    def __init__(self, artifacts_dir: str | Path, run_id: str) -> None:
+        self.path = journal_path(artifacts_dir, run_id)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()  # the signal handler records from the main thread
+        self._handle = self.path.open("a", encoding="utf-8")
+
+    def record(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, **fields}, separators=(",", ":"))
+        with self._lock:
+            if not self._handle.closed:
+                self._handle.write(line + "\n")
+                self._handle.flush()
+
+    def gate_finished(self, task_id: str, result: GateResult) -> None:
+        self.record("gate-finished", task_id=task_id, result=result.to_dict())
+
+    def task_finished(self, run: SupervisorRun) -> None:
+        self.record("task-finished", task_id=run.task_id, run=run.to_dict())
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+@dataclass
+class JournalState:
+    """What an earlier (possibly interrupted) attempt at a run completed."""
+
+    run_id: str
+    selection: dict[str, Any] = field(default_factory=dict)
+    finished_tasks: dict[str, SupervisorRun] = field(default_factory=dict)
+    passed_gates: dict[tuple[str, str], GateResult] = field(default_factory=dict)
+
+    def passed_gate(self, task_id: str, gate_id: str) -> GateResult | None:
+        return self.passed_gates.get((task_id, gate_id))
+
+
+def load_journal(artifacts_dir: str | Path, run_id: str) -> JournalState:
+    path = journal_path(artifacts_dir, run_id)
+    if not path.exists():
+        raise FileNotFoundError(f"No journal for run {run_id}: {path}")
+
+    state = JournalState(run_id=run_id)
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a killed run
+            event = record.get("event")
+            if event == "run-started" and not state.selection:
+                state.selection = record.get("selection", {})
+            elif event == "gate-finished":
+                result = GateResult.from_dict(record["result"])
+                if result.passed:
+                    state.passed_gates[(record["task_id"], result.gate_id)] = result
+            elif event == "task-finished":
+                run = SupervisorRun.from_dict(record["run"])
+                if run.status == "cancelled":
+                    state.finished_tasks.pop(run.task_id, None)
+                else:
+                    state.finished_tasks[run.task_id] = run
+    return state
@@ -1,31 +1,70 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+import json
+import os
 from pathlib import Path
 
+from harness.content_cache import ContentCache
+from harness.file_inventory import DEFAULT_INDEX_PATH, build_inventory
+from harness.gate_runner import REPORT_PATH_ENV
+from harness.lint_engine import RULES, lint_paths, rules_digest, to_json, to_sarif
+from harness.resource_pool import GATE_CPUS_ENV
+
 ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE = Path(".supervisor-artifacts") / "cache" / "lint.json"
 
 
-def should_scan(path: Path) -> bool:
-    skip_parts = {".git", ".supervisor-artifacts", "node_modules", ".venv", "__pycache__"}
-    return not any(part in skip_parts for part in path.parts)
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Lint the repository's Python files")
+    parser.add_argument("--root", default=str(ROOT), help="Repository root to lint")
+    parser.add_argument(
+        "--rules", nargs="*", choices=sorted(RULES), default=None, help="Rules to apply (default: all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get(GATE_CPUS_ENV) or os.cpu_count() or 1),
+        help=f"Lint processes (default: ${GATE_CPUS_ENV}, the CPUs the supervisor reserved, else CPU count)",
+    )
+    parser.add_argument(
+        "--report",
+        default=os.environ.get(REPORT_PATH_ENV),
+        help=f"Write a machine-readable report here (default: ${REPORT_PATH_ENV})",
+    )
+    parser.add_argument("--format", choices=["json", "sarif"], default="json", help="Report format")
+    parser.add_argument(
+        "--cache", default=None, help=f"Per-file result cache (default: <root>/{DEFAULT_CACHE.as_posix()})"
+    )
+    parser.add_argument("--full", action="store_true", help="Relint every file, ignoring cached results")
+    parser.add_argument(
+        "--index", default=None, help=f"File inventory index (default: <root>/{DEFAULT_INDEX_PATH.as_posix()})"
+    )
+    return parser
 
 
 def main() -> int:
-    failures: list[str] = []
-    for path in ROOT.rglob("*.py"):
-        if not should_scan(path):
-            continue
-        for lineno, line in enumerate(path.read_text(encoding="utf-8").splitlines(), start=1):
-            if line.rstrip() != line:
-                failures.append(f"{path}:{lineno}: trailing whitespace")
-            if "\t" in line:
-                failures.append(f"{path}:{lineno}: tab character not allowed")
-
-    if failures:
+    args = build_parser().parse_args()
+    root = Path(args.root)
+    codes = sorted(args.rules if args.rules is not None else RULES)
+
+    inventory = build_inventory(root, args.index or root / DEFAULT_INDEX_PATH)
+    cache = ContentCache(args.cache or root / DEFAULT_CACHE, rules_digest(codes), read=not args.full)
+    issues = lint_paths(
+        root, inventory.select(["**/*.py"]), codes, args.workers, fingerprints=inventory.content_ids(), cache=cache
+    )
+    cache.save()
+
+    if args.report:
+        report = to_sarif(issues, codes) if args.format == "sarif" else to_json(issues, codes)
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    if issues:
         print("Lint check failed:")
-        for failure in failures:
-            print(f"- {failure}")
+        for issue in issues:
+            print(f"- {root / issue.path}:{issue.line}: {issue.message}")
         return 1
 
     print("Lint check passed")
@@ -1,46 +1,61 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import re
+import argparse
+import os
+import sys
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[2]
-
-PATTERNS = {
-    "possible private key": re.compile(r"-----BEGIN (RSA |EC )?PRIVATE KEY-----"),
-    "possible live stripe key": re.compile(r"sk_live_[A-Za-z0-9]+"),
-    "possible secret assignment": re.compile(r"\b(API_KEY|SECRET|TOKEN|PASSWORD)\s*=\s*['\"][^'\"]+['\"]"),
-}
+from harness.file_inventory import DEFAULT_INDEX_PATH, build_inventory
+from harness.resource_pool import GATE_CPUS_ENV
+from harness.secret_scanner import ScanCache, scan_diff, scan_paths, should_scan
 
-IGNORE_FILE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".ico", ".pdf"}
-IGNORE_DIRS = {".git", ".supervisor-artifacts", "node_modules", ".venv", "__pycache__"}
+ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_CACHE = Path(".supervisor-artifacts") / "cache" / "secret-scan.json"
 
 
-def should_scan(path: Path) -> bool:
-    if path.suffix.lower() in IGNORE_FILE_SUFFIXES:
-        return False
-    return not any(part in IGNORE_DIRS for part in path.parts)
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Scan the repository for committed secrets")
+    parser.add_argument("--root", default=str(ROOT), help="Repository root to scan")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get(GATE_CPUS_ENV) or os.cpu_count() or 1),
+        help=f"Scanner processes (default: ${GATE_CPUS_ENV}, the CPUs the supervisor reserved, else CPU count)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--diff", metavar="BASE...HEAD", help="Scan only lines added in this git revision range")
+    mode.add_argument("--full", action="store_true", help="Rescan every file, ignoring cached results")
+    parser.add_argument(
+        "--cache", default=None, help=f"Per-file result cache (default: <root>/{DEFAULT_CACHE.as_posix()})"
+    )
+    parser.add_argument(
+        "--index", default=None, help=f"File inventory index (default: <root>/{DEFAULT_INDEX_PATH.as_posix()})"
+    )
+    return parser
 
 
 def main() -> int:
-    findings: list[str] = []
+    args = build_parser().parse_args()
+    root = Path(args.root)
 
-    for path in ROOT.rglob("*"):
-        if not path.is_file() or not should_scan(path):
-            continue
+    if args.diff:
         try:
-            content = path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            continue
-
-        for name, pattern in PATTERNS.items():
-            if pattern.search(content):
-                findings.append(f"{path}: {name}")
+            findings = scan_diff(root, args.diff)
+        except RuntimeError as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+    else:
+        cache = ScanCache(args.cache or root / DEFAULT_CACHE, read=not args.full)
+        inventory = build_inventory(root, args.index or root / DEFAULT_INDEX_PATH)
+        paths = [path for path in inventory.paths() if should_scan(path)]
+        findings = scan_paths(root, paths, args.workers, fingerprints=inventory.content_ids(), cache=cache)
+        cache.save()
 
     if findings:
         print("Security-lite check failed:")
         for finding in findings:
-            print(f"- {finding}")
+            print(f"- {root / finding.path}:{finding.line}: {finding.name}")
         return 1
 
     print("Security-lite check passed")
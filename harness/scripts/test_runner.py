@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import unittest
+from pathlib import Path
+
+from harness.coverage_map import DEFAULT_MAP_PATH, CoverageMap
+from harness.file_inventory import DEFAULT_INDEX_PATH, build_inventory
+from harness.gate_runner import REPORT_PATH_ENV
+from harness.impact import changed_files_since
+from harness.resource_pool import GATE_CPUS_ENV
+from harness.test_report import RETRY_TESTS_ENV
+from harness.unittest_runner import (
+    DEFAULT_DURATIONS_PATH,
+    iter_tests,
+    load_durations,
+    rerunnable_id,
+    run_tests,
+    save_durations,
+    select,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run unittest tests and write a per-test JSON report")
+    parser.add_argument("tests", nargs="*", help="Test modules, classes or methods (default: discover)")
+    parser.add_argument("--start-dir", default="harness/tests", help="Discovery start directory")
+    parser.add_argument("--pattern", default="test_*.py", help="Discovery file pattern")
+    parser.add_argument(
+        "--root", default=".", help="Repository root; the default history, map and index paths live under it"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get(GATE_CPUS_ENV) or os.cpu_count() or 1),
+        help=(
+            "Worker processes; test classes are balanced across them by past durations "
+            f"(default: ${GATE_CPUS_ENV}, the CPUs the supervisor reserved for the gate, else the CPU count)"
+        ),
+    )
+    parser.add_argument(
+        "--durations",
+        default=None,
+        help=(
+            "Per-test duration history used to balance workers "
+            f"(default: <root>/{DEFAULT_DURATIONS_PATH.as_posix()})"
+        ),
+    )
+    parser.add_argument(
+        "--select-since",
+        metavar="SHA",
+        default=None,
+        help="Run only tests whose covered files changed since this commit (or whose map entry is out of date)",
+    )
+    parser.add_argument(
+        "--record-coverage",
+        action="store_true",
+        help="Record the files each test that runs touches into the coverage map",
+    )
+    parser.add_argument(
+        "--coverage-map",
+        default=None,
+        help=f"Per-test coverage map (default: <root>/{DEFAULT_MAP_PATH.as_posix()})",
+    )
+    parser.add_argument(
+        "--index", default=None, help=f"File inventory index (default: <root>/{DEFAULT_INDEX_PATH.as_posix()})"
+    )
+    parser.add_argument(
+        "--report",
+        default=os.environ.get(REPORT_PATH_ENV),
+        help=f"Write the JSON report here (default: ${REPORT_PATH_ENV})",
+    )
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    root = Path(args.root)
+    durations_path = args.durations or root / DEFAULT_DURATIONS_PATH
+    map_path = args.coverage_map or root / DEFAULT_MAP_PATH
+    loader = unittest.TestLoader()
+    retry = [test_id for test_id in os.environ.get(RETRY_TESTS_ENV, "").splitlines() if test_id.strip()]
+    if retry:
+        print(f"Retrying {len(retry)} failed test(s) only")
+        suite = loader.loadTestsFromNames(retry)
+    elif args.tests:
+        suite = loader.loadTestsFromNames(args.tests)
+    else:
+        suite = loader.discover(args.start_dir, pattern=args.pattern, top_level_dir=".")
+    test_ids = [rerunnable_id(test) for test in iter_tests(suite)]
+
+    coverage_map = content_ids = None
+    if args.select_since or args.record_coverage:
+        coverage_map = CoverageMap.load(map_path)
+        content_ids = build_inventory(root, args.index or root / DEFAULT_INDEX_PATH).content_ids()
+    if args.select_since and not retry:
+        try:
+            changed = changed_files_since(args.select_since)
+        except RuntimeError as exc:
+            print(str(exc), file=sys.stderr)
+            return 2
+        selected, reason = coverage_map.select(test_ids, content_ids, changed)
+        print(reason)
+        suite = select(suite, selected)
+
+    durations = load_durations(durations_path)
+    run = run_tests(
+        suite,
+        workers=max(1, args.workers),
+        durations=durations,
+        stream=sys.stderr,
+        record_coverage=args.record_coverage,
+    )
+    if run.workers > 1:
+        status = "OK" if run.successful else "FAILED"
+        print(f"Ran {run.tests_run} tests across {run.workers} worker processes: {status}", file=sys.stderr)
+    save_durations(durations_path, durations, run.outcomes)
+    if args.record_coverage:
+        # Entries for tests that no longer exist are dropped only when the whole suite was listed.
+        coverage_map.update(run.coverage, content_ids, keep=None if retry or args.tests else test_ids)
+        coverage_map.save(map_path)
+
+    if args.report:
+        tests = sorted(run.outcomes, key=lambda test: test["id"])
+        counts: dict[str, int] = {}
+        for test in tests:
+            counts[test["outcome"]] = counts.get(test["outcome"], 0) + 1
+        report = {"tool": "harness-unittest", "narrowed": bool(retry), "counts": counts, "tests": tests}
+        Path(args.report).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return 0 if run.successful else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from harness.content_cache import ContentCache
+from harness.file_inventory import SKIP_DIRS
+
+
+@dataclass(frozen=True)
+class SecretPattern:
+    name: str
+    regex: bytes
+    literals: tuple[bytes, ...]  # every match contains at least one of these
+
+
+PATTERNS = (
+    SecretPattern(
+        "possible private key",
+        rb"-----BEGIN (?:RSA |EC )?PRIVATE KEY-----",
+        (b"PRIVATE KEY-----",),
+    ),
+    SecretPattern("possible live stripe key", rb"sk_live_[A-Za-z0-9]+", (b"sk_live_",)),
+    SecretPattern(
+        "possible secret assignment",
+        rb"\b(?:API_KEY|SECRET|TOKEN|PASSWORD)\s*=\s*['\"][^'\"]+['\"]",
+        (b"API_KEY", b"SECRET", b"TOKEN", b"PASSWORD"),
+    ),
+)
+
+IGNORE_FILE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".ico", ".pdf"}
+SNIFF_BYTES = 8192
+MMAP_MIN_BYTES = 1024 * 1024
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+
+_COMBINED = re.compile(b"|".join(b"(?:%s)" % p.regex for p in PATTERNS))
+_COMPILED = tuple((p.name, re.compile(p.regex)) for p in PATTERNS)
+_LITERALS = tuple(literal for p in PATTERNS for literal in p.literals)
+SCAN_VERSION = 2  # bump when the same patterns would report different hits
+RULES_DIGEST = hashlib.sha256(
+    b"\0".join([b"%d" % SCAN_VERSION, *(p.name.encode() + b"\0" + p.regex for p in PATTERNS)])
+).hexdigest()[:16]
+
+_HUNK = re.compile(rb"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,\d+)? @@")
+
+
+@dataclass(frozen=True, order=True)
+class Finding:
+    path: str
+    line: int
+    name: str
+
+
+def should_scan(path: str) -> bool:
+    parts = path.split("/")
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return False
+    return os.path.splitext(parts[-1])[1].lower() not in IGNORE_FILE_SUFFIXES
+
+
+def scan_buffer(data: bytes | mmap.mmap) -> list[tuple[int, str]]:
+    """``(line, pattern name)`` for every match in ``data``.
+
+    The patterns' required literals rule out most files with a few ``find``s.
+    A single combined regex then finds the lines worth a closer look, and each
+    pattern runs over just those lines, so overlapping matches are all reported.
+    """
+    if not any(data.find(literal) != -1 for literal in _LITERALS):
+        return []
+    hits = []
+    line = 1
+    counted = 0
+    pos = 0
+    while (match := _COMBINED.search(data, pos)) is not None:
+        start = data.rfind(b"\n", 0, match.start()) + 1
+        end = data.find(b"\n", match.end())
+        end = len(data) if end == -1 else end
+        line += data[counted:start].count(b"\n")
+        counted = start
+        for name, regex in _COMPILED:
+            for hit in regex.finditer(data, start, end):
+                hits.append((line + data[start : hit.start()].count(b"\n"), name))
+        pos = end + 1
+    hits.sort(key=lambda hit: hit[0])
+    return hits
+
+
+def scan_file(root: str | Path, path: str) -> list[Finding]:
+    try:
+        with open(Path(root) / path, "rb") as handle:
+            head = handle.read(SNIFF_BYTES)
+            if b"\0" in head:
+                return []  # binary
+            if len(head) < SNIFF_BYTES:
+                hits = scan_buffer(head)
+            elif os.fstat(handle.fileno()).st_size < MMAP_MIN_BYTES:
+                hits = scan_buffer(head + handle.read())
+            else:
+                with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hits = scan_buffer(mapped)
+    except OSError:
+        return []  # deleted since listing, or unreadable
+    return [Finding(path, line, name) for line, name in hits]
+
+
+def _scan_batch(root: str, paths: list[str]) -> list[Finding]:
+    return [finding for path in paths for finding in scan_file(root, path)]
+
+
+def _batches(root: Path, paths: list[str], count: int) -> tuple[list[list[str]], int]:
+    sized = []
+    for path in paths:
+        try:
+            sized.append((os.stat(root / path).st_size, path))
+        except OSError:
+            continue
+    batches: list[list[str]] = [[] for _ in range(count)]
+    loads = [0] * count
+    for size, path in sorted(sized, reverse=True):
+        target = loads.index(min(loads))
+        batches[target].append(path)
+        loads[target] += size
+    return [batch for batch in batches if batch], sum(loads)
+
+
+class ScanCache(ContentCache):
+    """Per-file ``(line, pattern name)`` hits, invalidated when the pattern set changes."""
+
+    def __init__(self, path: str | Path, read: bool = True) -> None:
+        super().__init__(path, RULES_DIGEST, read=read)
+
+
+def scan_paths(
+    root: str | Path,
+    paths: list[str],
+    workers: int | None = None,
+    fingerprints: dict[str, str] | None = None,
+    cache: ScanCache | None = None,
+) -> list[Finding]:
+    """Scan ``paths`` under ``root``, spreading large trees over a process pool.
+
+    With ``cache`` and the ``fingerprints`` (path -> content id) of the tree,
+    files whose content was scanned before are not read again.
+    """
+    root = Path(root)
+    findings: list[Finding] = []
+    pending = paths
+    if cache is not None and fingerprints is not None:
+        pending = []
+        for path in paths:
+            hits = cache.get(fingerprints[path]) if path in fingerprints else None
+            if hits is None:
+                pending.append(path)
+            else:
+                findings.extend(Finding(path, line, name) for line, name in hits)
+
+    scanned = _scan_pending(root, pending, workers or os.cpu_count() or 1)
+    findings.extend(scanned)
+    if cache is not None and fingerprints is not None:
+        by_path: dict[str, list[tuple[int, str]]] = {path: [] for path in pending}
+        for finding in scanned:
+            by_path[finding.path].append((finding.line, finding.name))
+        for path, hits in by_path.items():
+            if path in fingerprints:
+                cache.put(fingerprints[path], [list(hit) for hit in hits])
+    return sorted(findings)
+
+
+def _scan_pending(root: Path, paths: list[str], workers: int) -> list[Finding]:
+    if workers > 1:
+        batches, total = _batches(root, paths, workers * 4)
+        if total >= PARALLEL_MIN_BYTES and len(batches) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = pool.map(_scan_batch, [str(root)] * len(batches), batches)
+                return [finding for batch in results for finding in batch]
+    return _scan_batch(str(root), paths)
+
+
+_C_ESCAPES = {b"a": 7, b"b": 8, b"t": 9, b"n": 10, b"v": 11, b"f": 12, b"r": 13, b'"': 34, b"\\": 92}
+_C_ESCAPE = re.compile(rb"\\(?:([0-7]{3})|(.))")
+
+
+def _diff_path(target: bytes) -> bytes:
+    """A ``+++`` header path as bytes, undoing git's C-style quoting and the tab after names with spaces."""
+    if target.startswith(b'"') and target.endswith(b'"'):
+        return _C_ESCAPE.sub(
+            lambda m: bytes([int(m.group(1), 8) if m.group(1) else _C_ESCAPES.get(m.group(2), m.group(2)[0])]),
+            target[1:-1],
+        )
+    return target.rstrip(b"\t")
+
+
+def added_lines(diff: bytes) -> dict[str, list[tuple[int, bytes]]]:
+    """Lines added per file in a ``git diff --unified=0`` patch, with new-file line numbers."""
+    added: dict[str, list[tuple[int, bytes]]] = {}
+    path = None
+    line = 0
+    # "+++ " names the file only in the header that follows "diff --git" and
+    # "--- "; inside a hunk it is an added line whose content starts with "++ ".
+    in_header = False
+    previous = b""
+    for raw in diff.split(b"\n"):
+        if raw.startswith(b"diff --git "):
+            in_header = True
+            path = None
+        elif in_header and raw.startswith(b"+++ ") and previous.startswith(b"--- "):
+            target = _diff_path(raw[4:])
+            path = target[2:].decode("utf-8", "surrogateescape") if target.startswith(b"b/") else None
+        elif raw.startswith(b"@@"):
+            in_header = False
+            match = _HUNK.match(raw)
+            line = int(match.group("start")) if match else 0
+        elif not in_header and raw.startswith(b"+") and path is not None:
+            added.setdefault(path, []).append((line, raw[1:]))
+            line += 1
+        previous = raw
+    return added
+
+
+def scan_diff(root: str | Path, revision_range: str) -> list[Finding]:
+    """Scan only the lines added in ``revision_range`` (e.g. ``base...head``)."""
+    proc = subprocess.run(
+        ["git", "-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", revision_range],
+        cwd=root,
+        check=False,
+        capture_output=True,
+    )
+    if proc.returncode != 0:
+        stderr = proc.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"git diff {revision_range} failed: {stderr}")
+
+    findings = []
+    for path, lines in added_lines(proc.stdout).items():
+        if not should_scan(path):
+            continue
+        for line, text in lines:
+            if b"\0" in text:
+                continue
+            findings.extend(Finding(path, line, name) for _, name in scan_buffer(text))
+    return sorted(findings)
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from dataclasses import replace
+from pathlib import Path
+from time import monotonic
+from typing import Any, Callable, Mapping
+
+from harness.cancellation import CancelToken
+from harness.file_inventory import build_inventory
+from harness.gate_runner import command_identity
+from harness.path_globs import matches_any
+from harness.progress import ProgressEmitter
+from harness.types import GateResult
+
+
+SETUP_CACHE_VERSION = 1
+DEFAULT_KEEP = 2
+RESULT_FILE = "result.json"
+OUTPUTS_DIR = "outputs"
+
+RunSetupFn = Callable[[str, dict[str, Any], CancelToken | None], GateResult]
+FingerprintsFn = Callable[[], Mapping[str, str]]
+
+
+def setup_key(setup_cfg: Mapping[str, Any], fingerprints: Mapping[str, str]) -> str:
+    """Hash of the setup's command and the content ids of the files matching its ``key_inputs``.
+
+    ``fingerprints`` maps paths to content ids, as ``FileInventory.content_ids`` does.
+    """
+    digest = hashlib.sha256()
+    material = {
+        **command_identity(setup_cfg),
+        "outputs": sorted(setup_cfg.get("outputs", ())),
+        "version": SETUP_CACHE_VERSION,
+    }
+    digest.update(json.dumps(material, sort_keys=True).encode("utf-8"))
+    paths = sorted(fingerprints)
+    for pattern in setup_cfg.get("key_inputs", ()):
+        matched = [path for path in paths if matches_any(path, (pattern,))]
+        if not matched:
+            digest.update(f"{pattern}\0missing\n".encode("utf-8"))
+        for path in matched:
+            digest.update(f"{path}\0{fingerprints[path]}\n".encode("utf-8", "surrogateescape"))
+    return digest.hexdigest()
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _copy(source: Path, target: Path) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if source.is_dir() and not source.is_symlink():
+        shutil.copytree(source, target, symlinks=True)
+    else:
+        shutil.copy2(source, target, follow_symlinks=False)
+
+
+class SetupRunner:
+    """Runs named setup phases at most once per run and caches them across runs.
+
+    A phase is keyed by ``setup_key``. When a phase passes, its result and
+    a copy of its ``outputs`` are stored under ``cache_dir/<setup>/<key>``
+    (the newest ``keep`` keys per setup are kept). A later run with the same
+    key skips the command: outputs already in the workspace from that key
+    are used as they are (``cache``); otherwise they are copied back from
+    the cache (``restored``). ``state_path`` records which key the workspace
+    outputs came from. Without ``cache_dir``, or with ``read=False``, every
+    run executes its phases once. ``fingerprints`` supplies the tree's content
+    ids (e.g. ``GateCache.fingerprints``); without it the runner takes its own
+    file inventory of ``root``.
+    """
+
+    def __init__(
+        self,
+        setups: Mapping[str, Mapping[str, Any]],
+        run_fn: RunSetupFn,
+        root: str | Path = ".",
+        cache_dir: str | Path | None = None,
+        state_path: str | Path | None = None,
+        read: bool = True,
+        keep: int = DEFAULT_KEEP,
+        progress: ProgressEmitter | None = None,
+        fingerprints: FingerprintsFn | None = None,
+    ) -> None:
+        self.setups = setups
+        self.run_fn = run_fn
+        self.root = Path(root)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.state_path = Path(state_path) if state_path else None
+        self.read = read
+        self.keep = keep
+        self.progress = progress
+        self.fingerprints = fingerprints or (lambda: build_inventory(self.root).content_ids())
+        self._lock = threading.Lock()
+        self._content_ids: Mapping[str, str] | None = None
+        self._setup_locks: dict[str, threading.Lock] = {}
+        self._results: dict[str, GateResult] = {}
+
+    @property
+    def results(self) -> list[GateResult]:
+        """One result per setup phase that ran (or was reused) in this run, in completion order."""
+        with self._lock:
+            return list(self._results.values())
+
+    def ensure(self, setup_ids: list[str], cancel: CancelToken | None = None) -> GateResult | None:
+        """Make sure every phase in ``setup_ids`` has passed; the first one that did not, if any."""
+        for setup_id in setup_ids:
+            with self._lock:
+                setup_lock = self._setup_locks.setdefault(setup_id, threading.Lock())
+            with setup_lock:
+                result = self._results.get(setup_id)
+                if result is None:
+                    result = self._run(setup_id, cancel)
+                    # A cancelled phase is not remembered, so the next gate that needs it tries again.
+                    if result.status != "cancelled":
+                        with self._lock:
+                            self._results[setup_id] = result
+            if not result.passed:
+                return result
+        return None
+
+    def _run(self, setup_id: str, cancel: CancelToken | None) -> GateResult:
+        setup_cfg = dict(self.setups[setup_id])
+        with self._lock:
+            if self._content_ids is None:
+                self._content_ids = self.fingerprints()
+        key = setup_key(setup_cfg, self._content_ids)
+        if self.progress:
+            self.progress.emit("setup-started", setup_id=setup_id, key=key[:16])
+        result = self._reuse(setup_id, setup_cfg, key)
+        if result is None:
+            result = self.run_fn(setup_id, setup_cfg, cancel)
+            result.execution_key = key[:16]
+            if result.status == "passed":
+                self._store(setup_id, setup_cfg, key, result)
+        if self.progress:
+            self.progress.emit(
+                "setup-finished",
+                setup_id=setup_id,
+                status=result.status,
+                source=result.source,
+                duration_ms=result.duration_ms,
+            )
+        return result
+
+    def _entry_dir(self, setup_id: str, key: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / setup_id / key
+
+    def _reuse(self, setup_id: str, setup_cfg: dict[str, Any], key: str) -> GateResult | None:
+        if self.cache_dir is None or not self.read:
+            return None
+        entry = self._entry_dir(setup_id, key)
+        try:
+            cached = GateResult.from_dict(json.loads((entry / RESULT_FILE).read_text(encoding="utf-8")))
+        except (OSError, ValueError, TypeError):
+            return None
+
+        started = monotonic()
+        outputs = list(setup_cfg.get("outputs", ()))
+        in_place = self._state().get(setup_id) == key and all((self.root / out).exists() for out in outputs)
+        if not in_place:
+            try:
+                for output in outputs:
+                    _remove(self.root / output)
+                    _copy(entry / OUTPUTS_DIR / output, self.root / output)
+            except OSError:
+                return None
+            self._record_state(setup_id, key)
+        os.utime(entry)
+        return replace(
+            cached,
+            duration_ms=int((monotonic() - started) * 1000),
+            log_ref="",
+            stderr_ref="",
+            source="cache" if in_place else "restored",
+            execution_key=key[:16],
+        )
+
+    def _store(self, setup_id: str, setup_cfg: dict[str, Any], key: str, result: GateResult) -> None:
+        self._record_state(setup_id, key)
+        if self.cache_dir is None:
+            return
+        outputs = list(setup_cfg.get("outputs", ()))
+        if not all((self.root / output).exists() for output in outputs):
+            return  # nothing complete to restore from
+        entry = self._entry_dir(setup_id, key)
+        tmp = entry.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        _remove(tmp)
+        for output in outputs:
+            _copy(self.root / output, tmp / OUTPUTS_DIR / output)
+        tmp.mkdir(parents=True, exist_ok=True)
+        (tmp / RESULT_FILE).write_text(json.dumps(result.to_dict()), encoding="utf-8")
+        _remove(entry)
+        os.replace(tmp, entry)
+        self._evict(setup_id)
+
+    def _evict(self, setup_id: str) -> None:
+        entries = []
+        for path in (self.cache_dir / setup_id).iterdir():  # type: ignore[operator]
+            if path.suffix != ".tmp":
+                try:
+                    entries.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+        for _, path in sorted(entries, reverse=True)[self.keep :]:
+            shutil.rmtree(path, ignore_errors=True)
+
+    def _state(self) -> dict[str, str]:
+        if self.state_path is None:
+            return {}
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _record_state(self, setup_id: str, key: str) -> None:
+        if self.state_path is None:
+            return
+        with self._lock:
+            state = {**self._state(), setup_id: key}
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.state_path)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import hashlib
+from collections import Counter
+from statistics import median
+from typing import Any
+
+
+SHARD_STRATEGIES = ("duration", "hash")
+SUMMARY_COUNTERS = (
+    "total_tasks",
+    "passed_tasks",
+    "escalated_tasks",
+    "cancelled_tasks",
+    "blocking_failures",
+    "advisory_failures",
+    "gate_ms",
+    "setup_ms",
+)
+
+
+def parse_shard(text: str) -> tuple[int, int]:
+    """``"i/N"`` as ``(i, N)``; shards are numbered from 1."""
+    index, sep, count = text.partition("/")
+    if not sep or not index.isdigit() or not count.isdigit() or not 1 <= int(index) <= int(count):
+        raise ValueError(f"expected i/N with 1 <= i <= N, got: {text}")
+    return int(index), int(count)
+
+
+def hash_shard(task_id: str, count: int) -> int:
+    """Stable 1-based shard for ``task_id`` that does not depend on any other task."""
+    digest = hashlib.sha256(task_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def assign_shards(
+    expected_ms: dict[str, float | None], count: int, strategy: str = "duration"
+) -> tuple[dict[str, int], str]:
+    """1-based shard for every task id, and the strategy actually used.
+
+    ``duration`` packs tasks longest expected first onto the shard with the
+    least expected work so far (ties go to the lower shard, then the lower
+    task id, so every shard computes the same plan). Tasks without an
+    estimate count as the median of the others. With no estimates at all it
+    falls back to ``hash``.
+    """
+    known = [ms for ms in expected_ms.values() if ms is not None]
+    if strategy == "hash" or not known:
+        return {task_id: hash_shard(task_id, count) for task_id in expected_ms}, "hash"
+
+    default = median(known)
+    costs = sorted(
+        ((default if ms is None else ms, task_id) for task_id, ms in expected_ms.items()),
+        key=lambda pair: (-pair[0], pair[1]),
+    )
+    loads = [0.0] * count
+    shards = {}
+    for cost, task_id in costs:
+        target = loads.index(min(loads))
+        shards[task_id] = target + 1
+        loads[target] += cost
+    return shards, "duration"
+
+
+def merge_summaries(summaries: list[dict[str, Any]]) -> tuple[dict[str, Any], list[str]]:
+    """Combine per-shard ``summary.json`` payloads; also returns what makes the set incomplete.
+
+    The merged summary has no ``run_id``; the caller assigns one. Problems
+    are shards missing or duplicated, tasks run by more than one shard, and
+    selected tasks that no shard ran.
+    """
+    problems: list[str] = []
+    shards = [summary.get("shard") for summary in summaries]
+    for summary, shard in zip(summaries, shards):
+        if not shard:
+            problems.append(f"run {summary['run_id']} was not sharded")
+
+    sharded = [shard for shard in shards if shard]
+    counts = sorted({shard["count"] for shard in sharded})
+    selected: list[str] = []
+    missing: list[str] = []
+    if len(counts) > 1:
+        problems.append(f"shards disagree on the shard count: {', '.join(map(str, counts))}")
+    elif counts:
+        indexes = Counter(shard["index"] for shard in sharded)
+        missing = [str(index) for index in range(1, counts[0] + 1) if index not in indexes]
+        if missing:
+            problems.append(f"missing shard(s) {', '.join(missing)} of {counts[0]}")
+        problems.extend(f"shard {index} given {n} times" for index, n in sorted(indexes.items()) if n > 1)
+        selections = {tuple(shard["of_tasks"]) for shard in sharded}
+        if len(selections) > 1:
+            problems.append("shards selected different tasks (different TASKS.md or policy?)")
+        selected = list(sharded[0]["of_tasks"])
+
+    tasks = [task for summary in summaries for task in summary["tasks"]]
+    runs = Counter(task["task_id"] for task in tasks)
+    problems.extend(f"task {task_id} ran in {n} shards" for task_id, n in sorted(runs.items()) if n > 1)
+    if counts and not missing:
+        unrun = [task_id for task_id in selected if task_id not in runs]
+        problems.extend(f"task {task_id} was not run by any shard" for task_id in unrun)
+    position = {task_id: i for i, task_id in enumerate(selected)}
+    tasks.sort(key=lambda task: position.get(task["task_id"], len(position)))
+
+    first = summaries[0]
+    executions: Counter[str] = Counter()
+    for summary in summaries:
+        executions.update(summary.get("gate_executions", {}))
+    merged = {
+        "task_source": first["task_source"],
+        **{key: sum(summary.get(key, 0) for summary in summaries) for key in SUMMARY_COUNTERS},
+        "fail_fast": first.get("fail_fast"),
+        "since": first.get("since"),
+        "resumed": any(summary.get("resumed") for summary in summaries),
+        "interrupted": next((s["interrupted"] for s in summaries if s.get("interrupted")), None),
+        "gate_executions": dict(executions),
+        "setup": [
+            {**phase, "run_id": summary["run_id"]}
+            for summary in summaries
+            for phase in summary.get("setup", [])
+        ],
+        "tasks": tasks,
+        "shards": [
+            {
+                "run_id": summary["run_id"],
+                "index": shard["index"] if shard else None,
+                "count": shard["count"] if shard else None,
+                "strategy": shard["strategy"] if shard else None,
+                "total_tasks": summary["total_tasks"],
+                "blocking_failures": summary["blocking_failures"],
+            }
+            for summary, shard in zip(summaries, shards)
+        ],
+        "merge_problems": problems,
+    }
+    return merged, problems
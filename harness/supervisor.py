@@ -3,19 +3,54 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import signal
+import sys
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
 from time import monotonic
+from typing import Any, Callable
 
 from harness.artifact_writer import write_summary_artifacts, write_task_artifacts
+from harness.async_gate_runner import AsyncGateEngine
+from harness.cancellation import CancelToken
+from harness.distributed import DEFAULT_HEARTBEAT_TIMEOUT, GateCoordinator, GateWorker
 from harness.escalator import build_escalation_report
-from harness.gate_runner import run_gate
-from harness.policy_loader import load_policy
-from harness.profile_resolver import resolve_gates, resolve_profiles
+from harness.file_inventory import DEFAULT_INDEX_PATH
+from harness.gate_cache import DEFAULT_MAX_BYTES, GateCache
+from harness.gate_history import ORDERS, GateHistory
+from harness.gate_runner import (
+    ADAPTIVE_TIMEOUT_KEY,
+    DEFAULT_TIMEOUT_SECONDS,
+    GateRunFn,
+    SingleFlightGateRunner,
+    run_gate,
+)
+from harness.gate_scheduler import gate_edges
+from harness.impact import changed_files_since, unaffected_gates
+from harness.policy_loader import CompiledPolicy, load_policy
+from harness.progress import ProgressEmitter
+from harness.python_pool import DEFAULT_PRELOAD, DEFAULT_RECYCLE_AFTER, PythonGatePool
+from harness.python_pool import RUNNER as PYTHON_POOL_RUNNER
+from harness.resource_pool import GATE_CPUS_ENV, GateDemand, ResourcePool
 from harness.retry_controller import run_with_retries
+from harness.run_journal import RunJournal, load_journal
+from harness.setup_phases import DEFAULT_KEEP as DEFAULT_SETUP_KEEP
+from harness.setup_phases import SetupRunner
+from harness.sharding import SHARD_STRATEGIES, assign_shards, merge_summaries, parse_shard
 from harness.task_loader import load_tasks
-from harness.types import SupervisorRun
+from harness.test_report import narrowed_gate_cfg
+from harness.types import GateResult, ProfileResolution, SupervisorRun, TaskRecord
+
+
+DEFAULT_ADAPTIVE_QUANTILE = 0.99
+DEFAULT_ADAPTIVE_FACTOR = 3.0
+DEFAULT_ADAPTIVE_MIN_SECONDS = 60.0
+DEFAULT_ADAPTIVE_MIN_SAMPLES = 5
 
 
 def _utc_now() -> str:
@@ -36,81 +71,475 @@ def _filter_target_tasks(tasks, task_source: str, policy: dict, task_ids: list[s
 
 
 def _status_for_profile_failure(status: str, has_blocking_profile: bool) -> tuple[bool, bool]:
-    if status == "passed":
+    if status in {"passed", "cancelled"}:
         return (False, False)
     if has_blocking_profile:
         return (True, False)
     return (False, True)
 
 
+def _run_task(
+    task: TaskRecord,
+    policy: CompiledPolicy,
+    run_id: str,
+    artifacts_dir: str,
+    run_gate_fn: Callable[[str, str, int, CancelToken], GateResult],
+    gate_workers: int,
+    progress: ProgressEmitter | None = None,
+    gate_sort_key: Callable[[str], Any] | None = None,
+    cancel: CancelToken | None = None,
+    fail_fast: str | None = None,
+    journal: RunJournal | None = None,
+) -> tuple[SupervisorRun, ProfileResolution]:
+    started = monotonic()
+    started_at = _utc_now()
+    max_retries = int(policy["retry"]["max_retries"])
+
+    resolution = policy.resolve(task.tags)
+    gate_ids = policy.gates_for(resolution.profiles)
+    if progress:
+        progress.emit("task-started", task_id=task.id, gates=gate_ids)
+
+    # Only a failure that makes the task block the run is worth cutting short for.
+    task_cancel = CancelToken(parent=cancel)
+    fail_fast_token = None
+    if fail_fast and resolution.blocking_profiles:
+        fail_fast_token = cancel if fail_fast == "run" and cancel else task_cancel
+
+    status, attempt, failed_gates, gate_results, transitions = run_with_retries(
+        gate_ids,
+        max_retries,
+        lambda gate_id, attempt: run_gate_fn(task.id, gate_id, attempt, task_cancel),
+        edges=gate_edges(gate_ids, policy["gates"]),
+        max_workers=gate_workers,
+        sort_key=gate_sort_key,
+        cancel=task_cancel,
+        fail_fast=fail_fast_token,
+    )
+    for gate in gate_results:
+        if not gate.log_ref:
+            gate.log_ref = "task-markdown-artifact"
+
+    escalation = None
+    if status == "escalated":
+        escalation = build_escalation_report(
+            run_id=run_id,
+            task_id=task.id,
+            failed_gates=failed_gates,
+            attempts=attempt,
+        )
+
+    task_run = SupervisorRun(
+        run_id=run_id,
+        task_id=task.id,
+        task_title=task.title,
+        tags=task.tags,
+        profiles_resolved=resolution.profiles,
+        gates_run=gate_ids,
+        attempt=attempt,
+        status=status,
+        failed_gates=failed_gates,
+        started_at=started_at,
+        ended_at=_utc_now(),
+        duration_ms=int((monotonic() - started) * 1000),
+        escalation=escalation,
+        warnings=resolution.warnings,
+        gate_results=gate_results,
+        state_transitions=["queued"] + transitions,
+    )
+
+    refs = write_task_artifacts(artifacts_dir, task_run)
+    for gate in task_run.gate_results:
+        if gate.log_ref == "task-markdown-artifact":
+            gate.log_ref = refs["markdown"]
+    if journal:
+        journal.task_finished(task_run)
+    if progress:
+        progress.emit(
+            "task-finished",
+            task_id=task.id,
+            status=status,
+            failed_gates=failed_gates,
+            duration_ms=task_run.duration_ms,
+        )
+
+    return task_run, resolution
+
+
+def _order_tasks(
+    tasks: list[TaskRecord], policy: CompiledPolicy, history: GateHistory | None, order: str
+) -> list[int]:
+    """Positions of ``tasks`` in the order they should start."""
+    positions = list(range(len(tasks)))
+    task_key = history.task_sort_key(order) if history else None
+    if task_key is None:
+        return positions
+
+    def _key(position: int) -> Any:
+        task = tasks[position]
+        gate_ids = policy.gates_for(policy.resolve(task.tags).profiles)
+        return task_key(task.id, gate_ids)
+
+    return sorted(positions, key=_key)
+
+
+def _shard_tasks(
+    tasks: list[TaskRecord],
+    policy: CompiledPolicy,
+    history: GateHistory | None,
+    shard_arg: tuple[int, int],
+    strategy: str,
+) -> tuple[list[TaskRecord], dict[str, Any]]:
+    """This shard's share of ``tasks`` (in selection order) and the shard record for the summary."""
+    index, count = shard_arg
+    expected = {}
+    for task in tasks:
+        gate_ids = policy.gates_for(policy.resolve(task.tags).profiles)
+        expected[task.id] = history.expected_task_duration_ms(task.id, gate_ids) if history else None
+    shards, used = assign_shards(expected, count, strategy)
+    shard = {"index": index, "count": count, "strategy": used, "of_tasks": [task.id for task in tasks]}
+    return [task for task in tasks if shards[task.id] == index], shard
+
+
+def _adaptive_gate_cfg(gate_id: str, gate_cfg: dict, history: GateHistory, timeouts_cfg: dict) -> dict:
+    """``gate_cfg`` limited to the recent p99 passing duration times ``factor``, when that is tighter."""
+    if gate_cfg.get("adaptive_timeout") is False:
+        return gate_cfg
+    quantile_ms = history.passed_duration_quantile_ms(
+        gate_id,
+        float(timeouts_cfg.get("quantile", DEFAULT_ADAPTIVE_QUANTILE)),
+        int(timeouts_cfg.get("min_samples", DEFAULT_ADAPTIVE_MIN_SAMPLES)),
+    )
+    if quantile_ms is None:
+        return gate_cfg
+    factor = float(timeouts_cfg.get("factor", DEFAULT_ADAPTIVE_FACTOR))
+    limit = max(float(timeouts_cfg.get("min_seconds", DEFAULT_ADAPTIVE_MIN_SECONDS)), quantile_ms / 1000 * factor)
+    if limit >= float(gate_cfg.get("timeout_seconds", DEFAULT_TIMEOUT_SECONDS)):
+        return gate_cfg
+    return {**gate_cfg, ADAPTIVE_TIMEOUT_KEY: round(limit, 1)}
+
+
+def _setup_cache_dir(args: argparse.Namespace, policy: dict) -> Path | None:
+    cache_cfg = policy.get("cache", {})
+    if args.no_cache or cache_cfg.get("enabled", True) is False:
+        return None
+    return Path(cache_cfg.get("setup_dir") or Path(args.artifacts_dir) / "cache" / "setup")
+
+
+def _build_cache(args: argparse.Namespace, policy: dict) -> GateCache | None:
+    if args.no_cache:
+        return None
+    cache_cfg = policy.get("cache", {})
+    if cache_cfg.get("enabled", True) is False and not args.cache_dir:
+        return None
+    cache_dir = Path(args.cache_dir or cache_cfg.get("dir") or Path(args.artifacts_dir) / "cache" / "gates")
+
+    # Keep run artifacts and the caches themselves out of the input hashes.
+    exclude = []
+    root = Path.cwd().resolve()
+    for path in filter(None, (Path(args.artifacts_dir), cache_dir, _setup_cache_dir(args, policy))):
+        try:
+            exclude.append(path.resolve().relative_to(root).as_posix())
+        except ValueError:
+            pass
+
+    return GateCache(
+        cache_dir,
+        root=root,
+        max_bytes=int(cache_cfg.get("max_bytes", DEFAULT_MAX_BYTES)),
+        read=not args.refresh_cache,
+        exclude=tuple(exclude),
+        index_path=Path(args.artifacts_dir) / "cache" / DEFAULT_INDEX_PATH.name,
+    )
+
+
 def run_supervisor(args: argparse.Namespace) -> int:
     policy = load_policy(args.policy_file)
     all_tasks = load_tasks(args.tasks_file)
-    selected_tasks = _filter_target_tasks(all_tasks, args.task_source, policy, args.task_ids)
 
-    run_id = str(uuid.uuid4())
-    max_retries = int(policy["retry"]["max_retries"])
+    # A resumed run keeps its id and original task selection.
+    resume = load_journal(args.artifacts_dir, args.resume) if args.resume else None
+    if resume:
+        run_id = resume.run_id
+        task_source = resume.selection.get("task_source", args.task_source)
+        selected_tasks = _filter_target_tasks(all_tasks, "ids", policy, resume.selection.get("task_ids", []))
+    else:
+        run_id = str(uuid.uuid4())
+        task_source = args.task_source
+        selected_tasks = _filter_target_tasks(all_tasks, args.task_source, policy, args.task_ids)
+
+    timeouts_cfg = policy.get("timeouts", {})
+    adaptive_timeouts = args.adaptive_timeouts or bool(timeouts_cfg.get("adaptive", False))
+    needs_history = args.order != "policy" or args.shard or adaptive_timeouts
+    history = GateHistory.load(args.artifacts_dir) if needs_history else None
+    shard = resume.selection.get("shard") if resume else None
+    if args.shard and not resume:
+        selected_tasks, shard = _shard_tasks(selected_tasks, policy, history, args.shard, args.shard_strategy)
+
+    # Setup outputs exist only in this workspace, so remote workers could not use them.
+    if getattr(args, "listen", None):
+        needs_setup = sorted(
+            {
+                gate_id
+                for task in selected_tasks
+                for gate_id in policy.gates_for(policy.resolve(task.tags).profiles)
+                if policy["gates"][gate_id].get("setup")
+            }
+        )
+        if needs_setup:
+            print(
+                "Setup phases are not supported in coordinator mode; "
+                f"gates declaring setup: {', '.join(needs_setup)}",
+                file=sys.stderr,
+            )
+            return 2
+
+    scheduler_cfg = policy.get("scheduler", {})
+    gate_workers = args.gate_workers or int(scheduler_cfg.get("max_parallel_gates", 1))
+    max_gate_processes = args.max_gate_processes or scheduler_cfg.get("max_gate_processes")
+    jobs = max(1, args.jobs)
+
+    cache = _build_cache(args, policy)
+    log_dir = Path(args.artifacts_dir) / run_id / "logs"
+    progress = ProgressEmitter(args.progress) if args.progress else None
+    engine = AsyncGateEngine(progress) if args.engine == "asyncio" else None
+    pool_cfg = policy.get("python_pool", {})
+    python_pool = PythonGatePool(
+        preload=pool_cfg.get("preload", DEFAULT_PRELOAD),
+        recycle_after=int(pool_cfg.get("recycle_after", DEFAULT_RECYCLE_AFTER)),
+        progress=progress,
+    )
+
+    # One pool shared by every task so --jobs cannot oversubscribe the machine.
+    # In coordinator mode every gate execution goes to a remote worker; the
+    # worker slots bound how many run at once and only the locks apply here.
+    coordinator = None
+    capacity_note = None
+    if getattr(args, "listen", None):
+        coordinator = GateCoordinator(
+            args.listen,
+            run_id,
+            python_pool=pool_cfg,
+            heartbeat_timeout=args.heartbeat_timeout,
+            progress=progress,
+        )
+        print(f"Coordinator listening on {coordinator.address}", file=sys.stderr)
+        resources = ResourcePool()
+    else:
+        # Without a configured cpu capacity every gate weighs at least 1 CPU, so
+        # a machine with fewer CPUs than gate workers would run gates one by one.
+        capacity = scheduler_cfg.get("capacity", {})
+        cpu = float(capacity.get("cpu") or max(os.cpu_count() or 1, gate_workers))
+        if not capacity.get("cpu") and cpu > (os.cpu_count() or 1):
+            capacity_note = (
+                f"cpu raised from {os.cpu_count() or 1} CPU(s) to {cpu:g} to allow {gate_workers} "
+                "parallel gates; set scheduler.capacity.cpu to override"
+            )
+        resources = ResourcePool(
+            cpu=cpu,
+            memory_mb=capacity.get("memory_mb"),
+            processes=int(max_gate_processes) if max_gate_processes else None,
+        )
+
+    # Setup phases run here, next to the workspace; coordinator mode rejects gates that need them.
+    def _run_setup_process(setup_id: str, setup_cfg: dict, cancel: CancelToken | None) -> GateResult:
+        with resources.hold(GateDemand.from_gate(setup_cfg), cancel) as admitted:
+            if not admitted:
+                return GateResult.not_run(
+                    setup_id, "cancelled", 1, "Not run: cancelled", command=setup_cfg["command"]
+                )
+            return run_gate(setup_id, setup_cfg, 1, log_dir=log_dir / "setup", cancel=cancel)
+
+    setups = SetupRunner(
+        policy.get("setup", {}),
+        _run_setup_process,
+        root=Path.cwd().resolve(),
+        cache_dir=_setup_cache_dir(args, policy),
+        state_path=Path(args.artifacts_dir) / "setup-state.json",
+        read=not args.refresh_cache,
+        keep=int(policy.get("cache", {}).get("setup_keep", DEFAULT_SETUP_KEEP)),
+        progress=progress,
+        fingerprints=cache.fingerprints if cache else None,
+    )
+
+    def _run_gate_process(
+        gate_id: str, gate_cfg: dict, attempt: int, cancel: CancelToken | None = None
+    ) -> GateResult:
+        if cache:
+            hit = cache.lookup(gate_id, gate_cfg, attempt)
+            if hit:
+                if progress:
+                    progress.emit(
+                        "gate-finished", gate_id=gate_id, attempt=attempt, status=hit.status, source="cache"
+                    )
+                return hit
+        failed_setup = setups.ensure(list(gate_cfg.get("setup", ())), cancel)
+        if failed_setup:
+            if failed_setup.status == "cancelled":
+                status, reason = "cancelled", "Not run: cancelled"
+            else:
+                status, reason = "blocked", f"Not run: setup {failed_setup.gate_id} did not pass"
+            return GateResult.not_run(gate_id, status, attempt, reason, command=gate_cfg["command"])
+        demand = GateDemand.from_gate(gate_cfg)
+        # The gate sizes its own worker pool from the CPUs it was admitted with.
+        env = {**gate_cfg.get("env", {}), GATE_CPUS_ENV: str(resources.reserved_cpus(demand))}
+        run_cfg = {**gate_cfg, "env": env}
+        with resources.hold(demand, cancel) as admitted:
+            if not admitted:
+                return GateResult.not_run(
+                    gate_id, "cancelled", attempt, "Not run: cancelled", command=gate_cfg["command"]
+                )
+            runner: GateRunFn
+            if coordinator:
+                runner = coordinator.run
+            # A gate's policy runner wins over --engine, which only picks how plain subprocess gates run.
+            elif gate_cfg.get("runner") == PYTHON_POOL_RUNNER:
+                runner = partial(python_pool.run, log_dir=log_dir)
+            elif engine:
+                runner = partial(engine.run, log_dir=log_dir)
+            else:
+                runner = partial(run_gate, log_dir=log_dir, progress=progress)
+            result = runner(gate_id, run_cfg, attempt, cancel=cancel)
+        if cache:
+            cache.store(gate_cfg, result)
+        return result
+
+    flights = SingleFlightGateRunner(_run_gate_process)
+
+    skipped: set[str] = set()
+    if args.since:
+        skipped = unaffected_gates(policy["gates"], changed_files_since(args.since))
+
+    journal = RunJournal(args.artifacts_dir, run_id)
+
+    # Each task/gate's latest result, so a retry can be narrowed to the tests that failed.
+    last_results: dict[tuple[str, str], GateResult] = {}
+
+    def _gate_result(task_id: str, gate_id: str, attempt: int, cancel: CancelToken) -> GateResult:
+        previous = last_results.get((task_id, gate_id))
+        gate_cfg = narrowed_gate_cfg(policy["gates"][gate_id], previous)
+        # A gate that hit its adaptive timeout is retried with the full timeout_seconds.
+        if history and adaptive_timeouts and not (previous and previous.status == "timed-out"):
+            gate_cfg = _adaptive_gate_cfg(gate_id, gate_cfg, history, timeouts_cfg)
+        done = resume.passed_gate(task_id, gate_id) if resume else None
+        if done:
+            return replace(done, attempt=attempt, source="resumed")
+        if gate_id in skipped:
+            reason = f"Not run: no file matching its inputs changed since {args.since}"
+            result = GateResult.not_run(
+                gate_id, "skipped-unaffected", attempt, reason, command=gate_cfg["command"]
+            )
+            result.source = "skipped"
+            return result
+        return flights.run(gate_id, gate_cfg, attempt, cancel=cancel)
+
+    def _run_gate(task_id: str, gate_id: str, attempt: int, cancel: CancelToken) -> GateResult:
+        result = _gate_result(task_id, gate_id, attempt, cancel)
+        last_results[(task_id, gate_id)] = result
+        journal.gate_finished(task_id, result)
+        return result
+
+    gate_sort_key = history.gate_sort_key(args.order) if history else None
+
+    run_cancel = CancelToken()
+
+    def _run_one(task: TaskRecord) -> tuple[SupervisorRun, ProfileResolution]:
+        if resume and task.id in resume.finished_tasks:
+            return resume.finished_tasks[task.id], policy.resolve(task.tags)
+        return _run_task(
+            task,
+            policy,
+            run_id,
+            args.artifacts_dir,
+            _run_gate,
+            gate_workers,
+            progress,
+            gate_sort_key,
+            cancel=run_cancel,
+            fail_fast=args.fail_fast,
+            journal=journal,
+        )
+
+    # Tasks may start in history order, but results are reported in selection order.
+    run_order = _order_tasks(selected_tasks, policy, history, args.order)
+    ordered_tasks = [selected_tasks[position] for position in run_order]
+
+    # SIGINT/SIGTERM cancel the run: running gates are killed, the remaining
+    # tasks are recorded as cancelled and the partial summary is still written.
+    # A second signal gets the default behaviour.
+    interrupted: list[signal.Signals] = []
+    previous_handlers: dict[signal.Signals, Any] = {}
+
+    def _interrupt(signum: int, frame: Any) -> None:
+        interrupted.append(signal.Signals(signum))
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        journal.record("run-interrupted", signal=signal.Signals(signum).name)
+        run_cancel.cancel()
+
+    if threading.current_thread() is threading.main_thread():
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[sig] = signal.signal(sig, _interrupt)
+
+    journal.record(
+        "run-started",
+        run_id=run_id,
+        resumed=resume is not None,
+        selection={
+            "task_source": task_source,
+            "task_ids": [task.id for task in selected_tasks],
+            "shard": shard,
+        },
+    )
+    if progress:
+        progress.emit(
+            "run-started",
+            run_id=run_id,
+            tasks=[task.id for task in selected_tasks],
+            capacity={"cpu": resources.cpu, "memory_mb": resources.memory_mb, "processes": resources.processes},
+            **({"capacity_note": capacity_note} if capacity_note else {}),
+        )
+    try:
+        if jobs == 1:
+            finished = [_run_one(task) for task in ordered_tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=jobs) as pool:
+                finished = list(pool.map(_run_one, ordered_tasks))
+    finally:
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+        if engine:
+            engine.close()
+        if coordinator:
+            coordinator.close()
+        python_pool.close()
+    outcomes = [outcome for _, outcome in sorted(zip(run_order, finished), key=lambda pair: pair[0])]
 
     blocking_failures = 0
     advisory_failures = 0
     passed_tasks = 0
     escalated_tasks = 0
+    cancelled_tasks = 0
     task_summaries = []
+    gate_executions = {"executed": 0, "shared": 0, "cache": 0, "skipped": 0, "resumed": 0}
+    gate_ms = 0
 
-    for task in selected_tasks:
-        started = monotonic()
-        started_at = _utc_now()
-
-        resolution = resolve_profiles(task.tags, policy)
-        gate_ids = resolve_gates(resolution.profiles, policy)
-
-        def _run_gate(gate_id: str, attempt: int):
-            gate_cfg = policy["gates"][gate_id]
-            return run_gate(gate_id, gate_cfg, attempt)
-
-        status, attempt, failed_gates, gate_results, transitions = run_with_retries(
-            gate_ids, max_retries, _run_gate
-        )
-        for gate in gate_results:
-            gate.log_ref = "task-markdown-artifact"
+    for task_run, resolution in outcomes:
+        for gate in task_run.gate_results:
+            if gate.source in gate_executions:
+                gate_executions[gate.source] += 1
+            if gate.source == "executed":
+                gate_ms += gate.duration_ms
 
-        escalation = None
-        if status == "escalated":
+        if task_run.status == "escalated":
             escalated_tasks += 1
-            escalation = build_escalation_report(
-                run_id=run_id,
-                task_id=task.id,
-                failed_gates=failed_gates,
-                attempts=attempt,
-            )
+        elif task_run.status == "cancelled":
+            cancelled_tasks += 1
         else:
             passed_tasks += 1
 
-        task_run = SupervisorRun(
-            run_id=run_id,
-            task_id=task.id,
-            task_title=task.title,
-            tags=task.tags,
-            profiles_resolved=resolution.profiles,
-            gates_run=gate_ids,
-            attempt=attempt,
-            status=status,
-            failed_gates=failed_gates,
-            started_at=started_at,
-            ended_at=_utc_now(),
-            duration_ms=int((monotonic() - started) * 1000),
-            escalation=escalation,
-            warnings=resolution.warnings,
-            gate_results=gate_results,
-            state_transitions=["queued"] + transitions,
-        )
-
-        refs = write_task_artifacts(args.artifacts_dir, task_run)
-        for gate in task_run.gate_results:
-            gate.log_ref = refs["markdown"]
-
         has_blocking_profile = len(resolution.blocking_profiles) > 0
-        blocking, advisory = _status_for_profile_failure(status, has_blocking_profile)
+        blocking, advisory = _status_for_profile_failure(task_run.status, has_blocking_profile)
         if blocking:
             blocking_failures += 1
         if advisory:
@@ -118,27 +547,59 @@ def run_supervisor(args: argparse.Namespace) -> int:
 
         task_summaries.append(
             {
-                "task_id": task.id,
-                "task_title": task.title,
-                "status": status,
+                "task_id": task_run.task_id,
+                "task_title": task_run.task_title,
+                "status": task_run.status,
                 "profiles": resolution.profiles,
-                "failed_gates": failed_gates,
+                "failed_gates": task_run.failed_gates,
                 "warnings": resolution.warnings,
+                "cache_hits": sum(1 for gate in task_run.gate_results if gate.source == "cache"),
             }
         )
 
     summary = {
         "run_id": run_id,
-        "task_source": args.task_source,
+        "task_source": task_source,
         "total_tasks": len(selected_tasks),
+        "shard": shard,
         "passed_tasks": passed_tasks,
         "escalated_tasks": escalated_tasks,
+        "cancelled_tasks": cancelled_tasks,
+        "fail_fast": args.fail_fast,
+        "since": args.since,
+        "resumed": resume is not None,
+        "interrupted": interrupted[0].name if interrupted else None,
         "blocking_failures": blocking_failures,
         "advisory_failures": advisory_failures,
+        "gate_executions": gate_executions,
+        "gate_ms": gate_ms,
+        "setup_ms": sum(result.duration_ms for result in setups.results),
+        "setup": [
+            {
+                "setup_id": result.gate_id,
+                "status": result.status,
+                "source": result.source,
+                "duration_ms": result.duration_ms,
+                "key": result.execution_key,
+                "log_ref": result.log_ref,
+            }
+            for result in setups.results
+        ],
         "tasks": task_summaries,
     }
 
     refs = write_summary_artifacts(args.artifacts_dir, run_id, summary)
+    journal.record("run-finished", summary=refs["json"], interrupted=summary["interrupted"])
+    journal.close()
+    if progress:
+        progress.emit(
+            "run-finished",
+            run_id=run_id,
+            blocking_failures=blocking_failures,
+            advisory_failures=advisory_failures,
+            summary=refs["json"],
+        )
+        progress.close()
     print(json.dumps(summary, indent=2))
     print(f"Summary artifact: {refs['json']}")
 
@@ -147,19 +608,177 @@ def run_supervisor(args: argparse.Namespace) -> int:
         with open(step_summary, "a", encoding="utf-8") as handle:
             handle.write(Path(refs["markdown"]).read_text(encoding="utf-8"))
 
+    if interrupted:
+        print(f"Run interrupted by {interrupted[0].name}; continue with: --resume {run_id}", file=sys.stderr)
+        return 128 + interrupted[0].value
     return 1 if blocking_failures > 0 else 0
 
 
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(description="Run supervisor harness on TASKS.md")
-    sub = parser.add_subparsers(dest="command", required=True)
+def merge_runs(args: argparse.Namespace) -> int:
+    paths: list[Path] = []
+    for raw in args.summaries:
+        path = Path(raw)
+        paths.extend(sorted(path.rglob("summary.json")) if path.is_dir() else [path])
+    if not paths:
+        print("No summary.json files found", file=sys.stderr)
+        return 2
+    summaries = [json.loads(path.read_text(encoding="utf-8")) for path in paths]
+    merged, problems = merge_summaries(summaries)
+    run_id = str(uuid.uuid4())
+    summary = {"run_id": run_id, **merged}
 
-    run = sub.add_parser("run", help="Run supervisor")
+    refs = write_summary_artifacts(args.artifacts_dir, run_id, summary)
+    print(json.dumps(summary, indent=2))
+    print(f"Summary artifact: {refs['json']}")
+
+    step_summary = os.getenv("GITHUB_STEP_SUMMARY")
+    if step_summary:
+        with open(step_summary, "a", encoding="utf-8") as handle:
+            handle.write(Path(refs["markdown"]).read_text(encoding="utf-8"))
+
+    for problem in problems:
+        print(f"merge: {problem}", file=sys.stderr)
+    if summary["interrupted"]:
+        return 128 + signal.Signals[summary["interrupted"]].value
+    return 1 if summary["blocking_failures"] > 0 or problems else 0
+
+
+def run_worker(args: argparse.Namespace) -> int:
+    worker = GateWorker(
+        args.connect,
+        slots=args.slots,
+        name=args.name,
+        artifacts_dir=args.artifacts_dir,
+        connect_timeout=args.connect_timeout,
+    )
+    return worker.run()
+
+
+def _shard_arg(text: str) -> tuple[int, int]:
+    try:
+        return parse_shard(text)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from None
+
+
+def _add_run_arguments(run: argparse.ArgumentParser) -> None:
     run.add_argument("--tasks-file", default="TASKS.md")
     run.add_argument("--policy-file", default="harness/supervisor_policy.json")
     run.add_argument("--artifacts-dir", default=".supervisor-artifacts")
     run.add_argument("--task-source", choices=["pilot", "all", "ids"], default="pilot")
     run.add_argument("--task-ids", nargs="*", default=[])
+    run.add_argument(
+        "--gate-workers",
+        type=int,
+        default=None,
+        help="Max gates run concurrently within a task (default: scheduler.max_parallel_gates)",
+    )
+    run.add_argument("--jobs", type=int, default=1, help="Number of tasks run concurrently")
+    run.add_argument(
+        "--order",
+        choices=ORDERS,
+        default="policy",
+        help="Start gates/tasks in policy order, longest expected runtime first, or likeliest failure first",
+    )
+    run.add_argument(
+        "--fail-fast",
+        nargs="?",
+        const="task",
+        choices=["task", "run"],
+        default=None,
+        help="Cancel a blocking task's remaining gates once it is certain to escalate "
+        "('run' also cancels every other task)",
+    )
+    run.add_argument(
+        "--max-gate-processes",
+        type=int,
+        default=None,
+        help="Global cap on running gate processes (default: scheduler.max_gate_processes)",
+    )
+    run.add_argument(
+        "--engine",
+        choices=["subprocess", "asyncio"],
+        default="subprocess",
+        help=(
+            "Engine for gates with the default subprocess runner (python-pool gates always fork from "
+            "the zygote); asyncio moves their process I/O and timeouts onto one event loop, though each "
+            "running gate still occupies a scheduler thread"
+        ),
+    )
+    run.add_argument(
+        "--progress", default=None, help="Write NDJSON progress events to this file ('-' for stderr)"
+    )
+    run.add_argument(
+        "--since",
+        default=None,
+        metavar="SHA",
+        help="Skip gates whose inputs globs match no file changed since this commit",
+    )
+    run.add_argument(
+        "--shard",
+        type=_shard_arg,
+        default=None,
+        metavar="I/N",
+        help="Run only shard I of N of the selected tasks, balanced by recorded task durations",
+    )
+    run.add_argument(
+        "--shard-strategy",
+        choices=SHARD_STRATEGIES,
+        default="duration",
+        help="duration: balance by history (hash when there is none); hash: by task id only",
+    )
+    run.add_argument(
+        "--adaptive-timeouts",
+        action="store_true",
+        help="Cut gates off at their recent p99 passing duration times timeouts.factor (also timeouts.adaptive)",
+    )
+    run.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN_ID",
+        help="Continue an interrupted run: finished tasks and passed gates from its journal are reused",
+    )
+    run.add_argument("--cache-dir", default=None, help="Gate result cache directory (default: cache.dir)")
+    cache_mode = run.add_mutually_exclusive_group()
+    cache_mode.add_argument("--no-cache", action="store_true", help="Neither read nor write the gate cache")
+    cache_mode.add_argument(
+        "--refresh-cache", action="store_true", help="Ignore cached results but store fresh ones"
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Run supervisor harness on TASKS.md")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run supervisor")
+    _add_run_arguments(run)
+
+    coordinator = sub.add_parser("coordinator", help="Run supervisor, executing gates on connected workers")
+    _add_run_arguments(coordinator)
+    coordinator.add_argument(
+        "--listen", required=True, metavar="ADDRESS", help="host:port or unix:/path to accept workers on"
+    )
+    coordinator.add_argument(
+        "--heartbeat-timeout",
+        type=float,
+        default=DEFAULT_HEARTBEAT_TIMEOUT,
+        help="Seconds of silence after which a worker is dropped and its gates are requeued",
+    )
+
+    merge = sub.add_parser("merge", help="Combine per-shard summaries into one summary and exit code")
+    merge.add_argument("summaries", nargs="+", help="summary.json files, or directories searched for them")
+    merge.add_argument("--artifacts-dir", default=".supervisor-artifacts", help="Where the merged summary goes")
+
+    worker = sub.add_parser("worker", help="Execute gates for a coordinator")
+    worker.add_argument("--connect", required=True, metavar="ADDRESS", help="Coordinator host:port or unix:/path")
+    worker.add_argument(
+        "--slots", type=int, default=os.cpu_count() or 1, help="Gates run at once (default: CPU count)"
+    )
+    worker.add_argument("--name", default=None, help="Worker name in progress events (default: host-pid)")
+    worker.add_argument("--artifacts-dir", default=".supervisor-artifacts", help="Where gate logs are written")
+    worker.add_argument(
+        "--connect-timeout", type=float, default=30.0, help="Seconds to keep retrying the coordinator"
+    )
 
     return parser
 
@@ -167,8 +786,12 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
-    if args.command == "run":
+    if args.command in ("run", "coordinator"):
         return run_supervisor(args)
+    if args.command == "merge":
+        return merge_runs(args)
+    if args.command == "worker":
+        return run_worker(args)
     parser.error("Unknown command")
     return 2
 
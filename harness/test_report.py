@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import json
+import xml.etree.ElementTree as ElementTree
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any
+
+from harness.types import GateResult
+
+
+RETRY_TESTS_ENV = "SUPERVISOR_RETRY_TESTS"
+REPORT_FORMATS = ("unittest-json", "junit")
+FAILING_OUTCOMES = frozenset({"failed", "error", "unexpected-success"})
+
+
+@dataclass(frozen=True)
+class TestOutcome:
+    test_id: str
+    outcome: str  # "passed" | "failed" | "error" | "skipped" | "expected-failure" | "unexpected-success"
+    duration_ms: int = 0
+    message: str = ""
+
+
+def parse_unittest_json(data: dict[str, Any]) -> list[TestOutcome]:
+    """Outcomes from the report written by ``harness.scripts.test_runner``."""
+    return [
+        TestOutcome(
+            test["id"], test["outcome"], int(test.get("duration_ms", 0)), test.get("message", "")
+        )
+        for test in data["tests"]
+    ]
+
+
+def parse_junit_xml(text: str) -> list[TestOutcome]:
+    """Outcomes from a JUnit XML report; test ids are ``classname.name``."""
+    outcomes = []
+    for case in ElementTree.fromstring(text).iter("testcase"):
+        classname = case.get("classname", "")
+        test_id = f"{classname}.{case.get('name', '')}" if classname else case.get("name", "")
+        duration_ms = int(float(case.get("time") or 0) * 1000)
+        outcome, message = "passed", ""
+        for child, kind in (("failure", "failed"), ("error", "error"), ("skipped", "skipped")):
+            element = case.find(child)
+            if element is not None:
+                outcome, message = kind, element.get("message") or (element.text or "").strip()
+                break
+        outcomes.append(TestOutcome(test_id, outcome, duration_ms, message))
+    return outcomes
+
+
+def load_test_report(path: str | Path, fmt: str) -> list[TestOutcome] | None:
+    """Per-test outcomes from a gate's report, or None if it is missing or unreadable."""
+    try:
+        text = Path(path).read_text(encoding="utf-8")
+        if fmt == "junit":
+            return parse_junit_xml(text)
+        return parse_unittest_json(json.loads(text))
+    except (OSError, ValueError, KeyError, TypeError, ElementTree.ParseError):
+        return None
+
+
+def with_test_outcomes(result: GateResult, gate_cfg: dict[str, Any]) -> GateResult:
+    """Attach test counts and failed test ids from the gate's ``test_report``, if it declares one."""
+    fmt = gate_cfg.get("test_report")
+    if not fmt or not result.report_ref:
+        return result
+    outcomes = load_test_report(result.report_ref, fmt)
+    if outcomes is None:
+        return result
+    counts: dict[str, int] = {}
+    for outcome in outcomes:
+        counts[outcome.outcome] = counts.get(outcome.outcome, 0) + 1
+    failed = sorted({outcome.test_id for outcome in outcomes if outcome.outcome in FAILING_OUTCOMES})
+    return replace(result, test_counts=counts, failed_tests=failed)
+
+
+def is_narrowed(gate_cfg: dict[str, Any]) -> bool:
+    return RETRY_TESTS_ENV in gate_cfg.get("env", {})
+
+
+def narrowed_gate_cfg(gate_cfg: dict[str, Any], previous: GateResult | None) -> dict[str, Any]:
+    """The gate config for a retry: only the tests that failed last time, when that is known.
+
+    The failed ids reach the command as ``$SUPERVISOR_RETRY_TESTS`` (one per
+    line). A failure the report does not attribute to any test (a crash, a
+    missing report) reruns the whole gate.
+    """
+    if previous is None or previous.status != "failed" or not previous.failed_tests:
+        return gate_cfg
+    if not gate_cfg.get("test_report"):
+        return gate_cfg
+    env = {**gate_cfg.get("env", {}), RETRY_TESTS_ENV: "\n".join(previous.failed_tests)}
+    return {**gate_cfg, "env": env}
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from harness.async_gate_runner import AsyncGateEngine
+from harness.cancellation import CancelToken
+from harness.progress import ProgressEmitter
+
+
+class AsyncGateEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.progress = ProgressEmitter(self.tmp / "progress.ndjson")
+        self.engine = AsyncGateEngine(self.progress)
+        self.addCleanup(self.progress.close)
+        self.addCleanup(self.engine.close)
+
+    def _events(self) -> list[dict]:
+        lines = (self.tmp / "progress.ndjson").read_text(encoding="utf-8").splitlines()
+        return [json.loads(line) for line in lines]
+
+    def test_runs_gate_and_emits_progress(self) -> None:
+        cfg = {"command": "echo one; echo two 1>&2; exit 4"}
+        result = self.engine.run("g", cfg, 1, log_dir=self.tmp / "logs")
+        self.assertEqual((result.status, result.return_code), ("failed", 4))
+        self.assertEqual(result.stdout, "one\n")
+        self.assertGreater(result.resources["max_rss_kb"], 0)
+        self.assertEqual(Path(result.stderr_ref).read_text(encoding="utf-8"), "two\n")
+
+        events = self._events()
+        self.assertEqual(events[0]["event"], "gate-started")
+        self.assertEqual(events[-1]["event"], "gate-finished")
+        output = {(e["stream"], e["line"]) for e in events if e["event"] == "gate-output"}
+        self.assertEqual(output, {("stdout", "one"), ("stderr", "two")})
+
+    def test_concurrent_gates_share_one_loop(self) -> None:
+        results = []
+        threads = [
+            threading.Thread(target=lambda i=i: results.append(self.engine.run(f"g{i}", {"command": "sleep 0.2"}, 1)))
+            for i in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(r.gate_id for r in results), [f"g{i}" for i in range(5)])
+        self.assertTrue(all(r.status == "passed" for r in results))
+
+    def test_timeout_terminates_process_group(self) -> None:
+        started = time.monotonic()
+        cfg = {"command": "echo partial; sleep 30 & sleep 30", "timeout_seconds": 1}
+        result = self.engine.run("slow", cfg, 1)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual((result.status, result.stdout), ("timed-out", "partial\n"))
+        self.assertIn("timed out after 1s", result.stderr)
+
+    def test_cancel_kills_process_group(self) -> None:
+        cancel = CancelToken()
+        threading.Timer(0.3, cancel.cancel).start()
+        started = time.monotonic()
+        result = self.engine.run("slow", {"command": "echo partial; sleep 30 & sleep 30"}, 1, cancel=cancel)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(result.status, "cancelled")
+        self.assertEqual(result.stdout, "partial\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import io
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from harness.coverage_map import CoverageMap
+from harness.unittest_runner import run_suite
+
+HELPERS = """
+from dataclasses import dataclass
+
+
+@dataclass
+class Point:
+    x: int
+
+
+def double(value):
+    return value * 2
+"""
+
+SAMPLE_TESTS = """
+import unittest
+from pathlib import Path
+
+import coverage_helpers
+
+
+class SampleTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.fixture = Path(__file__).with_name("fixture.json").read_text()
+
+    def test_uses_helper(self):
+        self.assertEqual(coverage_helpers.double(2), 4)
+
+    def test_builds_dataclass(self):
+        self.assertEqual(coverage_helpers.Point(1).x, 1)
+
+    def test_plain(self):
+        self.assertTrue(self.fixture)
+"""
+
+
+class CoverageRecorderTests(unittest.TestCase):
+    def test_records_files_each_test_touched(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "coverage_helpers.py").write_text(textwrap.dedent(HELPERS), encoding="utf-8")
+            (root / "sample_coverage_tests.py").write_text(textwrap.dedent(SAMPLE_TESTS), encoding="utf-8")
+            (root / "fixture.json").write_text("{}", encoding="utf-8")
+            sys.path.insert(0, tmp)
+            self.addCleanup(sys.path.remove, tmp)
+            for module in ("coverage_helpers", "sample_coverage_tests"):
+                self.addCleanup(sys.modules.pop, module, None)
+            suite = unittest.TestLoader().loadTestsFromName("sample_coverage_tests")
+
+            _, coverage = run_suite(suite, io.StringIO(), record=True, root=root)
+
+        prefix = "sample_coverage_tests.SampleTests."
+        self.assertEqual(
+            coverage[prefix + "test_uses_helper"],
+            {"coverage_helpers.py", "sample_coverage_tests.py", "fixture.json"},
+        )
+        self.assertIn("coverage_helpers.py", coverage[prefix + "test_builds_dataclass"])
+        self.assertEqual(coverage[prefix + "test_plain"], {"sample_coverage_tests.py", "fixture.json"})
+
+
+class CoverageMapTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ids = {"a.py": "1", "b.py": "2", "t.py": "3"}
+        self.coverage_map = CoverageMap(loaded=True)
+        self.coverage_map.update({"t.A": {"a.py", "t.py"}, "t.B": {"b.py", "t.py"}, "t.Gone": {"a.py"}}, self.ids)
+
+    def test_selects_tests_with_changed_or_outdated_files(self) -> None:
+        tests = ["t.A", "t.B", "t.New"]
+        self.assertEqual(self.coverage_map.select(tests, self.ids, set())[0], ["t.New"])
+        self.assertEqual(self.coverage_map.select(tests, self.ids, {"a.py", "README.md"})[0], ["t.A", "t.New"])
+        edited = {**self.ids, "b.py": "9"}
+        self.assertEqual(self.coverage_map.select(tests, edited, set())[0], ["t.B", "t.New"])
+
+    def test_missing_or_foreign_map_runs_everything(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "map.json"
+            self.assertEqual(CoverageMap.load(path).select(["t.A", "t.B"], self.ids)[0], ["t.A", "t.B"])
+            self.coverage_map.save(path)
+            stale = path.read_text(encoding="utf-8").replace('"version":1', '"version":0')
+            path.write_text(stale, encoding="utf-8")
+            self.assertFalse(CoverageMap.load(path).loaded)
+
+    def test_round_trip_and_prune(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "map.json"
+            self.coverage_map.update({"t.A": {"a.py"}}, self.ids, keep=["t.A", "t.B"])
+            self.coverage_map.save(path)
+            loaded = CoverageMap.load(path)
+        self.assertEqual(loaded.tests, {"t.A": {"a.py": "1"}, "t.B": {"b.py": "2", "t.py": "3"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from harness.cancellation import CancelToken
+from harness.distributed import MAX_WORKER_LOSSES, GateCoordinator, GateWorker, parse_address
+from harness.progress import ProgressEmitter
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+class ParseAddressTests(unittest.TestCase):
+    def test_unix_and_tcp_addresses(self) -> None:
+        self.assertEqual(parse_address("unix:/tmp/c.sock"), (socket.AF_UNIX, "/tmp/c.sock"))
+        self.assertEqual(parse_address("./c.sock"), (socket.AF_UNIX, "./c.sock"))
+        self.assertEqual(parse_address("10.0.0.5:7100"), (socket.AF_INET, ("10.0.0.5", 7100)))
+        self.assertEqual(parse_address(":0"), (socket.AF_INET, ("127.0.0.1", 0)))
+        with self.assertRaises(ValueError):
+            parse_address("localhost")
+
+
+class CoordinatorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        self.progress = ProgressEmitter(self.tmp / "progress.ndjson")
+        self.addCleanup(self.progress.close)
+
+    def _coordinator(self, **kwargs) -> GateCoordinator:
+        coordinator = GateCoordinator(f"unix:{self.tmp / 'c.sock'}", "run-1", progress=self.progress, **kwargs)
+        self.addCleanup(coordinator.close)
+        return coordinator
+
+    def _worker(self, name: str, slots: int = 1) -> threading.Thread:
+        worker = GateWorker(f"unix:{self.tmp / 'c.sock'}", slots=slots, name=name, artifacts_dir=self.tmp / name)
+        thread = threading.Thread(target=worker.run, daemon=True)
+        thread.start()
+        return thread
+
+    def _worker_process(self, name: str) -> subprocess.Popen:
+        pythonpath = os.pathsep.join(filter(None, [str(REPO_ROOT), os.environ.get("PYTHONPATH")]))
+        address = f"unix:{self.tmp / 'c.sock'}"
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "harness.supervisor", "worker", "--connect", address, "--slots", "1"]
+            + ["--name", name, "--artifacts-dir", str(self.tmp / name)],
+            env={**os.environ, "PYTHONPATH": pythonpath},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(proc.wait)
+        self.addCleanup(proc.kill)
+        return proc
+
+    def _events(self, event: str) -> list[dict]:
+        lines = (self.tmp / "progress.ndjson").read_text(encoding="utf-8").splitlines()
+        return [record for record in map(json.loads, lines) if record["event"] == event]
+
+    def _wait_for(self, event: str, count: int = 1) -> list[dict]:
+        deadline = time.monotonic() + 10
+        while len(self._events(event)) < count:
+            self.assertLess(time.monotonic(), deadline, f"no {event} event")
+            time.sleep(0.05)
+        return self._events(event)
+
+    def test_gates_are_spread_over_workers(self) -> None:
+        coordinator = self._coordinator()
+        workers = [self._worker("w1"), self._worker("w2")]
+        cfg = {"command": "sleep 0.3; echo ran"}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda i: coordinator.run(f"g{i}", cfg, 1), range(4)))
+        coordinator.close()
+        for worker in workers:
+            worker.join(timeout=5)
+
+        self.assertEqual([r.status for r in results], ["passed"] * 4)
+        self.assertEqual(results[0].stdout, "ran\n")
+        self.assertTrue(Path(results[0].log_ref).is_relative_to(self.tmp))
+        self.assertEqual({e["worker"] for e in self._events("gate-finished")}, {"w1", "w2"})
+        self.assertFalse(any(worker.is_alive() for worker in workers))
+
+    def test_killed_worker_gate_is_requeued(self) -> None:
+        coordinator = self._coordinator()
+        doomed = self._worker_process("doomed")
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(coordinator.run("slow", {"command": "sleep 0.5; echo ok"}, 1))
+        )
+        thread.start()
+        self._wait_for("gate-started")
+        os.kill(doomed.pid, signal.SIGKILL)
+        lost = self._wait_for("worker-lost")
+        self._worker("survivor")
+        thread.join(timeout=10)
+
+        self.assertEqual(lost[0], {**lost[0], "worker": "doomed", "requeued": ["slow"]})
+        self.assertEqual(results[0].status, "passed")
+        self.assertEqual(self._events("gate-finished")[0]["worker"], "survivor")
+
+    def test_gate_fails_after_losing_too_many_workers(self) -> None:
+        coordinator = self._coordinator()
+        results = []
+        thread = threading.Thread(
+            target=lambda: results.append(coordinator.run("doomed", {"command": "sleep 30"}, 1))
+        )
+        thread.start()
+        for losses in range(1, MAX_WORKER_LOSSES + 1):
+            worker = self._worker_process(f"w{losses}")
+            self._wait_for("gate-started", losses)
+            os.kill(worker.pid, signal.SIGKILL)
+            self._wait_for("worker-lost", losses)
+        thread.join(timeout=10)
+
+        (result,) = results
+        self.assertEqual((result.status, result.return_code), ("failed", -1))
+        self.assertIn(f"lost {MAX_WORKER_LOSSES} workers", result.stderr)
+        self.assertEqual(self._events("worker-lost")[-1]["requeued"], [])
+
+    def test_worker_error_fails_the_gate(self) -> None:
+        coordinator = self._coordinator()
+        self._worker("w1")
+        cfg = {"command": "python3 gate.py | tee out", "runner": "python-pool"}
+        result = coordinator.run("piped", cfg, 1)
+        self.assertEqual((result.status, result.return_code), ("failed", -1))
+        self.assertIn("worker w1 could not run the gate", result.stderr)
+
+    def test_silent_worker_is_dropped(self) -> None:
+        coordinator = self._coordinator(heartbeat_timeout=0.5)
+        silent = socket.socket(socket.AF_UNIX)
+        silent.connect(str(self.tmp / "c.sock"))
+        self.addCleanup(silent.close)
+        silent.sendall(b'{"op":"hello","worker":"silent","slots":1}\n{"op":"pull"}\n')
+        results = []
+        thread = threading.Thread(target=lambda: results.append(coordinator.run("g", {"command": "true"}, 1)))
+        thread.start()
+        self._wait_for("worker-lost")
+        self._worker("w1")
+        thread.join(timeout=10)
+
+        self.assertEqual(self._events("worker-lost")[0]["requeued"], ["g"])
+        self.assertEqual(results[0].status, "passed")
+
+    def test_cancel_queued_and_running_gates(self) -> None:
+        coordinator = self._coordinator()
+        cancel = CancelToken()
+        threading.Timer(0.3, cancel.cancel).start()
+        self.assertEqual(coordinator.run("queued", {"command": "true"}, 1, cancel=cancel).status, "cancelled")
+
+        self._worker("w1")
+        cancel = CancelToken()
+        threading.Timer(0.5, cancel.cancel).start()
+        started = time.monotonic()
+        result = coordinator.run("running", {"command": "echo partial; sleep 30"}, 1, cancel=cancel)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual((result.status, result.stdout), ("cancelled", "partial\n"))
+
+    def test_remote_timeout_is_reported(self) -> None:
+        coordinator = self._coordinator()
+        self._worker("w1")
+        result = coordinator.run("slow", {"command": "echo partial; sleep 5", "timeout_seconds": 1}, 1)
+        self.assertEqual((result.status, result.stdout), ("timed-out", "partial\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
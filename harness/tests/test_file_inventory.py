@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from harness import file_inventory
+from harness.file_inventory import blob_id, build_inventory
+
+
+def _git(root: Path, *args: str) -> str:
+    proc = subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+
+class FileInventoryTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "repo"
+        self.root.mkdir()
+        self.index = Path(tmp.name) / "index.json"
+
+    def _write(self, path: str, text: str) -> Path:
+        full = self.root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_text(text, encoding="utf-8")
+        return full
+
+    def test_git_listing_uses_index_ids_and_respects_gitignore(self) -> None:
+        _git(self.root, "init", "-q")
+        self._write(".gitignore", "build/\n")
+        self._write("src/a.py", "a = 1\n")
+        self._write("build/out.js", "x\n")
+        self._write("node_modules/pkg/index.js", "x\n")
+        _git(self.root, "add", ".gitignore", "src/a.py")
+        self._write("notes.md", "untracked\n")
+
+        inventory = build_inventory(self.root, exclude=("notes.md",))
+        self.assertEqual(inventory.paths(), [".gitignore", "src/a.py"])
+        self.assertEqual(inventory.entries["src/a.py"].content_id, _git(self.root, "hash-object", "src/a.py"))
+        self.assertEqual(inventory.select(["**/*.py"]), ["src/a.py"])
+
+    def test_index_skips_rehashing_unchanged_files(self) -> None:
+        old = self._write("a.py", "a = 1\n")
+        self._write("b.py", "b = 1\n")
+        past = 1_600_000_000
+        for name in ("a.py", "b.py"):
+            os.utime(self.root / name, (past, past))
+        with patch.object(file_inventory, "_git_lines", side_effect=OSError):
+            first = build_inventory(self.root, self.index)
+            self.assertEqual(first.entries["a.py"].content_id, blob_id(old))
+
+            self._write("b.py", "b = 2\n")
+            with patch.object(file_inventory, "blob_id", wraps=blob_id) as spy:
+                second = build_inventory(self.root, self.index)
+        self.assertEqual([Path(call.args[0]).name for call in spy.call_args_list], ["b.py"])
+        self.assertEqual(second.entries["a.py"].content_id, first.entries["a.py"].content_id)
+        self.assertNotEqual(second.entries["b.py"].content_id, first.entries["b.py"].content_id)
+
+    def test_walk_prunes_skip_dirs(self) -> None:
+        self._write("src/a.py", "a = 1\n")
+        self._write(".supervisor-artifacts/run/summary.json", "{}\n")
+        self._write("__pycache__/a.pyc", "")
+        with patch.object(file_inventory, "_git_lines", side_effect=OSError):
+            self.assertEqual(build_inventory(self.root).paths(), ["src/a.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from harness.file_inventory import build_inventory
+from harness.gate_cache import GateCache, input_digest
+from harness.path_globs import matches_any
+from harness.test_report import RETRY_TESTS_ENV
+from harness.types import GateResult
+
+
+def _passed(gate_id: str, command: str) -> GateResult:
+    return GateResult(gate_id, "passed", 1, 120, command, "ok", "", 0)
+
+
+class PathGlobTests(unittest.TestCase):
+    def test_double_star_crosses_directories(self) -> None:
+        self.assertTrue(matches_any("harness/tests/test_x.py", ["harness/**/*.py"]))
+        self.assertTrue(matches_any("harness/gate_cache.py", ["harness/**/*.py"]))
+        self.assertFalse(matches_any("components/app-shell.tsx", ["harness/**"]))
+        self.assertFalse(matches_any("harness/tests/test_x.py", ["harness/*.py"]))
+
+
+class GateCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "repo"
+        (self.root / "src").mkdir(parents=True)
+        (self.root / "src" / "a.py").write_text("x = 1\n", encoding="utf-8")
+        (self.root / "docs.md").write_text("hello\n", encoding="utf-8")
+        self.cache_dir = Path(tmp.name) / "cache"
+        self.cfg = {"command": "python3 -m unittest x", "inputs": ["src/**"]}
+        # Exercise the filesystem walk rather than git.
+        patcher = patch("harness.file_inventory._git_lines", side_effect=OSError)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _cache(self, **kwargs) -> GateCache:
+        return GateCache(self.cache_dir, root=self.root, **kwargs)
+
+    def test_hit_after_store_on_unchanged_inputs(self) -> None:
+        self._cache().store(self.cfg, _passed("g", self.cfg["command"]))
+        hit = self._cache().lookup("other-gate", self.cfg, 2)
+        self.assertIsNotNone(hit)
+        self.assertEqual((hit.gate_id, hit.attempt, hit.source, hit.stdout), ("other-gate", 2, "cache", "ok"))
+
+    def test_changed_declared_input_misses(self) -> None:
+        self._cache().store(self.cfg, _passed("g", self.cfg["command"]))
+        (self.root / "docs.md").write_text("unrelated\n", encoding="utf-8")
+        self.assertIsNotNone(self._cache().lookup("g", self.cfg, 1))
+        (self.root / "src" / "a.py").write_text("x = 2\n", encoding="utf-8")
+        self.assertIsNone(self._cache().lookup("g", self.cfg, 1))
+
+    def test_failures_are_not_stored_and_refresh_skips_reads(self) -> None:
+        failed = GateResult("g", "failed", 1, 1, self.cfg["command"], "", "", 1)
+        self._cache().store(self.cfg, failed)
+        self.assertIsNone(self._cache().lookup("g", self.cfg, 1))
+        self._cache().store(self.cfg, _passed("g", self.cfg["command"]))
+        self.assertIsNone(self._cache(read=False).lookup("g", self.cfg, 1))
+
+    def test_narrowed_retries_are_not_cached(self) -> None:
+        narrowed = {**self.cfg, "env": {RETRY_TESTS_ENV: "x.T.test_flaky"}}
+        self._cache().store(narrowed, _passed("g", self.cfg["command"]))
+        self.assertIsNone(self._cache().lookup("g", narrowed, 2))
+        self.assertEqual(list(self.cache_dir.glob("*/*.json")), [])
+
+    def test_lru_eviction_keeps_recent_entries(self) -> None:
+        cache = self._cache()
+        old_cfg = {"command": "old"}
+        cache.store(old_cfg, _passed("old", "old"))
+        old_entry = next(self.cache_dir.glob("*/*.json"))
+        past = time.time() - 60
+        os.utime(old_entry, (past, past))
+        cache.max_bytes = old_entry.stat().st_size + 100
+        cache.store(self.cfg, _passed("new", self.cfg["command"]))
+        self.assertFalse(old_entry.exists())
+        self.assertIsNotNone(cache.lookup("new", self.cfg, 1))
+
+    def test_input_digest_ignores_files_outside_inputs(self) -> None:
+        fingerprints = build_inventory(self.root).content_ids()
+        self.assertIn("docs.md", fingerprints)
+        trimmed = {path: value for path, value in fingerprints.items() if path != "docs.md"}
+        self.assertEqual(input_digest(self.cfg, fingerprints), input_digest(self.cfg, trimmed))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+
+from harness.gate_history import GateHistory, append_history, history_path
+from harness.types import GateResult, SupervisorRun
+
+
+def _run(task_id: str, gates: list[tuple[str, str, int, str]]) -> SupervisorRun:
+    return SupervisorRun(
+        run_id="r1",
+        task_id=task_id,
+        task_title=task_id,
+        tags=[],
+        profiles_resolved=[],
+        gates_run=[g[0] for g in gates],
+        attempt=1,
+        status="passed",
+        failed_gates=[],
+        started_at="",
+        ended_at="",
+        duration_ms=sum(g[2] for g in gates),
+        escalation=None,
+        gate_results=[
+            GateResult(gate_id, status, 1, duration, "cmd", "", "", 0, source=source)
+            for gate_id, status, duration, source in gates
+        ],
+    )
+
+
+class GateHistoryTests(unittest.TestCase):
+    def test_append_and_aggregate(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            first = [("slow", "passed", 900, "executed"), ("flaky", "failed", 10, "executed")]
+            append_history(tmp, _run("T1", first))
+            second = [("slow", "passed", 1100, "executed"), ("flaky", "passed", 9, "shared")]
+            append_history(tmp, _run("T2", second))
+            self.assertEqual(len(history_path(tmp).read_text(encoding="utf-8").splitlines()), 4)
+
+            history = GateHistory.load(tmp)
+            self.assertEqual(history.expected_duration_ms("slow"), 1000)
+            self.assertAlmostEqual(history.failure_probability("flaky"), 2 / 3)
+            self.assertAlmostEqual(history.failure_probability("slow"), 1 / 4)
+            self.assertEqual(history.expected_task_duration_ms("T1", []), 910)
+
+    def test_passed_duration_quantile(self) -> None:
+        records = [
+            {"kind": "gate", "gate_id": "g", "status": "passed", "duration_ms": ms} for ms in range(100, 1100, 100)
+        ]
+        records.append({"kind": "gate", "gate_id": "g", "status": "failed", "duration_ms": 90000})
+        history = GateHistory(records)
+        self.assertEqual(history.passed_duration_quantile_ms("g", 0.99), 1000)
+        self.assertEqual(history.passed_duration_quantile_ms("g", 0.5), 500)
+        self.assertIsNone(history.passed_duration_quantile_ms("g", 0.99, min_samples=11))
+        self.assertIsNone(history.passed_duration_quantile_ms("unknown", 0.99))
+
+    def test_only_executed_gates_are_recorded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            warm = [("slow", "passed", 0, "cache"), ("fast", "passed", 0, "shared")]
+            append_history(tmp, _run("warm", warm))
+            not_run = [
+                ("blocked", "blocked", 0, "executed"),
+                ("unaffected", "skipped-unaffected", 0, "executed"),
+                ("cut", "cancelled", 50, "executed"),
+            ]
+            append_history(tmp, _run("idle", not_run))
+            append_history(tmp, _run("T1", [("slow", "passed", 900, "executed"), *not_run]))
+            ran = [("slow", "passed", 700, "executed"), ("fast", "failed", 20, "executed")]
+            append_history(tmp, _run("T2", ran))
+
+            lines = history_path(tmp).read_text(encoding="utf-8").splitlines()
+            recorded = [(r["kind"], r["task_id"], r.get("gate_id")) for r in map(json.loads, lines)]
+            self.assertEqual(
+                recorded,
+                [("gate", "T1", "slow"), ("task", "T2", None), ("gate", "T2", "slow"), ("gate", "T2", "fast")],
+            )
+            history = GateHistory.load(tmp)
+            self.assertEqual(history.expected_task_duration_ms("T2", []), 720)
+            # T1 never ran all its gates, so its cost comes from the gates' history.
+            self.assertEqual(history.expected_task_duration_ms("T1", ["slow"]), 800)
+            self.assertEqual(history.failure_probability("blocked"), 0.5)
+
+    def test_sort_keys(self) -> None:
+        records = [
+            {"kind": "gate", "gate_id": "slow", "status": "passed", "duration_ms": 5000},
+            {"kind": "gate", "gate_id": "fast-flaky", "status": "failed", "duration_ms": 50},
+            {"kind": "gate", "gate_id": "fast-flaky", "status": "failed", "duration_ms": 50},
+        ]
+        history = GateHistory(records)
+        gates = ["fast-flaky", "slow"]
+        self.assertEqual(sorted(gates, key=history.gate_sort_key("longest-first")), ["slow", "fast-flaky"])
+        self.assertEqual(sorted(gates, key=history.gate_sort_key("fail-first")), ["fast-flaky", "slow"])
+        self.assertIsNone(history.gate_sort_key("policy"))
+
+
+if __name__ == "__main__":
+    unittest.main()
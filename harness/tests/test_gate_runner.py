@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from harness.cancellation import CancelToken
+from harness.gate_runner import (
+    ADAPTIVE_TIMEOUT_KEY,
+    SingleFlightGateRunner,
+    execution_key,
+    gate_timeout,
+    run_gate,
+)
+from harness.types import GateResult
+
+
+class GateRunnerTests(unittest.TestCase):
+    def test_run_gate_captures_result(self) -> None:
+        result = run_gate("echo", {"command": "echo hello; exit 3"}, 1)
+        self.assertEqual(result.status, "failed")
+        self.assertEqual(result.return_code, 3)
+        self.assertIn("hello", result.stdout)
+
+    def test_records_child_resource_usage(self) -> None:
+        result = run_gate("busy", {"command": "python3 -c \"x = bytearray(64 * 1024 * 1024)\""}, 1)
+        self.assertEqual(result.status, "passed")
+        self.assertGreater(result.resources["max_rss_kb"], 64 * 1024)
+        self.assertGreater(result.resources["user_cpu_s"] + result.resources["system_cpu_s"], 0)
+
+    def test_output_streams_to_log_with_bounded_excerpt(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = {"command": "python3 -c \"print('x' * 5000); print('tail-marker')\"", "log_tail_bytes": 100}
+            result = run_gate("noisy", cfg, 1, log_dir=tmp)
+            self.assertEqual(result.status, "passed")
+            self.assertIn("tail-marker", result.stdout)
+            self.assertIn("truncated", result.stdout)
+            self.assertLess(len(result.stdout), 300)
+            full_log = Path(result.log_ref).read_text(encoding="utf-8")
+            self.assertEqual(len(full_log.splitlines()[0]), 5000)
+            self.assertTrue(Path(result.stderr_ref).exists())
+
+    def test_cancel_kills_process_group_and_keeps_output(self) -> None:
+        cancel = CancelToken()
+        threading.Timer(0.3, cancel.cancel).start()
+        started = time.monotonic()
+        result = run_gate("slow", {"command": "echo partial; sleep 30 & sleep 30"}, 1, cancel=cancel)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(result.status, "cancelled")
+        self.assertIn("partial", result.stdout)
+
+    def test_timeout_sends_term_then_kills_after_grace(self) -> None:
+        command = "trap 'echo stopping; exit 1' TERM; echo partial; sleep 30 & wait"
+        cfg = {"command": command, "timeout_seconds": 1}
+        result = run_gate("graceful", cfg, 1)
+        self.assertEqual(result.status, "timed-out")
+        self.assertEqual(result.stdout, "partial\nstopping\n")
+        self.assertIn("timed out after 1s; the process group was terminated", result.stderr)
+
+        cfg = {"command": "trap '' TERM; sleep 30", "timeout_seconds": 0.5, "kill_grace_seconds": 0.5}
+        started = time.monotonic()
+        result = run_gate("stubborn", cfg, 1)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(result.status, "timed-out")
+
+    def test_adaptive_timeout_overrides_timeout_seconds(self) -> None:
+        cfg = {"command": "sleep 5", "timeout_seconds": 60, ADAPTIVE_TIMEOUT_KEY: 0.5}
+        self.assertEqual(gate_timeout(cfg), 0.5)
+        base = {"command": "sleep 5", "timeout_seconds": 60}
+        self.assertEqual(execution_key(cfg, 1), execution_key(base, 1))
+        self.assertEqual(run_gate("slow", cfg, 1).status, "timed-out")
+
+    def test_cancelled_before_start_does_not_run(self) -> None:
+        cancel = CancelToken()
+        cancel.cancel()
+        result = run_gate("never", {"command": "exit 0"}, 1, cancel=cancel)
+        self.assertEqual(result.status, "cancelled")
+        self.assertEqual(result.duration_ms, 0)
+
+    def test_report_written_to_report_path_is_linked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg = {"command": "echo '{}' > \"$SUPERVISOR_REPORT_PATH\""}
+            result = run_gate("report", cfg, 1, log_dir=tmp)
+            self.assertEqual(result.status, "passed")
+            self.assertTrue(result.report_ref.endswith(".report.json"))
+            self.assertEqual(Path(result.report_ref).read_text(encoding="utf-8"), "{}\n")
+            self.assertEqual(run_gate("quiet", {"command": "true"}, 1, log_dir=tmp).report_ref, "")
+
+    def test_execution_key_covers_command_env_and_attempt(self) -> None:
+        base = {"command": "python3 -m unittest x"}
+        self.assertEqual(execution_key(base, 1), execution_key(dict(base), 1))
+        self.assertNotEqual(execution_key(base, 1), execution_key(base, 2))
+        self.assertNotEqual(execution_key(base, 1), execution_key({**base, "env": {"A": "1"}}, 1))
+
+
+class SingleFlightTests(unittest.TestCase):
+    def test_identical_commands_execute_once(self) -> None:
+        calls: list[str] = []
+        release = threading.Event()
+
+        def fake_run(gate_id: str, gate_cfg: dict, attempt: int, **kwargs) -> GateResult:
+            calls.append(gate_id)
+            release.wait(timeout=5)
+            return GateResult(gate_id, "passed", attempt, 5, gate_cfg["command"], "out", "", 0)
+
+        runner = SingleFlightGateRunner(fake_run)
+        cfg = {"command": "python3 -m unittest harness.tests.test_domain_auth_rbac"}
+        results: list[GateResult] = []
+        threads = [
+            threading.Thread(target=lambda gid=gid: results.append(runner.run(gid, cfg, 1)))
+            for gid in ("auth-flow-tests", "permission-matrix-tests")
+        ]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+        later = runner.run("auth-flow-tests", cfg, 1)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(sorted(r.gate_id for r in results), ["auth-flow-tests", "permission-matrix-tests"])
+        self.assertEqual(sorted(r.source for r in results + [later]), ["executed", "shared", "shared"])
+        self.assertEqual(len({r.execution_key for r in results + [later]}), 1)
+
+    def test_retry_attempt_runs_again(self) -> None:
+        calls: list[int] = []
+
+        def fake_run(gate_id: str, gate_cfg: dict, attempt: int, **kwargs) -> GateResult:
+            calls.append(attempt)
+            return GateResult(gate_id, "failed", attempt, 1, gate_cfg["command"], "", "", 1)
+
+        runner = SingleFlightGateRunner(fake_run)
+        runner.run("g", {"command": "false"}, 1)
+        runner.run("g", {"command": "false"}, 2)
+        self.assertEqual(calls, [1, 2])
+
+    def test_cancelled_owner_result_is_not_shared(self) -> None:
+        owner_cancel = CancelToken()
+        owner_cancel.cancel()
+
+        def fake_run(gate_id: str, gate_cfg: dict, attempt: int, cancel=None) -> GateResult:
+            status = "cancelled" if cancel is not None and cancel.is_cancelled() else "passed"
+            return GateResult(gate_id, status, attempt, 1, gate_cfg["command"], "", "", 0)
+
+        runner = SingleFlightGateRunner(fake_run)
+        self.assertEqual(runner.run("a", {"command": "true"}, 1, cancel=owner_cancel).status, "cancelled")
+        rerun = runner.run("b", {"command": "true"}, 1, cancel=CancelToken())
+        self.assertEqual((rerun.status, rerun.source), ("passed", "executed"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from harness.cancellation import CancelToken
+from harness.gate_scheduler import GateEdges, find_dependency_cycle, run_gate_graph
+from harness.types import GateResult
+
+
+def _result(gate_id: str, attempt: int, passed: bool = True) -> GateResult:
+    return GateResult(
+        gate_id=gate_id,
+        status="passed" if passed else "failed",
+        attempt=attempt,
+        duration_ms=1,
+        command="mock",
+        stdout="",
+        stderr="",
+        return_code=0 if passed else 1,
+    )
+
+
+class GateSchedulerTests(unittest.TestCase):
+    def test_independent_gates_run_concurrently(self) -> None:
+        barrier = threading.Barrier(3, timeout=5)
+
+        def run_gate(gate_id: str) -> GateResult:
+            barrier.wait()
+            return _result(gate_id, 1)
+
+        results = run_gate_graph(["a", "b", "c"], 1, run_gate, max_workers=3)
+        self.assertEqual([r.gate_id for r in results], ["a", "b", "c"])
+
+    def test_dependencies_run_first(self) -> None:
+        order: list[str] = []
+        lock = threading.Lock()
+
+        def run_gate(gate_id: str) -> GateResult:
+            if gate_id == "a":
+                time.sleep(0.05)
+            with lock:
+                order.append(gate_id)
+            return _result(gate_id, 1)
+
+        edges = {"b": GateEdges(needs=("a",)), "c": GateEdges(after=("b",))}
+        run_gate_graph(["c", "b", "a"], 1, run_gate, edges=edges, max_workers=3)
+        self.assertEqual(order, ["a", "b", "c"])
+
+    def test_failed_need_blocks_dependent_but_not_after(self) -> None:
+        ran: list[str] = []
+
+        def run_gate(gate_id: str) -> GateResult:
+            ran.append(gate_id)
+            return _result(gate_id, 1, passed=gate_id != "a")
+
+        edges = {"b": GateEdges(needs=("a",)), "c": GateEdges(after=("a",))}
+        results = run_gate_graph(["a", "b", "c"], 1, run_gate, edges=edges)
+        self.assertEqual([r.status for r in results], ["failed", "blocked", "passed"])
+        self.assertEqual(ran, ["a", "c"])
+
+    def test_dependency_outside_batch_is_satisfied(self) -> None:
+        edges = {"b": GateEdges(needs=("a",))}
+        results = run_gate_graph(["b"], 2, lambda gate_id: _result(gate_id, 2), edges=edges)
+        self.assertEqual(results[0].status, "passed")
+
+    def test_cancel_skips_gates_not_yet_started(self) -> None:
+        cancel = CancelToken()
+        ran: list[str] = []
+
+        def run_gate(gate_id: str) -> GateResult:
+            ran.append(gate_id)
+            return _result(gate_id, 1, passed=gate_id != "a")
+
+        def on_result(result: GateResult) -> None:
+            if result.status == "failed":
+                cancel.cancel()
+
+        edges = {"c": GateEdges(needs=("b",))}
+        results = run_gate_graph(["a", "b", "c"], 1, run_gate, edges=edges, cancel=cancel, on_result=on_result)
+        self.assertEqual(ran, ["a"])
+        self.assertEqual([r.status for r in results], ["failed", "cancelled", "cancelled"])
+
+    def test_child_token_follows_parent(self) -> None:
+        parent = CancelToken()
+        child = CancelToken(parent=parent)
+        child.cancel()
+        self.assertFalse(parent.is_cancelled())
+        parent.cancel()
+        self.assertTrue(CancelToken(parent=parent).is_cancelled())
+
+    def test_find_dependency_cycle(self) -> None:
+        self.assertIsNone(find_dependency_cycle({"a": ["b"], "b": []}))
+        self.assertEqual(find_dependency_cycle({"a": ["b"], "b": ["a"]}), ["a", "b", "a"])
+
+
+if __name__ == "__main__":
+    unittest.main()
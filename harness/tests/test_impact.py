@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from harness.impact import changed_files_since, gate_affected, unaffected_gates
+
+
+def _git(root: Path, *args: str) -> str:
+    proc = subprocess.run(["git", *args], cwd=root, check=True, capture_output=True, text=True)
+    return proc.stdout.strip()
+
+
+class ImpactTests(unittest.TestCase):
+    def test_changed_files_cover_commits_worktree_and_untracked(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            _git(root, "init", "-q")
+            _git(root, "config", "user.email", "dev@example.com")
+            _git(root, "config", "user.name", "dev")
+            (root / ".gitignore").write_text("ignored/\n", encoding="utf-8")
+            (root / "a.py").write_text("a = 1\n", encoding="utf-8")
+            (root / "b.py").write_text("b = 1\n", encoding="utf-8")
+            _git(root, "add", ".")
+            _git(root, "commit", "-qm", "base")
+            base = _git(root, "rev-parse", "HEAD")
+
+            (root / "components").mkdir()
+            (root / "components" / "Button.tsx").write_text("export {}\n", encoding="utf-8")
+            _git(root, "add", "components")
+            _git(root, "commit", "-qm", "button")
+            (root / "a.py").write_text("a = 2\n", encoding="utf-8")
+            (root / "new.py").write_text("", encoding="utf-8")
+            (root / "ignored").mkdir()
+            (root / "ignored" / "x.py").write_text("", encoding="utf-8")
+
+            self.assertEqual(changed_files_since(base, root), {"components/Button.tsx", "a.py", "new.py"})
+            with self.assertRaises(RuntimeError):
+                changed_files_since("not-a-commit", root)
+
+    def test_gates_without_matching_inputs_are_unaffected(self) -> None:
+        gates = {
+            "typecheck": {"inputs": ["harness/**/*.py"]},
+            "unit": {"inputs": ["harness/**"]},
+            "security-lite": {},
+        }
+        changed = {"components/Button.tsx"}
+        self.assertEqual(unaffected_gates(gates, changed), {"typecheck", "unit"})
+        self.assertTrue(gate_affected(gates["unit"], {"harness/tests/fixtures.json"}))
+        self.assertFalse(gate_affected(gates["typecheck"], {"harness/tests/fixtures.json"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import tempfile
+import tokenize
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from harness import lint_engine
+from harness.content_cache import ContentCache
+from harness.lint_engine import LintIssue, LintRule, lint_paths, lint_source, register, rules_digest, to_sarif
+
+
+class LintEngineTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def test_builtin_rules_report_line_and_column(self) -> None:
+        issues = lint_source("a.py", "x = 1 \n\ty = 2\nok = 3\n", ["trailing-whitespace", "no-tabs"])
+        self.assertEqual(
+            issues,
+            [
+                LintIssue("a.py", 1, 6, "trailing-whitespace", "trailing whitespace"),
+                LintIssue("a.py", 2, 1, "no-tabs", "tab character not allowed"),
+            ],
+        )
+
+    def test_token_rules_share_one_pass(self) -> None:
+        def no_print(token: tokenize.TokenInfo):
+            if token.type == tokenize.NAME and token.string == "print":
+                yield token.start[0], token.start[1] + 1, "print call"
+
+        register(LintRule("no-print", "No print calls", token_visitor=no_print))
+        self.addCleanup(lint_engine.RULES.pop, "no-print")
+        with patch.object(tokenize, "generate_tokens", wraps=tokenize.generate_tokens) as spy:
+            issues = lint_source("a.py", "def f():\n    print('x')\n", ["no-print", "no-tabs"])
+        self.assertEqual(issues, [LintIssue("a.py", 2, 5, "no-print", "print call")])
+        self.assertEqual(spy.call_count, 1)
+        with self.assertRaises(ValueError):
+            register(LintRule("no-print", "duplicate"))
+
+    def test_cache_skips_known_content(self) -> None:
+        (self.root / "a.py").write_text("a = 1 \n", encoding="utf-8")
+        (self.root / "b.py").write_text("b = 1\n", encoding="utf-8")
+        fingerprints = {"a.py": "blob-a", "b.py": "blob-b"}
+        cache_file = self.root / "lint-cache.json"
+        digest = rules_digest(lint_engine.RULES)
+
+        cache = ContentCache(cache_file, digest)
+        first = lint_paths(self.root, ["a.py", "b.py"], workers=1, fingerprints=fingerprints, cache=cache)
+        cache.save()
+
+        cache = ContentCache(cache_file, digest)
+        with patch.object(lint_engine, "lint_file") as lint_file:
+            second = lint_paths(self.root, ["a.py", "b.py"], workers=1, fingerprints=fingerprints, cache=cache)
+        lint_file.assert_not_called()
+        self.assertEqual(second, first)
+        self.assertEqual([issue.rule for issue in second], ["trailing-whitespace"])
+
+    def test_digest_follows_rule_code(self) -> None:
+        codes = ["trailing-whitespace", "no-tabs"]
+        before = rules_digest(codes)
+        self.assertEqual(rules_digest(reversed(codes)), before)
+        self.assertNotEqual(rules_digest(codes[:1]), before)
+
+        original = lint_engine.RULES["no-tabs"]
+
+        def changed(lineno: int, line: str):
+            yield from ()
+
+        with patch.dict(lint_engine.RULES, {"no-tabs": LintRule("no-tabs", original.description, changed)}):
+            self.assertNotEqual(rules_digest(codes), before)
+
+    def test_process_pool_matches_serial_run(self) -> None:
+        paths = []
+        for i in range(12):
+            source = "ok = 1\n" + ("bad = 2 \n" if i % 3 == 0 else "")
+            (self.root / f"m{i}.py").write_text(source, encoding="utf-8")
+            paths.append(f"m{i}.py")
+        serial = lint_paths(self.root, paths, workers=1)
+        with patch.object(lint_engine, "PARALLEL_MIN_FILES", 0):
+            parallel = lint_paths(self.root, paths, workers=2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(len(serial), 4)
+
+    def test_non_utf8_file_is_an_issue(self) -> None:
+        (self.root / "latin.py").write_bytes(b"name = 'caf\xe9'\n")
+        (issue,) = lint_paths(self.root, ["latin.py"], workers=1)
+        self.assertEqual((issue.path, issue.rule), ("latin.py", "encoding"))
+
+    def test_sarif_lists_results_and_rules(self) -> None:
+        issue = LintIssue("a.py", 3, 7, "trailing-whitespace", "trailing whitespace")
+        run = to_sarif([issue], ["trailing-whitespace"])["runs"][0]
+        self.assertIn("trailing-whitespace", [rule["id"] for rule in run["tool"]["driver"]["rules"]])
+        location = run["results"][0]["locations"][0]["physicalLocation"]
+        self.assertEqual(location["artifactLocation"]["uri"], "a.py")
+        self.assertEqual(location["region"], {"startLine": 3, "startColumn": 7})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import unittest
 
-from harness.policy_loader import load_policy
+from harness.policy_loader import CompiledPolicy, PolicyError, load_policy, validate_policy
 
 
 class PolicyLoaderTests(unittest.TestCase):
@@ -11,6 +11,87 @@ class PolicyLoaderTests(unittest.TestCase):
         self.assertEqual(policy["retry"]["max_retries"], 3)
         self.assertIn("safe-baseline", policy["profiles"])
 
+    def test_gate_dependency_cycle_rejected(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json").to_dict()
+        policy["gates"]["typecheck"]["needs"] = ["unit"]
+        policy["gates"]["unit"]["needs"] = ["typecheck"]
+        with self.assertRaises(PolicyError):
+            validate_policy(policy)
+
+    def test_profile_extends_cycle_rejected(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json").to_dict()
+        policy["profiles"]["safe-baseline"]["extends"] = ["auth-rbac"]
+        with self.assertRaisesRegex(PolicyError, "extends cycle"):
+            CompiledPolicy(policy)
+
+    def test_python_pool_runner_needs_plain_python_command(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json").to_dict()
+        policy["gates"]["unit"]["command"] = "python3 -m unittest discover && echo done"
+        with self.assertRaisesRegex(PolicyError, "python-pool"):
+            validate_policy(policy)
+        policy["gates"]["unit"]["runner"] = "thread"
+        with self.assertRaisesRegex(PolicyError, "runner must be one of"):
+            validate_policy(policy)
+
+    def test_gate_resources_and_locks_validated(self) -> None:
+        for key, value in [
+            ("resources", {"cpu": 0}),
+            ("resources", {"gpu": 1}),
+            ("resources", {"memory_mb": 1.5}),
+            ("locks", "next-workspace"),
+        ]:
+            policy = load_policy("harness/supervisor_policy.json").to_dict()
+            policy["gates"]["unit"][key] = value
+            with self.subTest(key=key, value=value), self.assertRaises(PolicyError):
+                validate_policy(policy)
+
+    def test_timeout_settings_validated(self) -> None:
+        for section, key, value in [
+            ("timeouts", "quantile", 1.5),
+            ("timeouts", "factor", 0),
+            ("timeouts", "min_samples", 0),
+            ("timeouts", "adaptive", "yes"),
+            ("unit", "kill_grace_seconds", -1),
+            ("unit", "adaptive_timeout", 0),
+        ]:
+            policy = load_policy("harness/supervisor_policy.json").to_dict()
+            target = policy["timeouts"] if section == "timeouts" else policy["gates"][section]
+            target[key] = value
+            with self.subTest(key=key, value=value), self.assertRaises(PolicyError):
+                validate_policy(policy)
+
+    def test_setup_phases_validated(self) -> None:
+        for setup, gate_setup in [
+            ({"deps": {"key_inputs": ["package-lock.json"]}}, ["deps"]),
+            ({"deps": {"command": "npm ci", "outputs": ["../node_modules"]}}, ["deps"]),
+            ({"deps": {"command": "npm ci", "key_inputs": "package-lock.json"}}, ["deps"]),
+            ({"deps": {"command": "npm ci"}}, ["build"]),
+        ]:
+            policy = load_policy("harness/supervisor_policy.json").to_dict()
+            policy["setup"] = setup
+            policy["gates"]["unit"]["setup"] = gate_setup
+            with self.subTest(setup=setup, gate_setup=gate_setup), self.assertRaises(PolicyError):
+                validate_policy(policy)
+
+    def test_compiled_policy_is_read_only(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json")
+        with self.assertRaises(TypeError):
+            policy["gates"]["unit"]["command"] = "true"  # type: ignore[index]
+        self.assertIsInstance(policy["profiles"]["safe-baseline"]["gates"], tuple)
+
+    def test_resolution_is_memoised_and_matches_closure(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json")
+        first = policy.resolve(["auth", "rbac"])
+        first.profiles.append("mutated")
+        second = policy.resolve(["auth", "rbac"])
+        self.assertNotIn("mutated", second.profiles)
+        self.assertEqual(second.profiles, list(policy.closures["auth-rbac"]))
+        self.assertEqual(len(policy._resolutions), 1)
+        gates = policy.gates_for(second.profiles)
+        self.assertEqual(len(gates), len(set(gates)))
+        self.assertEqual(policy.gates_for(second.profiles), gates)
+        self.assertEqual(len(policy._gates), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
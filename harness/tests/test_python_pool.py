@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+import signal
+import tempfile
+import textwrap
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from harness.cancellation import CancelToken
+from harness.python_pool import PythonGatePool, parse_python_command
+
+GATE_SCRIPT = """
+import os
+import sys
+
+print("parent", os.getppid())
+print("to stderr", file=sys.stderr)
+sys.exit(int(sys.argv[1]))
+"""
+
+GATE_MODULE = """
+import os
+import time
+
+print("started", flush=True)
+if os.environ.get("GATE_SLEEP"):
+    if os.fork() == 0:
+        time.sleep(30)
+    time.sleep(30)
+"""
+
+
+class ParsePythonCommandTests(unittest.TestCase):
+    def test_module_and_script_commands(self) -> None:
+        self.assertEqual(
+            parse_python_command("python3 -m harness.scripts.test_runner --workers 2"),
+            {"module": "harness.scripts.test_runner", "args": ["--workers", "2"]},
+        )
+        self.assertEqual(
+            parse_python_command("/usr/bin/python3.11 tools/check.py 'a b'"),
+            {"path": "tools/check.py", "args": ["a b"]},
+        )
+
+    def test_shell_and_non_python_commands_are_rejected(self) -> None:
+        for command in [
+            "python3 -m unittest && echo done",
+            "python3 check.py > out.txt",
+            "python3 -c 'print(1)'",
+            "python3 -m",
+            "npm test",
+            "echo $HOME",
+        ]:
+            with self.subTest(command=command):
+                self.assertIsNone(parse_python_command(command))
+
+
+class PythonGatePoolTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        (self.tmp / "gate.py").write_text(textwrap.dedent(GATE_SCRIPT), encoding="utf-8")
+        (self.tmp / "slow_gate.py").write_text(textwrap.dedent(GATE_MODULE), encoding="utf-8")
+
+    def _pool(self, **kwargs) -> PythonGatePool:
+        pool = PythonGatePool(preload=[], **kwargs)
+        self.addCleanup(pool.close)
+        return pool
+
+    def _cfg(self, command: str, **extra) -> dict:
+        return {"command": command, "cwd": str(self.tmp), **extra}
+
+    def test_runs_script_with_logs_and_exit_code(self) -> None:
+        pool = self._pool()
+        passed = pool.run("ok", self._cfg("python3 gate.py 0"), 1, log_dir=self.tmp / "logs")
+        failed = pool.run("bad", self._cfg("python3 gate.py 3"), 1, log_dir=self.tmp / "logs")
+
+        self.assertEqual((passed.status, passed.return_code), ("passed", 0))
+        self.assertEqual((failed.status, failed.return_code), ("failed", 3))
+        self.assertIn("parent", passed.stdout)
+        self.assertEqual(Path(passed.stderr_ref).read_text(encoding="utf-8"), "to stderr\n")
+        self.assertIn("max_rss_kb", passed.resources)
+
+    def test_zygote_is_recycled(self) -> None:
+        pool = self._pool(recycle_after=2)
+        parents = [pool.run("g", self._cfg("python3 gate.py 0"), 1).stdout.split()[1] for _ in range(3)]
+        self.assertEqual(parents[0], parents[1])
+        self.assertNotEqual(parents[1], parents[2])
+
+    def test_cancel_kills_process_group(self) -> None:
+        pool = self._pool()
+        cancel = CancelToken()
+        threading.Timer(0.5, cancel.cancel).start()
+        started = time.monotonic()
+        cfg = self._cfg("python3 -m slow_gate", env={"GATE_SLEEP": "1"})
+        result = pool.run("slow", cfg, 1, cancel=cancel)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(result.status, "cancelled")
+        self.assertEqual(result.stdout, "started\n")
+
+    def test_timeout_terminates_worker(self) -> None:
+        pool = self._pool()
+        cfg = self._cfg("python3 -m slow_gate", env={"GATE_SLEEP": "1"}, timeout_seconds=1)
+        result = pool.run("slow", cfg, 1)
+        self.assertEqual(result.status, "timed-out")
+        self.assertIn("timed out after 1s", result.stderr)
+
+    def test_zygote_crash_fails_the_gate_and_restarts(self) -> None:
+        pool = self._pool()
+        pool.run("warm", self._cfg("python3 gate.py 0"), 1)
+        threading.Timer(0.5, pool._zygote.proc.kill).start()
+        started = time.monotonic()
+        result = pool.run("slow", self._cfg("python3 -m slow_gate", env={"GATE_SLEEP": "1"}), 1)
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual((result.status, result.return_code), ("failed", -1))
+        self.assertIn("python-pool worker exited", result.stderr)
+        self.assertEqual(pool.run("next", self._cfg("python3 gate.py 0"), 1).status, "passed")
+
+    def test_hung_zygote_times_out_and_restarts(self) -> None:
+        pool = self._pool()
+        pool.run("warm", self._cfg("python3 gate.py 0"), 1)
+        os.kill(pool._zygote.proc.pid, signal.SIGSTOP)
+        result = pool.run("stuck", self._cfg("python3 gate.py 0", timeout_seconds=1), 1)
+        self.assertEqual(result.status, "timed-out")
+        self.assertIn("did not start the gate", result.stderr)
+        self.assertEqual(pool.run("next", self._cfg("python3 gate.py 0"), 1).status, "passed")
+
+    def test_rejects_commands_that_need_a_shell(self) -> None:
+        with self.assertRaises(ValueError):
+            self._pool().run("g", self._cfg("python3 gate.py 0 | tee out"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import threading
+import time
+import unittest
+
+from harness.cancellation import CancelToken
+from harness.resource_pool import MAX_BYPASS, GateDemand, ResourcePool
+
+
+def _cancelled_after(seconds: float) -> CancelToken:
+    cancel = CancelToken()
+    threading.Timer(seconds, cancel.cancel).start()
+    return cancel
+
+
+class ResourcePoolTests(unittest.TestCase):
+    def test_demand_from_gate(self) -> None:
+        demand = GateDemand.from_gate({"resources": {"cpu": 2, "memory_mb": 512}, "locks": ["b", "a", "a"]})
+        self.assertEqual(demand, GateDemand(cpu=2.0, memory_mb=512, locks=("a", "b")))
+        self.assertEqual(GateDemand.from_gate({}), GateDemand())
+
+    def test_gates_are_packed_into_capacity(self) -> None:
+        pool = ResourcePool(cpu=4, memory_mb=1024)
+        self.assertTrue(pool.acquire(GateDemand(cpu=2, memory_mb=512)))
+        self.assertTrue(pool.acquire(GateDemand(cpu=1, memory_mb=512)))
+        self.assertFalse(pool.acquire(GateDemand(cpu=1, memory_mb=1), cancel=_cancelled_after(0.1)))  # memory
+        self.assertTrue(pool.acquire(GateDemand(cpu=1)))
+        self.assertFalse(pool.acquire(GateDemand(cpu=1), cancel=_cancelled_after(0.1)))  # cpu
+
+    def test_oversized_gate_runs_alone(self) -> None:
+        pool = ResourcePool(cpu=2)
+        with pool.hold(GateDemand(cpu=8)) as admitted:
+            self.assertTrue(admitted)
+            self.assertFalse(pool.acquire(GateDemand(cpu=0.5), cancel=_cancelled_after(0.1)))
+        self.assertTrue(pool.acquire(GateDemand(cpu=2)))
+
+    def test_reserved_cpus_are_whole_and_clamped(self) -> None:
+        pool = ResourcePool(cpu=4)
+        self.assertEqual(pool.reserved_cpus(GateDemand(cpu=2)), 2)
+        self.assertEqual(pool.reserved_cpus(GateDemand(cpu=8)), 4)
+        self.assertEqual(pool.reserved_cpus(GateDemand(cpu=0.5)), 1)
+        self.assertEqual(ResourcePool().reserved_cpus(GateDemand(cpu=3)), 3)
+
+    def test_process_cap(self) -> None:
+        pool = ResourcePool(processes=1)
+        with pool.hold(GateDemand(cpu=0.1)):
+            self.assertFalse(pool.acquire(GateDemand(cpu=0.1), cancel=_cancelled_after(0.1)))
+
+    def test_gates_sharing_a_lock_never_overlap(self) -> None:
+        pool = ResourcePool(cpu=8)
+        active: list[str] = []
+        overlaps: list[list[str]] = []
+
+        def gate(name: str, locks: tuple[str, ...]) -> None:
+            with pool.hold(GateDemand(locks=locks)):
+                active.append(name)
+                if len([n for n in active if n.startswith("next")]) > 1:
+                    overlaps.append(list(active))
+                time.sleep(0.05)
+                active.remove(name)
+
+        threads = [threading.Thread(target=gate, args=(f"next{i}", ("next-workspace",))) for i in range(4)]
+        threads.append(threading.Thread(target=gate, args=("other", ())))
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(overlaps, [])
+        self.assertGreaterEqual(time.monotonic() - started, 0.2)
+
+    def test_light_gates_cannot_starve_a_heavy_one(self) -> None:
+        pool = ResourcePool(cpu=4)
+        base = GateDemand(cpu=3)
+        pool.acquire(base)
+        heavy_admitted = threading.Event()
+        heavy = threading.Thread(target=lambda: pool.acquire(GateDemand(cpu=4)) and heavy_admitted.set())
+        heavy.start()
+        time.sleep(0.1)  # the heavy gate is now the oldest waiter
+
+        for _ in range(MAX_BYPASS):
+            self.assertTrue(pool.acquire(GateDemand(cpu=1), cancel=_cancelled_after(1)))
+            pool.release(GateDemand(cpu=1))
+        self.assertFalse(pool.acquire(GateDemand(cpu=1), cancel=_cancelled_after(0.1)))
+
+        pool.release(base)
+        heavy.join(timeout=5)
+        self.assertTrue(heavy_admitted.is_set())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+
+from harness.run_journal import RunJournal, journal_path, load_journal
+from harness.types import GateResult, SupervisorRun
+
+
+def _result(gate_id: str, status: str) -> GateResult:
+    return GateResult(gate_id, status, 1, 5, "cmd", "", "", 0 if status == "passed" else 1)
+
+
+def _task(task_id: str, status: str, results: list[GateResult]) -> SupervisorRun:
+    return SupervisorRun(
+        run_id="r1",
+        task_id=task_id,
+        task_title=task_id,
+        tags=["auth"],
+        profiles_resolved=["safe-baseline"],
+        gates_run=[r.gate_id for r in results],
+        attempt=1,
+        status=status,
+        failed_gates=[r.gate_id for r in results if not r.passed],
+        started_at="",
+        ended_at="",
+        duration_ms=10,
+        escalation=None,
+        gate_results=results,
+    )
+
+
+class RunJournalTests(unittest.TestCase):
+    def test_load_journal_restores_finished_work(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            journal = RunJournal(tmp, "r1")
+            journal.record("run-started", selection={"task_source": "all", "task_ids": ["T1", "T2", "T3"]})
+            journal.gate_finished("T1", _result("lint", "passed"))
+            journal.task_finished(_task("T1", "passed", [_result("lint", "passed")]))
+            journal.gate_finished("T2", _result("lint", "passed"))
+            journal.gate_finished("T2", _result("unit", "failed"))
+            journal.gate_finished("T3", _result("lint", "cancelled"))
+            journal.task_finished(_task("T3", "cancelled", [_result("lint", "cancelled")]))
+            journal.close()
+            with journal_path(tmp, "r1").open("a", encoding="utf-8") as handle:
+                handle.write('{"event":"gate-fin')  # killed mid-write
+
+            state = load_journal(tmp, "r1")
+
+        self.assertEqual(state.selection["task_ids"], ["T1", "T2", "T3"])
+        self.assertEqual(list(state.finished_tasks), ["T1"])
+        self.assertEqual(state.finished_tasks["T1"].gate_results[0].gate_id, "lint")
+        self.assertIsNotNone(state.passed_gate("T2", "lint"))
+        self.assertIsNone(state.passed_gate("T2", "unit"))
+        self.assertIsNone(state.passed_gate("T3", "lint"))
+
+    def test_missing_journal_raises(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(FileNotFoundError):
+                load_journal(tmp, "nope")
+
+
+if __name__ == "__main__":
+    unittest.main()
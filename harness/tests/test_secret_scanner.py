@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from harness import secret_scanner
+from harness.file_inventory import build_inventory
+from harness.secret_scanner import (
+    Finding,
+    ScanCache,
+    added_lines,
+    scan_buffer,
+    scan_diff,
+    scan_paths,
+    should_scan,
+)
+
+# Assembled at runtime so this file does not trip the scanner itself.
+STRIPE_KEY = b"sk_" + b"live_" + b"abc123"
+PRIVATE_KEY = b"-----BEGIN RSA " + b"PRIVATE KEY-----"
+TOKEN_ASSIGNMENT = b"const TOK" + b"EN = 'abc';\n"
+
+
+class SecretScannerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def _targets(self) -> list[str]:
+        return [path for path in build_inventory(self.root).paths() if should_scan(path)]
+
+    def _write(self, path: str, data: bytes) -> None:
+        full = self.root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        full.write_bytes(data)
+
+    def test_reports_line_numbers_in_non_utf8_files(self) -> None:
+        self._write("app/config.py", b"# caf\xe9\n\nkey = '" + STRIPE_KEY + b"'\n" + PRIVATE_KEY + b"\n")
+        findings = scan_paths(self.root, self._targets(), workers=1)
+        self.assertEqual(
+            findings,
+            [
+                Finding("app/config.py", 3, "possible live stripe key"),
+                Finding("app/config.py", 4, "possible private key"),
+            ],
+        )
+
+    def test_overlapping_patterns_are_all_reported(self) -> None:
+        data = b"ok\nSECR" + b'ET="' + STRIPE_KEY + b'"\n' + PRIVATE_KEY + b" " + STRIPE_KEY + b"\n"
+        self.assertEqual(
+            sorted(scan_buffer(data)),
+            [
+                (2, "possible live stripe key"),
+                (2, "possible secret assignment"),
+                (3, "possible live stripe key"),
+                (3, "possible private key"),
+            ],
+        )
+
+    def test_skips_binaries_and_ignored_dirs(self) -> None:
+        self._write("assets/blob.bin", b"\0\1" + STRIPE_KEY)
+        self._write("node_modules/pkg/index.js", STRIPE_KEY)
+        self._write("logo.png", STRIPE_KEY)
+        self.assertEqual(self._targets(), ["assets/blob.bin"])
+        self.assertEqual(scan_paths(self.root, self._targets(), workers=1), [])
+
+    def test_git_listing_respects_gitignore(self) -> None:
+        subprocess.run(["git", "init", "-q"], cwd=self.root, check=True)
+        self._write(".gitignore", b"build/\n")
+        self._write("build/out.js", STRIPE_KEY)
+        self._write("src/app.ts", TOKEN_ASSIGNMENT)
+        self.assertEqual(self._targets(), [".gitignore", "src/app.ts"])
+        findings = scan_paths(self.root, self._targets(), workers=1)
+        self.assertEqual(findings, [Finding("src/app.ts", 1, "possible secret assignment")])
+
+    def test_process_pool_matches_serial_scan(self) -> None:
+        filler = b"x = 1\n" * 200_000
+        for i in range(4):
+            self._write(f"big{i}.py", filler + STRIPE_KEY + b"\n")
+        paths = self._targets()
+        serial = scan_paths(self.root, paths, workers=1)
+        with patch.object(secret_scanner, "PARALLEL_MIN_BYTES", 0):
+            parallel = scan_paths(self.root, paths, workers=2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual([f.line for f in serial], [200_001] * 4)
+
+    def _git(self, *args: str) -> str:
+        proc = subprocess.run(["git", *args], cwd=self.root, check=True, capture_output=True, text=True)
+        return proc.stdout.strip()
+
+    def test_cache_skips_unchanged_content(self) -> None:
+        subprocess.run(["git", "init", "-q"], cwd=self.root, check=True)
+        self._write(".gitignore", b"cache.json\n")
+        self._write("a.py", b"x = 1\n")
+        self._write("b.py", b"key = '" + STRIPE_KEY + b"'\n")
+        cache_file = self.root / "cache.json"
+
+        def scan() -> tuple[list[Finding], list[str]]:
+            cache = ScanCache(cache_file)
+            with patch.object(secret_scanner, "scan_file", wraps=secret_scanner.scan_file) as spy:
+                fingerprints = build_inventory(self.root).content_ids()
+                findings = scan_paths(self.root, self._targets(), 1, fingerprints=fingerprints, cache=cache)
+            cache.save()
+            return findings, sorted(call.args[1] for call in spy.call_args_list)
+
+        first, scanned = scan()
+        self.assertEqual(scanned, [".gitignore", "a.py", "b.py"])
+        self._write("a.py", b"x = 2\n")
+        second, scanned = scan()
+        self.assertEqual(scanned, ["a.py"])
+        self.assertEqual(second, first)
+        self.assertEqual(second, [Finding("b.py", 1, "possible live stripe key")])
+
+    def test_added_lines_tracks_new_line_numbers(self) -> None:
+        diff = (
+            b"diff --git a/app.py b/app.py\n--- a/app.py\n+++ b/app.py\n"
+            b"@@ -3 +3,2 @@\n-old\n+new\n+newer\n@@ -10,0 +11 @@\n+tail\n"
+            b"diff --git a/gone.py b/gone.py\n--- a/gone.py\n+++ /dev/null\n@@ -1 +0,0 @@\n-x\n"
+        )
+        self.assertEqual(added_lines(diff), {"app.py": [(3, b"new"), (4, b"newer"), (11, b"tail")]})
+
+    def test_added_lines_unquotes_git_paths(self) -> None:
+        diff = (
+            b'diff --git "a/q\\"uote.py" "b/q\\"uote.py"\n--- "a/q\\"uote.py"\n+++ "b/q\\"uote.py"\n'
+            b"@@ -1,0 +1 @@\n+a\n"
+            b'diff --git "a/t\\tab.py" "b/t\\tab.py"\n--- "a/t\\tab.py"\n+++ "b/t\\tab.py"\n@@ -1,0 +1 @@\n+b\n'
+            b'diff --git "a/caf\\303\\251.py" "b/caf\\303\\251.py"\n--- "a/caf\\303\\251.py"\n'
+            b'+++ "b/caf\\303\\251.py"\n@@ -1,0 +1 @@\n+c\n'
+            b"diff --git a/a b.py b/a b.py\n--- a/a b.py\t\n+++ b/a b.py\t\n@@ -1,0 +1 @@\n+d\n"
+        )
+        self.assertEqual(
+            added_lines(diff),
+            {
+                'q"uote.py': [(1, b"a")],
+                "t\tab.py": [(1, b"b")],
+                "caf\u00e9.py": [(1, b"c")],
+                "a b.py": [(1, b"d")],
+            },
+        )
+
+    def test_added_line_that_looks_like_a_file_header_is_scanned(self) -> None:
+        diff = (
+            b"diff --git a/notes.md b/notes.md\n--- a/notes.md\n+++ b/notes.md\n"
+            b"@@ -1,0 +1,3 @@\n+++ heading\n+--- rule\n+" + TOKEN_ASSIGNMENT.rstrip(b"\n") + b"\n"
+        )
+        self.assertEqual(
+            added_lines(diff),
+            {"notes.md": [(1, b"++ heading"), (2, b"--- rule"), (3, TOKEN_ASSIGNMENT.rstrip(b"\n"))]},
+        )
+
+    def test_diff_mode_scans_only_added_lines(self) -> None:
+        self._git("init", "-q")
+        self._git("config", "user.email", "dev@example.com")
+        self._git("config", "user.name", "dev")
+        self._write("old.py", b"key = '" + STRIPE_KEY + b"'\n")
+        self._write("app.py", b"a = 1\nb = 2\n")
+        self._git("add", ".")
+        self._git("commit", "-qm", "base")
+        self._write("app.py", b"a = 1\n++ not a header\n" + TOKEN_ASSIGNMENT + b"b = 2\n")
+        self._git("commit", "-qam", "change")
+
+        findings = scan_diff(self.root, "HEAD~1...HEAD")
+        self.assertEqual(findings, [Finding("app.py", 3, "possible secret assignment")])
+        with self.assertRaises(RuntimeError):
+            scan_diff(self.root, "nope...HEAD")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from harness.cancellation import CancelToken
+from harness.file_inventory import build_inventory
+from harness.gate_runner import run_gate
+from harness.setup_phases import SetupRunner, setup_key
+from harness.types import GateResult
+
+
+class SetupRunnerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name) / "repo"
+        self.root.mkdir()
+        (self.root / "package-lock.json").write_text('{"lockfileVersion": 3}', encoding="utf-8")
+        self.cache_dir = Path(tmp.name) / "cache"
+        self.state_path = Path(tmp.name) / "artifacts" / "setup-state.json"
+        self.setups = {
+            "deps": {
+                "command": "mkdir -p node_modules && echo installed > node_modules/marker && echo run >> ../runs",
+                "cwd": str(self.root),
+                "key_inputs": ["package-lock.json"],
+                "outputs": ["node_modules"],
+            }
+        }
+
+    def _runner(self, **kwargs) -> SetupRunner:
+        def run_fn(setup_id: str, setup_cfg: dict, cancel: CancelToken | None) -> GateResult:
+            return run_gate(setup_id, setup_cfg, 1, cancel=cancel)
+
+        options = {"root": self.root, "cache_dir": self.cache_dir, "state_path": self.state_path, **kwargs}
+        return SetupRunner(self.setups, run_fn, **options)
+
+    def _runs(self) -> int:
+        runs = self.root.parent / "runs"
+        return len(runs.read_text(encoding="utf-8").splitlines()) if runs.exists() else 0
+
+    def test_runs_once_per_run_for_concurrent_gates(self) -> None:
+        runner = self._runner()
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            failures = list(pool.map(lambda _: runner.ensure(["deps"]), range(4)))
+        self.assertEqual(failures, [None] * 4)
+        self.assertEqual(self._runs(), 1)
+        (result,) = runner.results
+        self.assertEqual((result.gate_id, result.status, result.source), ("deps", "passed", "executed"))
+
+    def test_cached_across_runs_and_restored_when_outputs_are_missing(self) -> None:
+        self._runner().ensure(["deps"])
+        reused = self._runner()
+        self.assertIsNone(reused.ensure(["deps"]))
+        self.assertEqual(reused.results[0].source, "cache")
+
+        (self.root / "node_modules" / "marker").unlink()
+        (self.root / "node_modules").rmdir()
+        restored = self._runner()
+        self.assertIsNone(restored.ensure(["deps"]))
+        self.assertEqual(restored.results[0].source, "restored")
+        self.assertEqual((self.root / "node_modules" / "marker").read_text(encoding="utf-8"), "installed\n")
+        self.assertEqual(self._runs(), 1)
+
+        refreshed = self._runner(read=False)
+        refreshed.ensure(["deps"])
+        self.assertEqual((refreshed.results[0].source, self._runs()), ("executed", 2))
+
+    def test_key_follows_lockfile_content(self) -> None:
+        before = setup_key(self.setups["deps"], build_inventory(self.root).content_ids())
+        self._runner().ensure(["deps"])
+        self.assertEqual(setup_key(self.setups["deps"], build_inventory(self.root).content_ids()), before)
+        (self.root / "package-lock.json").write_text('{"lockfileVersion": 3, "x": 1}', encoding="utf-8")
+        self.assertNotEqual(setup_key(self.setups["deps"], build_inventory(self.root).content_ids()), before)
+
+        runner = self._runner(keep=1)
+        runner.ensure(["deps"])
+        self.assertEqual((runner.results[0].source, self._runs()), ("executed", 2))
+        self.assertEqual(len(list((self.cache_dir / "deps").iterdir())), 1)
+
+    def test_key_comes_from_the_given_fingerprints(self) -> None:
+        keys = []
+        for content_id in ("a", "b", "b"):
+            runner = self._runner(cache_dir=None, fingerprints=lambda: {"package-lock.json": content_id})
+            runner.ensure(["deps"])
+            keys.append(runner.results[0].execution_key)
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(keys[1], keys[2])
+
+    def test_failure_is_returned_and_not_cached(self) -> None:
+        self.setups["broken"] = {"command": "echo run >> ../runs; exit 2", "cwd": str(self.root)}
+        runner = self._runner()
+        failed = runner.ensure(["broken", "deps"])
+        self.assertEqual((failed.gate_id, failed.status), ("broken", "failed"))
+        self.assertIs(runner.ensure(["broken"]), failed)
+        self.assertEqual(self._runs(), 1)
+        self.assertFalse((self.cache_dir / "broken").exists())
+        self.assertEqual([result.gate_id for result in runner.results], ["broken"])
+
+    def test_cancelled_setup_is_tried_again(self) -> None:
+        self.setups["slow"] = {"command": "sleep 30"}
+        runner = self._runner()
+        cancel = CancelToken()
+        threading.Timer(0.3, cancel.cancel).start()
+        self.assertEqual(runner.ensure(["slow"], cancel).status, "cancelled")
+        self.assertEqual(runner.results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import unittest
+
+from harness.sharding import assign_shards, hash_shard, merge_summaries, parse_shard
+
+
+def _summary(run_id: str, index: int, count: int, task_ids: list[str], of_tasks: list[str], failed=()) -> dict:
+    return {
+        "run_id": run_id,
+        "task_source": "all",
+        "total_tasks": len(task_ids),
+        "passed_tasks": len(task_ids) - len(failed),
+        "escalated_tasks": len(failed),
+        "cancelled_tasks": 0,
+        "blocking_failures": len(failed),
+        "advisory_failures": 0,
+        "interrupted": None,
+        "gate_executions": {"executed": 2 * len(task_ids), "shared": 1},
+        "shard": {"index": index, "count": count, "strategy": "duration", "of_tasks": of_tasks},
+        "tasks": [
+            {"task_id": task_id, "status": "escalated" if task_id in failed else "passed"} for task_id in task_ids
+        ],
+    }
+
+
+class ShardingTests(unittest.TestCase):
+    def test_parse_shard(self) -> None:
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for bad in ["0/4", "5/4", "2", "a/b", "-1/2"]:
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                parse_shard(bad)
+
+    def test_duration_packing_is_longest_first(self) -> None:
+        expected = {"T1": 90.0, "T2": 50.0, "T3": 40.0, "T4": 30.0, "T5": 20.0, "T6": None}
+        shards, strategy = assign_shards(expected, 2)
+        self.assertEqual(strategy, "duration")
+        # Longest first onto the lighter shard; T6 has no history and counts as the median (40).
+        self.assertEqual(shards, {"T1": 1, "T2": 2, "T3": 2, "T6": 1, "T4": 2, "T5": 2})
+        # Input order does not change the plan.
+        self.assertEqual(assign_shards(dict(reversed(expected.items())), 2)[0], shards)
+
+    def test_without_history_tasks_are_hashed(self) -> None:
+        shards, strategy = assign_shards({"T1": None, "T2": None}, 3)
+        self.assertEqual(strategy, "hash")
+        self.assertEqual(shards, {"T1": hash_shard("T1", 3), "T2": hash_shard("T2", 3)})
+        self.assertEqual(assign_shards({"T1": 5.0}, 3, strategy="hash")[1], "hash")
+
+    def test_merge_complete_shards(self) -> None:
+        of_tasks = ["T1", "T2", "T3"]
+        merged, problems = merge_summaries(
+            [_summary("b", 2, 2, ["T3", "T1"], of_tasks, failed=["T3"]), _summary("a", 1, 2, ["T2"], of_tasks)]
+        )
+        self.assertEqual(problems, [])
+        self.assertEqual([task["task_id"] for task in merged["tasks"]], of_tasks)
+        self.assertEqual((merged["total_tasks"], merged["blocking_failures"]), (3, 1))
+        self.assertEqual(merged["gate_executions"], {"executed": 6, "shared": 2})
+        self.assertEqual([shard["index"] for shard in merged["shards"]], [2, 1])
+
+    def test_merge_reports_gaps_and_overlaps(self) -> None:
+        of_tasks = ["T1", "T2", "T3"]
+        _, problems = merge_summaries([_summary("a", 1, 3, ["T1", "T2"], of_tasks)])
+        self.assertEqual(problems, ["missing shard(s) 2, 3 of 3"])
+
+        _, problems = merge_summaries(
+            [_summary("a", 1, 2, ["T1", "T2"], of_tasks), _summary("b", 2, 2, ["T2"], of_tasks)]
+        )
+        self.assertEqual(problems, ["task T2 ran in 2 shards", "task T3 was not run by any shard"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import json
+import os
+import signal
+import tempfile
+import unittest
+from contextlib import contextmanager, redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Iterator
+from unittest.mock import patch
+
+from harness.gate_history import GateHistory
+from harness.gate_runner import ADAPTIVE_TIMEOUT_KEY
+from harness.policy_loader import load_policy
+from harness.resource_pool import GATE_CPUS_ENV
+from harness.scripts import lint_check, security_lite_check, test_runner
+from harness.supervisor import _adaptive_gate_cfg, build_parser, merge_runs, run_supervisor
+from harness.types import GateResult
+
+TASKS = """
+- [ ] **T1 - Auth change** [auth]
+- [ ] **T2 - UI change** [ui]
+- [ ] **T3 - Billing change** [billing]
+- [ ] **T4 - Storage change** [storage]
+"""
+
+
+def _fake_run_gate(gate_id: str, gate_cfg: dict, attempt: int, *args, **kwargs) -> GateResult:
+    failing = gate_id in {"billing-integration-tests", "tenant-isolation-tests"}
+    return GateResult(
+        gate_id=gate_id,
+        status="failed" if failing else "passed",
+        attempt=attempt,
+        duration_ms=1,
+        command=gate_cfg["command"],
+        stdout="",
+        stderr="",
+        return_code=1 if failing else 0,
+    )
+
+
+@contextmanager
+def _fake_gates(run_gate_fn: Callable[..., GateResult]) -> Iterator[None]:
+    """Route gates to ``run_gate_fn`` whichever runner the policy picks for them."""
+    with patch("harness.supervisor.run_gate", side_effect=run_gate_fn):
+        with patch("harness.supervisor.PythonGatePool.run", side_effect=run_gate_fn):
+            yield
+
+
+class SupervisorTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.tasks_file = Path(self.tmp.name) / "TASKS.md"
+        self.tasks_file.write_text(TASKS, encoding="utf-8")
+
+    def _run(self, name: str, *extra: str) -> tuple[int, dict]:
+        artifacts_dir = Path(self.tmp.name) / name
+        args = build_parser().parse_args(
+            [
+                "run",
+                "--tasks-file",
+                str(self.tasks_file),
+                "--artifacts-dir",
+                str(artifacts_dir),
+                "--task-source",
+                "all",
+                *extra,
+            ]
+        )
+        with _fake_gates(_fake_run_gate), redirect_stdout(StringIO()):
+            code = run_supervisor(args)
+        (summary_file,) = artifacts_dir.glob("*/summary.json")
+        return code, json.loads(summary_file.read_text(encoding="utf-8"))
+
+    def test_parallel_jobs_match_serial_run(self) -> None:
+        serial_code, serial = self._run("serial")
+        parallel_code, parallel = self._run("parallel", "--jobs", "3", "--max-gate-processes", "2")
+
+        self.assertEqual(serial_code, 1)
+        self.assertEqual(parallel_code, serial_code)
+        for key in ("passed_tasks", "escalated_tasks", "blocking_failures", "advisory_failures"):
+            self.assertEqual(parallel[key], serial[key])
+        self.assertEqual([t["task_id"] for t in parallel["tasks"]], ["T1", "T2", "T3", "T4"])
+        self.assertEqual(parallel["tasks"], serial["tasks"])
+
+    def test_fail_fast_run_cancels_remaining_tasks(self) -> None:
+        code, summary = self._run("fail-fast", "--no-cache", "--fail-fast", "run")
+
+        self.assertEqual(code, 1)
+        self.assertEqual(summary["fail_fast"], "run")
+        statuses = {task["task_id"]: task["status"] for task in summary["tasks"]}
+        self.assertEqual(statuses, {"T1": "passed", "T2": "passed", "T3": "escalated", "T4": "cancelled"})
+        self.assertEqual(summary["cancelled_tasks"], 1)
+        self.assertEqual(summary["blocking_failures"], 1)
+
+    def test_since_skips_gates_with_unchanged_inputs(self) -> None:
+        with patch("harness.supervisor.changed_files_since", return_value={"components/Button.tsx"}):
+            code, summary = self._run("since", "--no-cache", "--since", "HEAD")
+
+        self.assertEqual(code, 0)
+        self.assertEqual(summary["escalated_tasks"], 0)
+        self.assertEqual(summary["gate_executions"]["shared"] + summary["gate_executions"]["executed"], 4)
+        self.assertGreater(summary["gate_executions"]["skipped"], 0)
+
+    def test_file_inventory_index_lives_under_artifacts_dir(self) -> None:
+        self._run("indexed")
+        self.assertTrue((Path(self.tmp.name) / "indexed" / "cache" / "file-inventory.json").is_file())
+
+    def test_cpu_capacity_default_allows_parallel_gates_on_one_cpu(self) -> None:
+        progress_file = Path(self.tmp.name) / "progress.ndjson"
+        with patch("os.cpu_count", return_value=1):
+            self._run("one-cpu", "--no-cache", "--progress", str(progress_file))
+        events = [json.loads(line) for line in progress_file.read_text(encoding="utf-8").splitlines()]
+        (started,) = [event for event in events if event["event"] == "run-started"]
+        self.assertEqual(started["capacity"]["cpu"], 4)  # scheduler.max_parallel_gates
+        self.assertIn("raised from 1 CPU(s) to 4", started["capacity_note"])
+
+    def test_gates_are_told_their_reserved_cpus(self) -> None:
+        seen: dict[str, str] = {}
+
+        def recording_gate(gate_id: str, gate_cfg: dict, attempt: int, *args, **kwargs) -> GateResult:
+            seen[gate_id] = gate_cfg["env"][GATE_CPUS_ENV]
+            return _fake_run_gate(gate_id, gate_cfg, attempt)
+
+        args = build_parser().parse_args(
+            ["run", "--tasks-file", str(self.tasks_file), "--artifacts-dir", str(Path(self.tmp.name) / "cpus")]
+            + ["--task-source", "all", "--no-cache"]
+        )
+        with _fake_gates(recording_gate), redirect_stdout(StringIO()):
+            run_supervisor(args)
+        self.assertEqual((seen["unit"], seen["lint"]), ("2", "1"))
+        with patch.dict(os.environ, {GATE_CPUS_ENV: "2"}):
+            for script in (test_runner, lint_check, security_lite_check):
+                self.assertEqual(script.build_parser().parse_args([]).workers, 2)
+
+    def test_setup_phase_runs_once_and_is_reported_apart_from_gates(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json").to_dict()
+        policy["setup"] = {"deps": {"command": "true", "key_inputs": ["harness/supervisor_policy.json"]}}
+        policy["gates"]["unit"]["setup"] = ["deps"]
+        policy_file = Path(self.tmp.name) / "policy.json"
+        policy_file.write_text(json.dumps(policy), encoding="utf-8")
+
+        code, summary = self._run("setup", "--no-cache", "--jobs", "4", "--policy-file", str(policy_file))
+
+        self.assertEqual(code, 1)
+        phases = [(phase["setup_id"], phase["status"], phase["source"]) for phase in summary["setup"]]
+        self.assertEqual(phases, [("deps", "passed", "executed")])
+        self.assertEqual(summary["setup_ms"], 1)
+        self.assertEqual(summary["gate_ms"], summary["gate_executions"]["executed"])
+
+    def test_coordinator_mode_rejects_gates_with_setup(self) -> None:
+        policy = load_policy("harness/supervisor_policy.json").to_dict()
+        policy["setup"] = {"deps": {"command": "true"}}
+        policy["gates"]["unit"]["setup"] = ["deps"]
+        policy_file = Path(self.tmp.name) / "policy.json"
+        policy_file.write_text(json.dumps(policy), encoding="utf-8")
+        args = build_parser().parse_args(
+            ["coordinator", "--listen", f"unix:{Path(self.tmp.name) / 'c.sock'}", "--policy-file", str(policy_file)]
+            + ["--tasks-file", str(self.tasks_file), "--artifacts-dir", str(Path(self.tmp.name) / "coord")]
+            + ["--task-source", "all"]
+        )
+        with patch("sys.stderr", new=StringIO()) as stderr:
+            self.assertEqual(run_supervisor(args), 2)
+        self.assertIn("gates declaring setup: unit", stderr.getvalue())
+        self.assertFalse((Path(self.tmp.name) / "c.sock").exists())
+
+    def test_shards_cover_selection_and_merge_to_full_run(self) -> None:
+        full_code, full = self._run("full")
+        shard_runs = [self._run(f"shard{i}", "--shard", f"{i}/2") for i in (1, 2)]
+        shard_ids = [[task["task_id"] for task in summary["tasks"]] for _, summary in shard_runs]
+        self.assertEqual(sorted(shard_ids[0] + shard_ids[1]), ["T1", "T2", "T3", "T4"])
+        self.assertEqual(shard_runs[0][1]["shard"]["strategy"], "hash")  # no history recorded yet
+
+        merged_dir = Path(self.tmp.name) / "merged"
+        shard_dirs = [str(Path(self.tmp.name) / f"shard{i}") for i in (1, 2)]
+        args = build_parser().parse_args(["merge", *shard_dirs, "--artifacts-dir", str(merged_dir)])
+        with redirect_stdout(StringIO()):
+            code = merge_runs(args)
+        (summary_file,) = merged_dir.glob("*/summary.json")
+        merged = json.loads(summary_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(code, full_code)
+        self.assertEqual(merged["merge_problems"], [])
+        self.assertEqual([task["task_id"] for task in merged["tasks"]], ["T1", "T2", "T3", "T4"])
+        for key in ("passed_tasks", "escalated_tasks", "blocking_failures", "advisory_failures"):
+            self.assertEqual(merged[key], full[key])
+
+    def test_interrupted_run_resumes_from_journal(self) -> None:
+        calls: list[tuple[str, int]] = []
+
+        def interrupting_gate(gate_id: str, gate_cfg: dict, attempt: int, *args, **kwargs) -> GateResult:
+            calls.append((gate_id, attempt))
+            if gate_id == "billing-integration-tests" and not resumed:
+                os.kill(os.getpid(), signal.SIGINT)
+            return _fake_run_gate(gate_id, gate_cfg, attempt)
+
+        artifacts_dir = Path(self.tmp.name) / "resume"
+        base = ["run", "--tasks-file", str(self.tasks_file), "--artifacts-dir", str(artifacts_dir), "--no-cache"]
+        resumed = False
+        with _fake_gates(interrupting_gate), redirect_stdout(StringIO()):
+            with patch("sys.stderr", new=StringIO()):
+                code = run_supervisor(build_parser().parse_args([*base, "--task-source", "all"]))
+        self.assertEqual(code, 128 + signal.SIGINT)
+        (summary_file,) = artifacts_dir.glob("*/summary.json")
+        partial = json.loads(summary_file.read_text(encoding="utf-8"))
+        self.assertEqual(partial["interrupted"], "SIGINT")
+        self.assertEqual(partial["cancelled_tasks"], 2)
+
+        resumed = True
+        calls.clear()
+        with _fake_gates(interrupting_gate), redirect_stdout(StringIO()):
+            code = run_supervisor(build_parser().parse_args([*base, "--resume", partial["run_id"]]))
+        summary = json.loads(summary_file.read_text(encoding="utf-8"))
+
+        self.assertEqual(code, 1)
+        self.assertTrue(summary["resumed"])
+        self.assertIsNone(summary["interrupted"])
+        self.assertEqual([t["task_id"] for t in summary["tasks"]], ["T1", "T2", "T3", "T4"])
+        self.assertEqual({t["task_id"]: t["status"] for t in summary["tasks"]}["T1"], "passed")
+        self.assertEqual(summary["cancelled_tasks"], 0)
+        self.assertGreater(summary["gate_executions"]["resumed"], 0)
+        self.assertNotIn(("auth-flow-tests", 1), calls)  # T1 finished before the interrupt
+
+
+class AdaptiveTimeoutTests(unittest.TestCase):
+    def test_limit_follows_recent_passing_durations(self) -> None:
+        records = [{"kind": "gate", "gate_id": "unit", "status": "passed", "duration_ms": 40_000}] * 5
+        history = GateHistory(records)
+        cfg = {"command": "true", "timeout_seconds": 900}
+        timeouts = {"quantile": 0.99, "factor": 3, "min_seconds": 60, "min_samples": 5}
+
+        def limit(gate_cfg: dict = cfg, **overrides: int) -> float | None:
+            return _adaptive_gate_cfg("unit", gate_cfg, history, {**timeouts, **overrides}).get(ADAPTIVE_TIMEOUT_KEY)
+
+        self.assertEqual(limit(), 120)
+        self.assertEqual(limit(min_seconds=300), 300)
+        self.assertIsNone(limit(min_samples=6))
+        self.assertIsNone(limit({**cfg, "timeout_seconds": 100}))
+        self.assertIsNone(limit({**cfg, "adaptive_timeout": False}))
+
+if __name__ == "__main__":
+    unittest.main()
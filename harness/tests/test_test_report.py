@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import textwrap
+import unittest
+from pathlib import Path
+
+from harness.gate_runner import run_gate
+from harness.test_report import (
+    RETRY_TESTS_ENV,
+    narrowed_gate_cfg,
+    parse_junit_xml,
+    parse_unittest_json,
+    with_test_outcomes,
+)
+from harness.types import GateResult
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+FLAKY_MODULE = """
+import unittest
+from pathlib import Path
+
+MARKER = Path(__file__).with_name("ran-once")
+
+
+class FlakyTests(unittest.TestCase):
+    def test_stable(self):
+        pass
+
+    def test_flaky(self):
+        first = not MARKER.exists()
+        MARKER.touch()
+        self.assertFalse(first, "fails on the first run only")
+
+    @unittest.skip("not today")
+    def test_skipped(self):
+        pass
+"""
+
+JUNIT = """<?xml version="1.0"?>
+<testsuites>
+  <testsuite name="web">
+    <testcase classname="web.login" name="accepts valid password" time="0.25"/>
+    <testcase classname="web.login" name="rejects bad password" time="1.5">
+      <failure message="expected 401">stack</failure>
+    </testcase>
+    <testcase classname="web.login" name="sso" time="0"><skipped/></testcase>
+    <testcase name="orphan"><error>boom</error></testcase>
+  </testsuite>
+</testsuites>
+"""
+
+
+class TestReportTests(unittest.TestCase):
+    def test_parse_junit_xml(self) -> None:
+        outcomes = parse_junit_xml(JUNIT)
+        self.assertEqual(
+            [(o.test_id, o.outcome) for o in outcomes],
+            [
+                ("web.login.accepts valid password", "passed"),
+                ("web.login.rejects bad password", "failed"),
+                ("web.login.sso", "skipped"),
+                ("orphan", "error"),
+            ],
+        )
+        self.assertEqual(outcomes[1].duration_ms, 1500)
+        self.assertEqual(outcomes[1].message, "expected 401")
+
+    def test_parse_unittest_json(self) -> None:
+        outcomes = parse_unittest_json({"tests": [{"id": "m.C.test_a", "outcome": "error", "duration_ms": 7}]})
+        self.assertEqual(
+            (outcomes[0].test_id, outcomes[0].outcome, outcomes[0].duration_ms), ("m.C.test_a", "error", 7)
+        )
+
+    def test_narrowing_needs_attributed_failures(self) -> None:
+        cfg = {"command": "run-tests", "test_report": "unittest-json", "env": {"A": "1"}}
+        failed = GateResult(
+            "g", "failed", 1, 1, "run-tests", "", "", 1, failed_tests=["m.C.test_a", "m.C.test_b"]
+        )
+        crashed = GateResult("g", "failed", 1, 1, "run-tests", "", "", 1)
+
+        self.assertEqual(
+            narrowed_gate_cfg(cfg, failed)["env"], {"A": "1", RETRY_TESTS_ENV: "m.C.test_a\nm.C.test_b"}
+        )
+        self.assertIs(narrowed_gate_cfg(cfg, crashed), cfg)
+        self.assertIs(narrowed_gate_cfg(cfg, None), cfg)
+        self.assertNotIn("env", narrowed_gate_cfg({"command": "run-tests"}, failed))  # no test_report
+
+    def test_missing_report_leaves_result_alone(self) -> None:
+        result = GateResult("g", "failed", 1, 1, "cmd", "", "", 1, report_ref="/nonexistent/report.json")
+        self.assertIs(with_test_outcomes(result, {"test_report": "unittest-json"}), result)
+
+    def test_retry_reruns_only_failed_tests(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "flaky_tests.py").write_text(textwrap.dedent(FLAKY_MODULE), encoding="utf-8")
+            pythonpath = os.pathsep.join([str(REPO_ROOT), os.environ.get("PYTHONPATH", "")])
+            cfg = {
+                "command": f"{sys.executable} -m harness.scripts.test_runner flaky_tests",
+                "cwd": tmp,
+                "env": {"PYTHONPATH": pythonpath},
+                "test_report": "unittest-json",
+            }
+            log_dir = Path(tmp) / "logs"
+
+            first = run_gate("flaky", cfg, 1, log_dir=log_dir)
+            retry = run_gate("flaky", narrowed_gate_cfg(cfg, first), 2, log_dir=log_dir)
+
+        self.assertEqual(first.status, "failed")
+        self.assertEqual(first.test_counts, {"passed": 1, "failed": 1, "skipped": 1})
+        self.assertEqual(first.failed_tests, ["flaky_tests.FlakyTests.test_flaky"])
+        self.assertEqual(retry.status, "passed")
+        self.assertEqual(retry.test_counts, {"passed": 1})
+        self.assertIn("Retrying 1 failed test(s) only", retry.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import io
+import sys
+import tempfile
+import textwrap
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from harness.unittest_runner import group_by_class, load_durations, partition, run_tests, save_durations
+
+SAMPLE_MODULE = """
+import unittest
+
+
+class AlphaTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.ready = True
+
+    def test_one(self):
+        self.assertTrue(self.ready)
+
+    def test_two(self):
+        self.assertTrue(self.ready)
+
+
+class BetaTests(unittest.TestCase):
+    def test_fails(self):
+        self.assertEqual(1, 2)
+
+
+class GammaTests(unittest.TestCase):
+    def test_three(self):
+        pass
+"""
+
+
+class UnittestRunnerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+        (self.tmp / "sample_runner_tests.py").write_text(textwrap.dedent(SAMPLE_MODULE), encoding="utf-8")
+        sys.path.insert(0, tmp.name)
+        self.addCleanup(sys.path.remove, tmp.name)
+        self.addCleanup(sys.modules.pop, "sample_runner_tests", None)
+        self.suite = unittest.TestLoader().loadTestsFromName("sample_runner_tests")
+
+    def test_partition_keeps_classes_together_and_balances_by_duration(self) -> None:
+        groups = group_by_class(self.suite)
+        self.assertEqual(
+            groups["sample_runner_tests.AlphaTests"],
+            ["sample_runner_tests.AlphaTests.test_one", "sample_runner_tests.AlphaTests.test_two"],
+        )
+        durations = {
+            "sample_runner_tests.AlphaTests.test_one": [500],
+            "sample_runner_tests.AlphaTests.test_two": [400],
+            "sample_runner_tests.BetaTests.test_fails": [800],
+            "sample_runner_tests.GammaTests.test_three": [100],
+        }
+        batches = partition(groups, durations, 2)
+        self.assertEqual(
+            batches,
+            [
+                ["sample_runner_tests.AlphaTests.test_one", "sample_runner_tests.AlphaTests.test_two"],
+                ["sample_runner_tests.BetaTests.test_fails", "sample_runner_tests.GammaTests.test_three"],
+            ],
+        )
+        self.assertEqual(len(partition(groups, {}, 8)), 3)
+
+    def test_parallel_run_aggregates_outcomes(self) -> None:
+        stream = io.StringIO()
+        run = run_tests(self.suite, workers=3, stream=stream)
+
+        self.assertEqual(run.workers, 3)
+        self.assertEqual(run.tests_run, 4)
+        self.assertFalse(run.successful)
+        outcomes = {outcome["id"].split(".", 1)[1]: outcome["outcome"] for outcome in run.outcomes}
+        self.assertEqual(
+            outcomes,
+            {
+                "AlphaTests.test_one": "passed",
+                "AlphaTests.test_two": "passed",
+                "BetaTests.test_fails": "failed",
+                "GammaTests.test_three": "passed",
+            },
+        )
+        self.assertIn("AssertionError: 1 != 2", stream.getvalue())
+
+    def test_durations_keep_recent_samples(self) -> None:
+        path = self.tmp / "durations.json"
+        durations: dict[str, list[int]] = {}
+        for ms in range(1, 9):
+            save_durations(path, durations, [{"id": "m.C.test_a", "outcome": "passed", "duration_ms": ms}])
+        save_durations(path, durations, [{"id": "m.C.test_b", "outcome": "skipped", "duration_ms": 0}])
+        self.assertEqual(load_durations(path), {"m.C.test_a": [4, 5, 6, 7, 8]})
+        self.assertEqual(load_durations(self.tmp / "missing.json"), {})
+
+    def test_concurrent_saves_keep_every_gates_samples(self) -> None:
+        path = self.tmp / "durations.json"
+        stale = [load_durations(path) for _ in range(8)]  # every gate loaded before any saved
+
+        def save(i: int) -> None:
+            save_durations(path, stale[i], [{"id": f"m.C.test_{i}", "outcome": "passed", "duration_ms": i}])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(save, range(8)))
+        self.assertEqual(load_durations(path), {f"m.C.test_{i}": [i] for i in range(8)})
+
+
+if __name__ == "__main__":
+    unittest.main()
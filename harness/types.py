@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from typing import Any
 
 
@@ -22,10 +22,14 @@ class ProfileResolution:
     warnings: list[str] = field(default_factory=list)
 
 
+PASSING_STATUSES = frozenset({"passed", "skipped-unaffected"})
+FAILED_STATUSES = frozenset({"failed", "timed-out"})  # the gate ran and did not pass
+
+
 @dataclass
 class GateResult:
     gate_id: str
-    status: str  # "passed" | "failed"
+    status: str  # "passed" | "failed" | "timed-out" | "blocked" | "cancelled" | "skipped-unaffected"
     attempt: int
     duration_ms: int
     command: str
@@ -33,6 +37,56 @@ class GateResult:
     stderr: str
     return_code: int
     log_ref: str = ""
+    stderr_ref: str = ""
+    report_ref: str = ""
+    source: str = "executed"  # "executed" | "shared" | "cache" | "skipped" | "resumed"
+    execution_key: str = ""
+    resources: dict[str, float] = field(default_factory=dict)
+    test_counts: dict[str, int] = field(default_factory=dict)  # outcome -> tests, from a test report
+    failed_tests: list[str] = field(default_factory=list)
+
+    @classmethod
+    def not_run(cls, gate_id: str, status: str, attempt: int, reason: str, command: str = "") -> GateResult:
+        """Result for a gate that was skipped rather than executed."""
+        return cls(
+            gate_id=gate_id,
+            status=status,
+            attempt=attempt,
+            duration_ms=0,
+            command=command,
+            stdout="",
+            stderr=reason,
+            return_code=-1,
+        )
+
+    @property
+    def passed(self) -> bool:
+        return self.status in PASSING_STATUSES
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> GateResult:
+        known = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known})
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "gate_id": self.gate_id,
+            "status": self.status,
+            "attempt": self.attempt,
+            "duration_ms": self.duration_ms,
+            "command": self.command,
+            "stdout": self.stdout,
+            "stderr": self.stderr,
+            "return_code": self.return_code,
+            "log_ref": self.log_ref,
+            "stderr_ref": self.stderr_ref,
+            "report_ref": self.report_ref,
+            "source": self.source,
+            "execution_key": self.execution_key,
+            "resources": self.resources,
+            "test_counts": self.test_counts,
+            "failed_tests": self.failed_tests,
+        }
 
 
 @dataclass
@@ -54,7 +108,7 @@ class SupervisorRun:
     profiles_resolved: list[str]
     gates_run: list[str]
     attempt: int
-    status: str  # "passed" | "escalated"
+    status: str  # "passed" | "escalated" | "cancelled"
     failed_gates: list[str]
     started_at: str
     ended_at: str
@@ -64,6 +118,15 @@ class SupervisorRun:
     gate_results: list[GateResult] = field(default_factory=list)
     state_transitions: list[str] = field(default_factory=list)
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> SupervisorRun:
+        known = {f.name for f in fields(cls)}
+        values = {key: value for key, value in data.items() if key in known}
+        if values.get("escalation"):
+            values["escalation"] = EscalationReport(**values["escalation"])
+        values["gate_results"] = [GateResult.from_dict(g) for g in values.get("gate_results", [])]
+        return cls(**values)
+
     def to_dict(self) -> dict[str, Any]:
         escalation: dict[str, Any] | None = None
         if self.escalation:
@@ -91,19 +154,6 @@ class SupervisorRun:
             "duration_ms": self.duration_ms,
             "warnings": self.warnings,
             "escalation": escalation,
-            "gate_results": [
-                {
-                    "gate_id": g.gate_id,
-                    "status": g.status,
-                    "attempt": g.attempt,
-                    "duration_ms": g.duration_ms,
-                    "command": g.command,
-                    "stdout": g.stdout,
-                    "stderr": g.stderr,
-                    "return_code": g.return_code,
-                    "log_ref": g.log_ref,
-                }
-                for g in self.gate_results
-            ],
+            "gate_results": [g.to_dict() for g in self.gate_results],
             "state_transitions": self.state_transitions,
         }
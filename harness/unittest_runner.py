@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import fcntl
+import io
+import json
+import os
+import re
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from statistics import median
+from typing import Any, Iterable, Iterator
+
+from harness.coverage_map import CoverageRecorder, untraced
+from harness.test_report import FAILING_OUTCOMES
+
+
+DEFAULT_DURATIONS_PATH = Path(".supervisor-artifacts") / "history" / "test-durations.json"
+SAMPLES_PER_TEST = 5
+
+# Class/module fixture errors are reported as "setUpClass (pkg.module.Class)".
+_FIXTURE_ERROR = re.compile(r"^\w+ \((?P<target>[\w.]+)\)$")
+_FAILED_IMPORT_PREFIX = "unittest.loader._FailedTest."
+
+
+@untraced
+def rerunnable_id(test: unittest.TestCase) -> str:
+    """A name ``loadTestsFromName`` accepts for ``test``, including fixture and import errors."""
+    test_id = test.id()
+    match = _FIXTURE_ERROR.match(test_id)
+    if match:
+        return match.group("target")
+    if test_id.startswith(_FAILED_IMPORT_PREFIX):
+        return test_id[len(_FAILED_IMPORT_PREFIX) :]
+    return test_id
+
+
+class RecordingResult(unittest.TextTestResult):
+    """Text result that also keeps each test's outcome and duration."""
+
+    @untraced
+    def __init__(self, *args: Any, recorder: CoverageRecorder | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.outcomes: dict[str, dict[str, Any]] = {}
+        self.recorder = recorder
+        self._started: dict[str, float] = {}
+
+    @untraced
+    def _record(self, test: unittest.TestCase, outcome: str, err: Any = None) -> None:
+        test_id = rerunnable_id(test)
+        previous = self.outcomes.get(test_id)
+        if previous is not None and previous["outcome"] in FAILING_OUTCOMES:
+            return  # keep the first failure of a test with several subtests
+        started = self._started.get(test.id())
+        self.outcomes[test_id] = {
+            "id": test_id,
+            "outcome": outcome,
+            "duration_ms": int((time.perf_counter() - started) * 1000) if started else 0,
+            "message": self._exc_info_to_string(err, test).strip().splitlines()[-1] if err else "",
+        }
+
+    @untraced
+    def startTest(self, test: unittest.TestCase) -> None:
+        if self.recorder is not None:
+            self.recorder.begin(test.id(), f"{type(test).__module__}.{type(test).__qualname__}")
+        self._started[test.id()] = time.perf_counter()
+        super().startTest(test)
+
+    @untraced
+    def stopTest(self, test: unittest.TestCase) -> None:
+        super().stopTest(test)
+        if self.recorder is not None:
+            self.recorder.end(rerunnable_id(test))
+
+    @untraced
+    def addSuccess(self, test: unittest.TestCase) -> None:
+        super().addSuccess(test)
+        self._record(test, "passed")
+
+    @untraced
+    def addFailure(self, test: unittest.TestCase, err: Any) -> None:
+        super().addFailure(test, err)
+        self._record(test, "failed", err)
+
+    @untraced
+    def addError(self, test: unittest.TestCase, err: Any) -> None:
+        super().addError(test, err)
+        self._record(test, "error", err)
+
+    @untraced
+    def addSubTest(self, test: unittest.TestCase, subtest: unittest.TestCase, err: Any) -> None:
+        super().addSubTest(test, subtest, err)
+        if err is not None:
+            failed = issubclass(err[0], test.failureException)
+            self._record(test, "failed" if failed else "error", err)
+
+    @untraced
+    def addSkip(self, test: unittest.TestCase, reason: str) -> None:
+        super().addSkip(test, reason)
+        self._record(test, "skipped")
+        self.outcomes[rerunnable_id(test)]["message"] = reason
+
+    @untraced
+    def addExpectedFailure(self, test: unittest.TestCase, err: Any) -> None:
+        super().addExpectedFailure(test, err)
+        self._record(test, "expected-failure")
+
+    @untraced
+    def addUnexpectedSuccess(self, test: unittest.TestCase) -> None:
+        super().addUnexpectedSuccess(test)
+        self._record(test, "unexpected-success")
+
+
+@dataclass
+class TestRun:
+    outcomes: list[dict[str, Any]] = field(default_factory=list)
+    tests_run: int = 0
+    successful: bool = True
+    workers: int = 1
+    coverage: dict[str, set[str]] = field(default_factory=dict)  # test id -> repo files, when recorded
+
+
+def load_durations(path: str | Path) -> dict[str, list[int]]:
+    """Recent per-test durations (ms) recorded by earlier runs."""
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return {test_id: [int(ms) for ms in samples] for test_id, samples in data.items()}
+    except (OSError, ValueError, TypeError, AttributeError):
+        return {}
+
+
+def save_durations(path: str | Path, durations: dict[str, list[int]], outcomes: list[dict[str, Any]]) -> None:
+    """Add this run's durations (skipped tests excluded), keeping ``SAMPLES_PER_TEST`` per test.
+
+    Test gates running at the same time share the file, so the samples are
+    merged into its current content under an exclusive lock rather than into
+    the copy this run loaded; ``durations`` is updated to the merged result.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(path.name + ".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        merged = load_durations(path)
+        for outcome in outcomes:
+            if outcome["outcome"] == "skipped":
+                continue
+            samples = merged.setdefault(outcome["id"], [])
+            samples.append(int(outcome["duration_ms"]))
+            del samples[:-SAMPLES_PER_TEST]
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(merged, sort_keys=True, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
+    durations.clear()
+    durations.update(merged)
+
+
+def iter_tests(suite: unittest.TestSuite | unittest.TestCase) -> Iterator[unittest.TestCase]:
+    if isinstance(suite, unittest.TestSuite):
+        for child in suite:
+            yield from iter_tests(child)
+    else:
+        yield suite
+
+
+def group_by_class(suite: unittest.TestSuite) -> dict[str, list[str]]:
+    """Test ids per test class, so each class (and its ``setUpClass``) stays in one worker."""
+    groups: dict[str, list[str]] = {}
+    for test in iter_tests(suite):
+        test_id = rerunnable_id(test)
+        if test_id != test.id():
+            key = test_id  # a fixture or import error stands in for its class or module
+        else:
+            key = f"{type(test).__module__}.{type(test).__qualname__}"
+        groups.setdefault(key, []).append(test_id)
+    return groups
+
+
+def partition(groups: dict[str, list[str]], durations: dict[str, list[int]], workers: int) -> list[list[str]]:
+    """Spread test classes over ``workers`` batches, longest expected class first.
+
+    Tests without history are assumed to take the median of the known tests
+    (or all the same time when nothing is known yet).
+    """
+    known = [median(samples) for samples in durations.values() if samples]
+    default = median(known) if known else 1.0
+
+    def expected(test_id: str) -> float:
+        samples = durations.get(test_id)
+        return float(median(samples)) if samples else default
+
+    costs = sorted(
+        ((sum(expected(test_id) for test_id in test_ids), key) for key, test_ids in groups.items()),
+        key=lambda pair: (-pair[0], pair[1]),
+    )
+    batches: list[list[str]] = [[] for _ in range(min(workers, len(groups)))]
+    loads = [0.0] * len(batches)
+    for cost, key in costs:
+        target = loads.index(min(loads))
+        batches[target].extend(groups[key])
+        loads[target] += cost
+    return [batch for batch in batches if batch]
+
+
+def select(suite: unittest.TestSuite, test_ids: Iterable[str]) -> unittest.TestSuite:
+    """The tests of ``suite`` whose ids are in ``test_ids``, in their original order."""
+    wanted = set(test_ids)
+    return unittest.TestSuite(test for test in iter_tests(suite) if rerunnable_id(test) in wanted)
+
+
+def run_suite(
+    suite: unittest.TestSuite, stream: Any, record: bool = False, root: str | Path = "."
+) -> tuple[RecordingResult, dict[str, set[str]]]:
+    """Run ``suite`` in this process; with ``record``, also return the files under ``root`` each test touched."""
+    recorder = CoverageRecorder(root) if record else None
+    runner = unittest.TextTestRunner(stream=stream, resultclass=partial(RecordingResult, recorder=recorder))
+    if recorder is None:
+        return runner.run(suite), {}
+    recorder.start()
+    try:
+        result = runner.run(suite)
+    finally:
+        recorder.stop()
+    return result, recorder.coverage
+
+
+def _run_batch(
+    names: list[str], record: bool
+) -> tuple[list[dict[str, Any]], int, bool, str, dict[str, set[str]]]:
+    stream = io.StringIO()
+    result, coverage = run_suite(unittest.TestLoader().loadTestsFromNames(names), stream, record)
+    return list(result.outcomes.values()), result.testsRun, result.wasSuccessful(), stream.getvalue(), coverage
+
+
+def run_tests(
+    suite: unittest.TestSuite,
+    workers: int = 1,
+    durations: dict[str, list[int]] | None = None,
+    stream: Any = None,
+    record_coverage: bool = False,
+) -> TestRun:
+    """Run ``suite``, across a process pool when ``workers`` > 1 and it has several test classes.
+
+    Worker output is written to ``stream`` batch by batch once each finishes.
+    With ``record_coverage``, the repo files each test touched are collected
+    into ``TestRun.coverage``.
+    """
+    batches = partition(group_by_class(suite), durations or {}, workers) if workers > 1 else []
+    if len(batches) <= 1:
+        result, coverage = run_suite(suite, stream, record_coverage)
+        return TestRun(list(result.outcomes.values()), result.testsRun, result.wasSuccessful(), coverage=coverage)
+
+    run = TestRun(workers=len(batches))
+    with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+        results = pool.map(_run_batch, batches, [record_coverage] * len(batches))
+        for outcomes, tests_run, successful, output, coverage in results:
+            if stream is not None:
+                stream.write(output)
+            run.outcomes.extend(outcomes)
+            run.tests_run += tests_run
+            run.successful = run.successful and successful
+            run.coverage.update(coverage)
+    return run